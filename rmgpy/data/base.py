@@ -1186,32 +1186,85 @@ class ForbiddenStructures(Database):
     A database consisting solely of structures that are forbidden
     from occurring.
     """
-    
-    def isMoleculeForbidden(self, molecule):
+
+    def __init__(self, label='', name='', shortDesc='', longDesc=''):
+        Database.__init__(self, label=label, name=name, shortDesc=shortDesc, longDesc=longDesc)
+        self._index = None
+
+    def getIndex(self):
+        """
+        Return the prefilter index of the forbidden structures, a list with a
+        ``(entry, multiplicity, requiredAtomTypes, cyclic)`` tuple for each
+        entry. For forbidden groups, `requiredAtomTypes` is a list of
+        ``(mask, count)`` pairs giving the number of atoms whose atom type
+        must be a specific case of one in `mask`, and `cyclic` is ``True``
+        if the group contains a ring; a molecule that does not meet these
+        requirements cannot contain the group. Other entries have no
+        requirements.
+        """
+        if self._index is None or self._index[0] != len(self.entries):
+            index = []
+            for entry in self.entries.values():
+                multiplicity = None; requiredAtomTypes = []; cyclic = False
+                if isinstance(entry.item, Group):
+                    multiplicity = entry.item.multiplicity
+                    counts = {}
+                    for atom in entry.item.atoms:
+                        counts[atom.specificMask] = counts.get(atom.specificMask, 0) + 1
+                    requiredAtomTypes = sorted(counts.items())
+                    cyclic = entry.item.isCyclic()
+                index.append((entry, multiplicity, requiredAtomTypes, cyclic))
+            self._index = (len(self.entries), index)
+        return self._index[1]
+
+    def isMoleculeForbidden(self, molecule, index=None):
         """
         Return ``True`` if the given :class:`Molecule` object `molecule`
         contains forbidden functionality, or ``False`` if not. Labeled atoms
-        on the forbidden structures and the molecule are honored.
+        on the forbidden structures and the molecule are honored. The
+        subgraph isomorphism check is only made against the entries of the
+        prefilter `index` whose requirements the molecule meets; by default
+        this is :meth:`getIndex`, but an index merged from several sets of
+        forbidden structures can be given instead.
         """
-        for entry in self.entries.values():
-            entryLabeledAtoms = entry.item.getLabeledAtoms()
-            moleculeLabeledAtoms = molecule.getLabeledAtoms()
-            initialMap = {}
-            for label in entryLabeledAtoms:
-                # all group labels must be present in the molecule
-                if label not in moleculeLabeledAtoms: break  
-                initialMap[moleculeLabeledAtoms[label]] = entryLabeledAtoms[label]
-            else:
-                if molecule.isMappingValid(entry.item, initialMap) and molecule.isSubgraphIsomorphic(entry.item, initialMap):
-                    return True
-            
         # Until we have more thermodynamic data of molecular ions we will forbid them
         molecule_charge = 0
         for atom in molecule.atoms:
             molecule_charge += atom.charge
         if molecule_charge != 0:
             return True
-        
+
+        if index is None:
+            index = self.getIndex()
+        atomTypeBits = [atom.atomType.bit if atom.atomType is not None else 0 for atom in molecule.atoms]
+        moleculeCyclic = None
+        moleculeLabeledAtoms = molecule.getLabeledAtoms()
+        for entry, multiplicity, requiredAtomTypes, cyclic in index:
+            if multiplicity and molecule.multiplicity not in multiplicity:
+                continue
+            for mask, count in requiredAtomTypes:
+                for bit in atomTypeBits:
+                    if bit & mask:
+                        count -= 1
+                        if count == 0: break
+                else:
+                    break
+            else:
+                if cyclic:
+                    if moleculeCyclic is None:
+                        moleculeCyclic = molecule.isCyclic()
+                    if not moleculeCyclic:
+                        continue
+                entryLabeledAtoms = entry.item.getLabeledAtoms()
+                initialMap = {}
+                for label in entryLabeledAtoms:
+                    # all group labels must be present in the molecule
+                    if label not in moleculeLabeledAtoms: break
+                    initialMap[moleculeLabeledAtoms[label]] = entryLabeledAtoms[label]
+                else:
+                    if molecule.isMappingValid(entry.item, initialMap) and molecule.isSubgraphIsomorphic(entry.item, initialMap):
+                        return True
+
         return False
     
     def loadOld(self, path):
@@ -1252,6 +1305,7 @@ class ForbiddenStructures(Database):
             shortDesc = shortDesc,
             longDesc = longDesc.strip(),
         )
+        self._index = None
     
     def saveEntry(self, f, entry, name='entry'):
         """
@@ -5,8 +5,8 @@ import os
 import unittest
 from external.wip import work_in_progress
 
-from rmgpy.data.base import Entry, Database
-from rmgpy.molecule import Group
+from rmgpy.data.base import Entry, Database, ForbiddenStructures
+from rmgpy.molecule import Group, Molecule
 
 ################################################################################
 
@@ -88,6 +88,62 @@ class TestBaseDatabase(unittest.TestCase):
         )
         self.assertTrue(self.database.matchNodeToNode(entry1,entry1))
         self.assertFalse(self.database.matchNodeToNode(entry1,entry2))
+
+################################################################################
+
+class TestForbiddenStructures(unittest.TestCase):
+    """
+    Contains unit tests for the ForbiddenStructures class.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.forbidden = ForbiddenStructures()
+        self.forbidden.loadEntry(label='O4', group="""
+        1 O u0 {2,S}
+        2 O u0 {1,S} {3,S}
+        3 O u0 {2,S} {4,S}
+        4 O u0 {3,S}
+        """)
+        self.forbidden.loadEntry(label='C3ring', group="""
+        1 C ux {2,S} {3,S}
+        2 C ux {1,S} {3,S}
+        3 C ux {1,S} {2,S}
+        """)
+
+    def testGetIndex(self):
+        """
+        Test that the prefilter index requires the atom types and rings of
+        the forbidden groups.
+        """
+        index = self.forbidden.getIndex()
+        self.assertEqual([entry.label for entry, multiplicity, requiredAtomTypes, cyclic in index], ['O4', 'C3ring'])
+        self.assertEqual([sum(count for mask, count in requiredAtomTypes) for entry, multiplicity, requiredAtomTypes, cyclic in index], [4, 3])
+        self.assertEqual([cyclic for entry, multiplicity, requiredAtomTypes, cyclic in index], [False, True])
+        self.forbidden.loadEntry(label='C3ring', group="""
+        1 C ux {2,S}
+        2 C ux {1,S} {3,S}
+        3 C ux {2,S}
+        """)
+        self.assertFalse(self.forbidden.getIndex()[1][3])
+
+    def testIsMoleculeForbidden(self):
+        """
+        Test that molecules are forbidden only if they contain a forbidden
+        group.
+        """
+        self.assertTrue(self.forbidden.isMoleculeForbidden(Molecule().fromSMILES('OOOO')))
+        self.assertFalse(self.forbidden.isMoleculeForbidden(Molecule().fromSMILES('OOO')))
+        self.assertTrue(self.forbidden.isMoleculeForbidden(Molecule().fromSMILES('CC1CC1')))
+        self.assertFalse(self.forbidden.isMoleculeForbidden(Molecule().fromSMILES('CCCC')))
+        self.assertFalse(self.forbidden.isMoleculeForbidden(Molecule().fromSMILES('C1CCC1')))
+        # Molecular ions are always forbidden
+        molecule = Molecule().fromSMILES('CCCC')
+        molecule.atoms[0].charge = 1
+        self.assertTrue(self.forbidden.isMoleculeForbidden(molecule))
+
 ################################################################################
 
 if __name__ == '__main__':
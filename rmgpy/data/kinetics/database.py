@@ -31,6 +31,7 @@
 
 import os.path
 import logging
+import multiprocessing
 from copy import deepcopy
 import numpy
 
@@ -43,12 +44,94 @@ from rmgpy.species import Species
 from rmgpy.reaction import Reaction
 from rmgpy.data.base import LogicNode, DatabaseError
 
-from .family import  KineticsFamily
+from .family import  KineticsFamily, TemplateReaction
 from .library import LibraryReaction, KineticsLibrary
 from .common import filterReactions
 
 ################################################################################
 
+# The kinetics database and species constraints used by each worker process
+# of a reaction generation pool
+_workerDatabase = None
+_workerConstraints = None
+
+def _initializeWorker(database, failsSpeciesConstraints):
+    """
+    Store the kinetics `database` and the `failsSpeciesConstraints` function
+    for use by a worker process.
+    """
+    global _workerDatabase, _workerConstraints
+    _workerDatabase = database
+    _workerConstraints = failsSpeciesConstraints
+
+def _generateFamilyReactions(args):
+    """
+    Generate the reactions of a single family of the kinetics database of a
+    worker process for reactants given as adjacency lists, and return them in
+    the compact form made by :func:`_packReaction`.
+    """
+    label, adjlists = args
+    reactants = [Molecule().fromAdjacencyList(adjlist) for adjlist in adjlists]
+    reactionList = _workerDatabase.families[label].generateReactions(reactants, failsSpeciesConstraints=_workerConstraints)
+    return [_packReaction(reaction) for reaction in reactionList]
+
+def _packReaction(reaction):
+    """
+    Return a compact, picklable form of a `reaction` freshly generated by a
+    kinetics family, in which each molecule appears once as an adjacency list
+    and the template is given by the labels of its groups. The reverse
+    reaction of a family that is its own reverse, which shares molecules with
+    the forward reaction, is packed along with it.
+    """
+    molecules = []; indices = {}
+    def index(molecule):
+        if id(molecule) not in indices:
+            indices[id(molecule)] = len(molecules)
+            molecules.append(molecule)
+        return indices[id(molecule)]
+    def pack(reaction, species):
+        if species:
+            reactants = [index(spec.molecule[0]) for spec in reaction.reactants]
+            products = [index(spec.molecule[0]) for spec in reaction.products]
+            pairs = [(index(reactant.molecule[0]), index(product.molecule[0])) for reactant, product in reaction.pairs]
+        else:
+            reactants = [index(molecule) for molecule in reaction.reactants]
+            products = [index(molecule) for molecule in reaction.products]
+            pairs = [(index(reactant), index(product)) for reactant, product in reaction.pairs]
+        template = [entry.label for entry in reaction.template]
+        return (reactants, products, pairs, template, reaction.degeneracy, reaction.reversible)
+    forward = pack(reaction, True)
+    reverse = getattr(reaction, 'reverse', None)
+    if reverse is not None:
+        reverse = pack(reverse, False)
+    return ([molecule.toAdjacencyList() for molecule in molecules], forward, reverse)
+
+def _unpackReaction(family, packedReaction):
+    """
+    Return the reaction of the kinetics `family` packed by
+    :func:`_packReaction` as `packedReaction`.
+    """
+    adjlists, forward, reverse = packedReaction
+    molecules = [Molecule().fromAdjacencyList(adjlist) for adjlist in adjlists]
+    species = [Species(molecule=[molecule]) for molecule in molecules]
+    def unpack(packed, items):
+        reactants, products, pairs, template, degeneracy, reversible = packed
+        return TemplateReaction(
+            reactants = [items[i] for i in reactants],
+            products = [items[i] for i in products],
+            pairs = [(items[i], items[j]) for i, j in pairs],
+            template = [family.groups.entries[label] for label in template],
+            degeneracy = degeneracy,
+            reversible = reversible,
+            family = family,
+        )
+    reaction = unpack(forward, species)
+    if reverse is not None:
+        reaction.reverse = unpack(reverse, molecules)
+    return reaction
+
+################################################################################
+
 class KineticsDatabase(object):
     """
     A class for working with the RMG kinetics database.
@@ -74,6 +157,8 @@ class KineticsDatabase(object):
             'R': constants.R,
         }
         self.global_context = {}
+        self._pool = None
+        self._poolConstraints = None
 
     def __reduce__(self):
         """
@@ -93,6 +178,31 @@ class KineticsDatabase(object):
         self.families = d['families']
         self.libraries = d['libraries']
         self.libraryOrder = d['libraryOrder']
+        self._pool = None
+        self._poolConstraints = None
+
+    def startPool(self, processes=None, failsSpeciesConstraints=None):
+        """
+        Start a pool of `processes` worker processes, one per CPU by default,
+        which :meth:`generateReactionsFromFamilies` then uses to apply the
+        reaction families concurrently whenever it is given the same
+        `failsSpeciesConstraints` function. The workers are forked from this
+        process, so they use the database and species constraints as they are
+        when the pool is started.
+        """
+        self.closePool()
+        self._pool = multiprocessing.Pool(processes, _initializeWorker, (self, failsSpeciesConstraints))
+        self._poolConstraints = failsSpeciesConstraints
+
+    def closePool(self):
+        """
+        Stop the pool of worker processes started by :meth:`startPool`, if any.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._poolConstraints = None
 
     def load(self, path, families=None, libraries=None, depositories=None):
         """
@@ -382,7 +492,7 @@ class KineticsDatabase(object):
         searches the depository.
         """
         reactionList = []
-        for entry in library.entries.values():
+        for entry in library.getEntriesMatching(reactants):
             if entry.item.matchesMolecules(reactants):
                 reaction = LibraryReaction(
                     reactants = entry.item.reactants[:],
@@ -399,24 +509,89 @@ class KineticsDatabase(object):
             reactionList = filterReactions(reactants, products, reactionList)
         return reactionList
 
+    def setEstimateCache(self, path):
+        """
+        Store the rate rule estimates of all of the loaded families in the
+        SQLite database file at `path`, so they can be reused by later jobs
+        that load the same rate rules and groups. Pass ``None`` to stop using
+        the file.
+        """
+        for label in sorted(self.families):
+            self.families[label].setEstimateCache(path)
+
+    def getTemplateMask(self, molecules):
+        """
+        Return a bitmask of the bimolecular family template reactants matched
+        by any of the given `molecules`, which may be a single
+        :class:`Molecule` or a list of resonance isomers. The four bits
+        returned by :meth:`KineticsFamily.getReactantMask` for each family are
+        stored in turn, with the families sorted by label, so the mask is only
+        valid while the set of loaded families is unchanged.
+        """
+        if not isinstance(molecules, list):
+            molecules = [molecules]
+        mask = 0
+        for index, label in enumerate(sorted(self.families)):
+            for molecule in molecules:
+                mask |= self.families[label].getReactantMask(molecule) << (4 * index)
+        return mask
+
+    def getCompatibleFamilies(self, maskA, maskB):
+        """
+        Return the labels of the families in which two reactants with the
+        template masks `maskA` and `maskB` from :meth:`getTemplateMask` fill
+        complementary template reactants, in either order, and so may react.
+        """
+        # Bits 0 and 2 of each family are set where A fills the first
+        # reactant of a template and B the second, or vice versa
+        pairs = (maskA & (maskB >> 1)) | ((maskA >> 1) & maskB)
+        families = []
+        for index, label in enumerate(sorted(self.families)):
+            if (pairs >> (4 * index)) & 5:
+                families.append(label)
+        return families
+
     def generateReactionsFromFamilies(self, reactants, products, only_families=None, failsSpeciesConstraints=None):
         """
         Generate all reactions between the provided list of one or two
         `reactants`, which should be :class:`Molecule` objects. This method
         applies the reaction family.
         If `only_families` is a list of strings, only families with those labels
-        are used.
-        """
+        are used. If a pool of worker processes was started with
+        :meth:`startPool` for the same `failsSpeciesConstraints`, the families
+        are applied concurrently by the workers. The reactions are returned
+        family by family in the same order of families either way, but the
+        workers rebuild the reactants from their adjacency lists, so the
+        reactions within a family may come in a different order.
+        """
+        usePool = self._pool is not None and self._poolConstraints == failsSpeciesConstraints
+
+        # Skip the families in which the two reactants cannot fill
+        # complementary template reactants; with a pool this would only add
+        # serial work to this process, and the callers that use the pool
+        # already pass the families found from the species' cached masks
+        if len(reactants) == 2 and not usePool:
+            families = self.getCompatibleFamilies(self.getTemplateMask(reactants[0]), self.getTemplateMask(reactants[1]))
+            if only_families is not None:
+                families = [label for label in families if label in only_families]
+            only_families = families
+
         # If there are two structures and they are the same, then make a copy
-        # of the second one so we can independently manipulate both of them 
+        # of the second one so we can independently manipulate both of them
         # This is for the case where A + A --> products
         if len(reactants) == 2 and reactants[0] == reactants[1]:
             reactants[1] = reactants[1].copy(deep=True)
-        
+
         reactionList = []
-        for label, family in self.families.iteritems():
-            if only_families is None or label in only_families:
-                reactionList.extend(family.generateReactions(reactants, failsSpeciesConstraints=failsSpeciesConstraints))
+        labels = [label for label in self.families if only_families is None or label in only_families]
+        if usePool and len(labels) > 1:
+            adjlists = [molecule.toAdjacencyList() for molecule in reactants]
+            results = self._pool.map(_generateFamilyReactions, [(label, adjlists) for label in labels], 1)
+            for label, packedReactions in zip(labels, results):
+                reactionList.extend([_unpackReaction(self.families[label], packedReaction) for packedReaction in packedReactions])
+        else:
+            for label in labels:
+                reactionList.extend(self.families[label].generateReactions(reactants, failsSpeciesConstraints=failsSpeciesConstraints))
         if products:
             reactionList = filterReactions(reactants, products, reactionList)
         return reactionList
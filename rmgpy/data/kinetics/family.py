@@ -35,6 +35,7 @@ This module contains functionality for working with kinetics libraries.
 import os.path
 import logging
 import codecs
+import hashlib
 from copy import deepcopy
 
 from rmgpy.data.base import Database, Entry, LogicNode, LogicOr, ForbiddenStructures,\
@@ -197,9 +198,11 @@ class ReactionRecipe:
         structures. The `doForward` parameter is used to indicate
         whether the forward or reverse recipe should be applied. The atoms in
         the structure should be labeled with the appropriate atom centers.
+        Returns a list of the atoms changed by the recipe.
         """
 
         pattern = isinstance(struct, Group)
+        changedAtoms = []
 
         for action in self.actions:
             if action[0] in ['CHANGE_BOND', 'FORM_BOND', 'BREAK_BOND']:
@@ -216,6 +219,8 @@ class ReactionRecipe:
                 atom2 = struct.getLabeledAtom(label2)
                 if atom1 is None or atom2 is None or atom1 is atom2:
                     raise InvalidActionError('Invalid atom labels encountered.')
+                changedAtoms.append(atom1)
+                changedAtoms.append(atom2)
 
                 # Apply the action
                 if action[0] == 'CHANGE_BOND':
@@ -253,6 +258,7 @@ class ReactionRecipe:
                 atom = struct.getLabeledAtom(label)
                 if atom is None:
                     raise InvalidActionError('Unable to find atom with label "{0}" while applying reaction recipe.'.format(label))
+                changedAtoms.append(atom)
 
                 # Apply the action
                 for i in range(change):
@@ -270,6 +276,7 @@ class ReactionRecipe:
                 atom = struct.getLabeledAtom(label)
                 if atom is None:
                     raise InvalidActionError('Unable to find atom with label "{0}" while applying reaction recipe.'.format(label))
+                changedAtoms.append(atom)
 
                 # Apply the action
                 for i in range(change):
@@ -282,18 +289,72 @@ class ReactionRecipe:
                 raise InvalidActionError('Unknown action "' + action[0] + '" encountered.')
 
         struct.updateConnectivityValues()
+        if not pattern:
+            # The atoms and bonds were modified in place
+            struct.resetFingerprint()
+
+        return changedAtoms
+
+    def countProducts(self, atoms, doForward):
+        """
+        Return the number of separate structures that applying the recipe
+        would give, found by following the bonds formed and broken by the
+        recipe on the reactant structures themselves, which are not modified.
+        The `atoms` parameter is the list of all of the atoms of the reactant
+        structures, and the labeled atoms among them should be tagged as they
+        would be when the recipe is applied. Returns ``None`` if the number
+        cannot be found this way, e.g. if the labels are not unique.
+        """
+        labeledAtoms = {}
+        for atom in atoms:
+            if atom.label != '':
+                if atom.label in labeledAtoms: return None
+                labeledAtoms[atom.label] = atom
+
+        # Find the bonds that will be formed and broken
+        formed = []; broken = set()
+        for action in self.actions:
+            if action[0] in ['FORM_BOND', 'BREAK_BOND']:
+                atom1 = labeledAtoms.get(action[1]); atom2 = labeledAtoms.get(action[3])
+                if atom1 is None or atom2 is None: return None
+                if (action[0] == 'FORM_BOND') == doForward:
+                    formed.append((atom1, atom2))
+                else:
+                    broken.add((atom1, atom2)); broken.add((atom2, atom1))
+        for atom1, atom2 in formed:
+            if (atom1, atom2) in broken: return None
+
+        # Count the connected components of the resulting graph
+        parents = {}
+        for atom in atoms:
+            parents[atom] = atom
+        def find(atom):
+            while parents[atom] is not atom:
+                parents[atom] = parents[parents[atom]]
+                atom = parents[atom]
+            return atom
+        count = len(atoms)
+        bonds = [(atom1, atom2) for atom1 in atoms for atom2 in atom1.edges if (atom1, atom2) not in broken]
+        for atom1, atom2 in bonds + formed:
+            root1 = find(atom1); root2 = find(atom2)
+            if root1 is not root2:
+                parents[root1] = root2
+                count -= 1
+        return count
 
     def applyForward(self, struct, unique=True):
         """
         Apply the forward reaction recipe to `molecule`, a single
-        :class:`Molecule` object.
+        :class:`Molecule` object. Returns a list of the atoms changed by the
+        recipe.
         """
         return self.__apply(struct, True, unique)
 
     def applyReverse(self, struct, unique=True):
         """
         Apply the reverse reaction recipe to `molecule`, a single
-        :class:`Molecule` object.
+        :class:`Molecule` object. Returns a list of the atoms changed by the
+        recipe.
         """
         return self.__apply(struct, False, unique)
 
@@ -353,6 +414,9 @@ class KineticsFamily(Database):
         self.groups = None
         self.rules = None
         self.depositories = []
+        # The file storing the rate rules made by averaging
+        self.averagedRulesPath = None
+        self._forbiddenIndex = None
 
     def __repr__(self):
         return '<ReactionFamily "{0}">'.format(self.label)
@@ -553,6 +617,7 @@ class KineticsFamily(Database):
         self.rules = KineticsRules(label='{0}/rules'.format(self.label))
         logging.debug("Loading kinetics family rules from {0}".format(os.path.join(path, 'rules.py')))
         self.rules.load(os.path.join(path, 'rules.py'), local_context, global_context)
+        self.averagedRulesPath = os.path.join(path, 'averagedRules.pkl')
         # load the groups indicated in the entry label
         for label, entries in self.rules.entries.iteritems():
             nodes = label.split(';')
@@ -926,6 +991,9 @@ class KineticsFamily(Database):
             except KeyError:
                 self.rules.entries[new_entry.label] = [new_entry]
             index += 1
+
+        # The new rate rules change the estimates
+        self.rules.resetEstimates()
     
     def getRootTemplate(self):
         """
@@ -939,15 +1007,51 @@ class KineticsFamily(Database):
         else:
             return self.groups.top
     
+    def getAveragingHash(self):
+        """
+        Return a hash of the rate rules, the group trees and the root template
+        of the family, which together determine the rate rules made by
+        averaging.
+        """
+        contentHash = hashlib.sha1(self.rules.getContentHash())
+        for label in sorted(self.groups.entries):
+            entry = self.groups.entries[label]
+            contentHash.update(repr((label, entry.parent.label if entry.parent else None, [child.label for child in entry.children])))
+        contentHash.update(repr([entry.label for entry in self.getRootTemplate()]))
+        return contentHash.hexdigest()
+
+    def setEstimateCache(self, path):
+        """
+        Store the rate rule estimates of the family in the SQLite database
+        file at `path`, so they can be reused by later jobs that load the same
+        rate rules and groups. Pass ``None`` to stop using the file.
+        """
+        self.rules.setEstimateCache(path, self.getAveragingHash)
+
     def fillKineticsRulesByAveragingUp(self, rootTemplate=None, alreadyDone=None):
         """
         Fill in gaps in the kinetics rate rules by averaging child nodes.
+        When starting from the top-level nodes, the averaged rules are saved
+        next to the family's database files and reused by later calls, as
+        long as :meth:`getAveragingHash` is unchanged.
         """
-        # If no template is specified, then start at the top-level nodes
-        if rootTemplate is None:
-            rootTemplate = self.getRootTemplate()
-            alreadyDone = {}
-        self.rules.fillRulesByAveragingUp(rootTemplate, alreadyDone)
+        if rootTemplate is not None:
+            self.rules.fillRulesByAveragingUp(rootTemplate, alreadyDone)
+            return
+
+        # Start at the top-level nodes
+        rootTemplate = self.getRootTemplate()
+        path = self.averagedRulesPath
+        if path is not None:
+            contentHash = self.getAveragingHash()
+            if self.rules.loadAveragedRules(path, contentHash, self.groups):
+                return
+        entries = dict(self.rules.entries)
+        self.rules.fillRulesByAveragingUp(rootTemplate, {})
+        if path is not None:
+            # The averaged rules are the ones whose list of entries was replaced
+            labels = [label for label in sorted(self.rules.entries) if self.rules.entries[label] is not entries.get(label)]
+            self.rules.saveAveragedRules(path, contentHash, labels)
 
     def applyRecipe(self, reactantStructures, forward=True, unique=True):
         """
@@ -962,6 +1066,30 @@ class KineticsFamily(Database):
         # we need the label of the reaction family for this
         label = self.label.lower()
 
+        if not forward: template = self.reverseTemplate
+        else:           template = self.forwardTemplate
+        recipe = self.forwardRecipe if forward else self.reverseRecipe
+
+        # Before copying the reactant structures, check that the recipe will
+        # make the expected number of products by following its bond changes
+        # on the reactant structures themselves (see below for why a
+        # different number of products means the template does not match)
+        if isinstance(reactantStructures[0], Molecule):
+            atoms = []
+            for s in reactantStructures: atoms.extend(s.atoms)
+            if label == 'r_recombination' and forward:
+                # The recipe refers to the identically tagged centers as '*1'
+                # and '*2', which is done on the copies below
+                labels = [atom.label for atom in atoms]
+                centers = [atom for atom in atoms if atom.label == '*']
+                for index, atom in enumerate(centers): atom.label = '*' + str(index + 1)
+                count = recipe.countProducts(atoms, True)
+                for atom, atomLabel in zip(atoms, labels): atom.label = atomLabel
+            else:
+                count = recipe.countProducts(atoms, True)
+            if count is not None and count != len(template.products):
+                return None
+
         # Merge reactant structures into single structure
         # Also copy structures so we don't modify the originals
         # Since the tagging has already occurred, both the reactants and the
@@ -987,10 +1115,7 @@ class KineticsFamily(Database):
                 raise Exception('Unable to change labels from "*" to "*1" and "*2" for reaction family {0}.'.format(label))
 
         # Generate the product structure by applying the recipe
-        if forward:
-            self.forwardRecipe.applyForward(reactantStructure, unique)
-        else:
-            self.reverseRecipe.applyForward(reactantStructure, unique)
+        changedAtoms = recipe.applyForward(reactantStructure, unique)
         productStructure = reactantStructure
 
         # Hardcoding of reaction family for reverse of radical recombination
@@ -1037,13 +1162,10 @@ class KineticsFamily(Database):
                 atomLabels['*3'].label = '*5'
                 atomLabels['*5'].label = '*3'
 
-        if not forward: template = self.reverseTemplate
-        else:           template = self.forwardTemplate
-
         # Split product structure into multiple species if necessary
+        # The connectivity values were already updated on the whole structure
+        # when the recipe was applied, and do not change on splitting it
         productStructures = productStructure.split()
-        for product in productStructures:
-            product.updateConnectivityValues()
 
         # Make sure we've made the expected number of products
         if len(template.products) != len(productStructures):
@@ -1064,10 +1186,11 @@ class KineticsFamily(Database):
                 productStructures[1].containsLabeledAtom('*1'):
                 productStructures.reverse()
 
-        # If product structures are Molecule objects, update their atom types
+        # If product structures are Molecule objects, update the atom types
+        # of the atoms changed by the recipe and their neighbors
         for struct in productStructures:
             if isinstance(struct, Molecule):
-                struct.updateAtomTypes()
+                struct.updateAtomTypes(changedAtoms)
                 struct.updateMultiplicity()
 
         # Return the product structures
@@ -1137,11 +1260,16 @@ class KineticsFamily(Database):
         ``False`` otherwise. 
         """
         from rmgpy.data.rmg import database
-        if self.forbidden is not None and self.forbidden.isMoleculeForbidden(molecule):
-            return True
-        if database.forbiddenStructures.isMoleculeForbidden(molecule):
-            return True
-        return False
+        if self.forbidden is None:
+            return database.forbiddenStructures.isMoleculeForbidden(molecule)
+        # Screen the family's forbidden groups and the global forbidden
+        # structures with one prefilter index, which is merged again only
+        # when one of the two indices is rebuilt
+        familyIndex = self.forbidden.getIndex()
+        globalIndex = database.forbiddenStructures.getIndex()
+        if self._forbiddenIndex is None or self._forbiddenIndex[0] is not familyIndex or self._forbiddenIndex[1] is not globalIndex:
+            self._forbiddenIndex = (familyIndex, globalIndex, familyIndex + globalIndex)
+        return database.forbiddenStructures.isMoleculeForbidden(molecule, self._forbiddenIndex[2])
 
     def __createReaction(self, reactants, products, isForward):
         """
@@ -1183,19 +1311,49 @@ class KineticsFamily(Database):
         """
         Return ``True`` if the provided reactant matches the provided
         template reactant and ``False`` if not, along with a complete list of the
-        mappings.
+        mappings. The mappings are cached on the reactant, so each molecule is
+        only matched once against each template reactant.
         """
 
         if isinstance(templateReactant, list): templateReactant = templateReactant[0]
         struct = templateReactant.item
-        
+
+        if reactant.templateMappings is None:
+            reactant.templateMappings = {}
+        elif templateReactant in reactant.templateMappings:
+            return reactant.templateMappings[templateReactant]
+
         if isinstance(struct, LogicNode):
             mappings = []
             for child_structure in struct.getPossibleStructures(self.groups.entries):
                 mappings.extend(reactant.findSubgraphIsomorphisms(child_structure))
-            return mappings
         elif isinstance(struct, Group):
-            return reactant.findSubgraphIsomorphisms(struct)
+            mappings = reactant.findSubgraphIsomorphisms(struct)
+        else:
+            return None
+        reactant.templateMappings[templateReactant] = mappings
+        return mappings
+
+    def getReactantMask(self, reactant):
+        """
+        Return a four-bit mask of the bimolecular template reactants matched
+        by the :class:`Molecule` `reactant`. Bits 0 and 1 are set if the
+        reactant matches the first and second reactant of the forward
+        template, and bits 2 and 3 likewise for the reverse template, which is
+        only used if the family is not its own reverse. Two molecules can only
+        react in this family if they fill complementary bits.
+        """
+        mask = 0
+        templates = [self.forwardTemplate]
+        if not self.ownReverse:
+            templates.append(self.reverseTemplate)
+        for index, template in enumerate(templates):
+            if template is None or len(template.reactants) != 2:
+                continue
+            for slot in range(2):
+                if self.__matchReactantToTemplate(reactant, template.reactants[slot]):
+                    mask |= 1 << (2 * index + slot)
+        return mask
 
     def generateReactions(self, reactants, failsSpeciesConstraints=None):
         """
@@ -1215,17 +1373,7 @@ class KineticsFamily(Database):
         if self.ownReverse:
             # for each reaction, make its reverse reaction and store in a 'reverse' attribute
             for rxn in reactionList:
-                reactions = self.__generateReactions(rxn.products, products=rxn.reactants, forward=True, failsSpeciesConstraints=failsSpeciesConstraints)
-                if len(reactions) != 1:
-                    logging.error("Expecting one matching reverse reaction, not {0} in reaction family {1} for forward reaction {2}.\n".format(len(reactions), self.label, str(rxn)))
-                    for reactant in rxn.reactants:
-                        logging.info("Reactant")
-                        logging.info(reactant.toAdjacencyList())
-                    for product in rxn.products:
-                        logging.info("Product")
-                        logging.info(product.toAdjacencyList())
-                    raise KineticsError("Did not find reverse reaction in reaction family {0} for reaction {1}.".format(self.label, str(rxn)))
-                rxn.reverse = reactions[0]
+                rxn.reverse = self.__generateReverseReaction(rxn, failsSpeciesConstraints=failsSpeciesConstraints)
             
         else: # family is not ownReverse
             # Reverse direction (the direction in which kinetics is not defined)
@@ -1244,20 +1392,190 @@ class KineticsFamily(Database):
 
         return reactionList
     
+    def __generateReverseReaction(self, reaction, failsSpeciesConstraints=None):
+        """
+        For a `reaction` of a family that is its own reverse, freshly generated
+        in the forward direction, create and return the reverse reaction. For
+        the families whose product labels :meth:`applyRecipe` swaps back into
+        template order, the product structures of `reaction` are correctly
+        labeled for the reverse, so it is made by applying the recipe to them
+        directly. For other families the products are searched against the
+        template again.
+        """
+        if self.label.lower() not in ('h_abstraction', 'intra_h_migration'):
+            reactions = self.__generateReactions(reaction.products, products=reaction.reactants, forward=True, failsSpeciesConstraints=failsSpeciesConstraints)
+            if len(reactions) != 1:
+                logging.error("Expecting one matching reverse reaction, not {0} in reaction family {1} for forward reaction {2}.\n".format(len(reactions), self.label, str(reaction)))
+                for reactant in reaction.reactants:
+                    logging.info("Reactant")
+                    logging.info(reactant.toAdjacencyList())
+                for product in reaction.products:
+                    logging.info("Product")
+                    logging.info(product.toAdjacencyList())
+                raise KineticsError("Did not find reverse reaction in reaction family {0} for reaction {1}.".format(self.label, str(reaction)))
+            return reactions[0]
+
+        reactants = reaction.products
+        try:
+            products = self.applyRecipe(reactants, forward=True)
+        except InvalidActionError:
+            products = None
+        reverse = self.__createReaction(reactants, products, True) if products else None
+        if reverse is None:
+            logging.error("Unable to make the reverse reaction in reaction family {0} for forward reaction {1}.\n".format(self.label, str(reaction)))
+            for molecule in reactants:
+                logging.info("Product")
+                logging.info(molecule.toAdjacencyList())
+            raise KineticsError("Did not find reverse reaction in reaction family {0} for reaction {1}.".format(self.label, str(reaction)))
+
+        # Generate metadata while the reverse reactants are still labeled
+        reverse.pairs = self.getReactionPairs(reverse)
+        reverse.template = self.getReactionTemplate(reverse)
+        reverse.degeneracy = self.__calculateDegeneracy(reactants, reaction.reactants)
+        if reverse.degeneracy == 0:
+            raise KineticsError("Did not find reverse reaction in reaction family {0} for reaction {1}.".format(self.label, str(reaction)))
+
+        for molecule in reactants:
+            molecule.clearLabeledAtoms()
+        del reverse.labeledAtoms
+        return reverse
+
     def calculateDegeneracy(self, reaction):
         """
         For a `reaction` given in the direction in which the kinetics are
         defined, compute the reaction-path degeneracy.
         """
-        reactions = self.__generateReactions(reaction.reactants, products=reaction.products, forward=True)
-        if len(reactions) != 1:
+        degeneracy = self.__calculateDegeneracy(reaction.reactants, reaction.products)
+        if degeneracy == 0:
             for reactant in reaction.reactants:
                 logging.error(reactant)
             for product in reaction.products:
                 logging.error(product)
             raise Exception('Unable to calculate degeneracy for reaction {0} in reaction family {1}.'.format(reaction, self.label))
-        return reactions[0].degeneracy
+        return degeneracy
+
+    def __calculateDegeneracy(self, reactants, products):
+        """
+        Return the number of ways the forward template of this family can be
+        placed on the :class:`Molecule` objects `reactants` so that applying
+        the recipe gives the :class:`Molecule` objects `products`. Placements
+        related by an automorphism of the reactants that preserves the labels
+        always give the same products, so the placements are first grouped
+        into such classes and the recipe is applied once per class. The
+        labels of the reactants are cleared on return.
+        """
+        template = self.forwardTemplate
+        if len(reactants) != len(template.reactants):
+            return 0
+
+        # Enumerate the placements of the template in the same order that
+        # __generateReactions() does
+        if len(reactants) == 1:
+            mappings = self.__matchReactantToTemplate(reactants[0], template.reactants[0])
+            placements = [[mapA] for mapA in mappings]
+        else:
+            placements = []
+            for templateA, templateB in [(template.reactants[0], template.reactants[1]),
+                                         (template.reactants[1], template.reactants[0])]:
+                mappingsA = self.__matchReactantToTemplate(reactants[0], templateA)
+                mappingsB = self.__matchReactantToTemplate(reactants[1], templateB)
+                placements.extend([[mapA, mapB] for mapA in mappingsA for mapB in mappingsB])
+
+        # Group the placements into classes of equivalent placements
+        classes = []
+        for placement in placements:
+            for cls in classes:
+                if self.__isEquivalentPlacement(reactants, cls[0], placement):
+                    cls[1] += 1
+                    break
+            else:
+                classes.append([placement, 1])
+
+        # Apply the recipe once for each class and count the placements of
+        # the classes that give the expected products
+        productKey = tuple(sorted([product.getResonanceHash() for product in products]))
+        products = [product.generateResonanceIsomers() for product in products]
+        degeneracy = 0
+        for placement, count in classes:
+            try:
+                productStructures = self.__generateProductStructures(reactants, placement, True)
+            except ForbiddenStructureException:
+                continue
+            if productStructures is None:
+                continue
+            if tuple(sorted([product.getResonanceHash() for product in productStructures])) != productKey:
+                continue
+            if self.__matchProducts(productStructures, products):
+                degeneracy += count
+
+        for reactant in reactants:
+            reactant.clearLabeledAtoms()
+
+        # For R_Recombination reactions and for reactions of the form
+        # A + A -> products, each placement is counted twice
+        # This is hardcoding of reaction families!
+        sameReactants = len(reactants) == 2 and reactants[0].isIsomorphic(reactants[1])
+        if sameReactants or self.label.lower().startswith('r_recombination'):
+            assert(degeneracy % 2 == 0)
+            degeneracy /= 2
+        return degeneracy
+
+    def __isEquivalentPlacement(self, reactants, placement1, placement2):
+        """
+        Return ``True`` if the template placements `placement1` and
+        `placement2`, lists of mappings of the reactant atoms to the template
+        atoms, are related by an automorphism of the `reactants` that carries
+        each labeled atom of one placement onto the atom with the same label
+        in the other, or ``False`` if not (or if this cannot be decided
+        cheaply because a label appears more than once in a reactant).
+        """
+        for reactant, map1, map2 in zip(reactants, placement1, placement2):
+            atoms1 = {}; atoms2 = {}
+            for atoms, mapping in [(atoms1, map1), (atoms2, map2)]:
+                for atom, templateAtom in mapping.iteritems():
+                    if templateAtom.label in atoms: return False
+                    atoms[templateAtom.label] = atom
+            if set(atoms1) != set(atoms2):
+                return False
+            initialMap = {}
+            for label, atom1 in atoms1.iteritems():
+                atom2 = atoms2[label]
+                if not atom1.equivalent(atom2): return False
+                initialMap[atom1] = atom2
+            # The initial mapping itself is not checked by the isomorphism
+            # search, so check the bonds between the mapped atoms here
+            for atom1, atom2 in initialMap.iteritems():
+                for other1, other2 in initialMap.iteritems():
+                    if reactant.hasBond(atom1, other1):
+                        if not reactant.hasBond(atom2, other2): return False
+                        if not reactant.getBond(atom1, other1).equivalent(reactant.getBond(atom2, other2)): return False
+                    elif reactant.hasBond(atom2, other2):
+                        return False
+            if not reactant.isIsomorphic(reactant, initialMap):
+                return False
+        return True
         
+    def __matchProducts(self, products, isomers):
+        """
+        Return ``True`` if the list of :class:`Molecule` objects `products` is
+        isomorphic to one of the resonance isomers of each of the expected
+        products, in either order, or ``False`` if not. The `isomers` parameter
+        is a list containing the list of resonance isomers of each expected
+        product.
+        """
+        if len(products) == len(isomers) == 1:
+            for product in isomers[0]:
+                if products[0].isIsomorphic(product):
+                    return True
+        elif len(products) == len(isomers) == 2:
+            for productA in isomers[0]:
+                for productB in isomers[1]:
+                    if products[0].isIsomorphic(productA) and products[1].isIsomorphic(productB):
+                        return True
+                    elif products[0].isIsomorphic(productB) and products[1].isIsomorphic(productA):
+                        return True
+        return False
+
     def __generateReactions(self, reactants, products=None, forward=True, failsSpeciesConstraints=None):
         """
         Generate a list of all of the possible reactions of this family between
@@ -1361,79 +1679,49 @@ class KineticsFamily(Database):
         # don't generate the given products
         if products is not None:
             
+            productKey = tuple(sorted([product.getResonanceHash() for product in products]))
             products = [product.generateResonanceIsomers() for product in products]
             
             rxnList0 = rxnList[:]
             rxnList = []
-            index = 0
             for reaction in rxnList0:
             
                 products0 = reaction.products if forward else reaction.reactants
+                
+                # Skip reactions whose products can't be resonance isomers of
+                # the given products without checking isomorphism
+                if tuple(sorted([product.getResonanceHash() for product in products0])) != productKey:
+                    continue
                     
                 # Skip reactions that don't match the given products
-                match = False
-
-                if len(products) == len(products0) == 1:
-                    for product in products[0]:
-                        if products0[0].isIsomorphic(product):
-                            match = True
-                            break
-                elif len(products) == len(products0) == 2:
-                    for productA in products[0]:
-                        for productB in products[1]:
-                            if products0[0].isIsomorphic(productA) and products0[1].isIsomorphic(productB):
-                                match = True
-                                break
-                            elif products0[0].isIsomorphic(productB) and products0[1].isIsomorphic(productA):
-                                match = True
-                                break
-                    
-                if match: 
+                if self.__matchProducts(products0, products):
                     rxnList.append(reaction)
             
         # The reaction list may contain duplicates of the same reaction
         # These duplicates should be combined (by increasing the degeneracy of
         # one of the copies and removing the others)
-        index0 = 0
-        while index0 < len(rxnList):
-            reaction0 = rxnList[index0]
+        # Reactions are bucketed by the resonance hashes of their products, so
+        # only reactions in the same bucket need to be checked for isomorphism
+        # (we know the reactants are the same, so we only need to compare the
+        # products)
+        rxnList0 = rxnList
+        rxnList = []
+        buckets = {}
+        for reaction in rxnList0:
             
-            products0 = reaction0.products if forward else reaction0.reactants
-            products0 = [product.generateResonanceIsomers() for product in products0]
+            products = reaction.products if forward else reaction.reactants
+            bucket = buckets.setdefault(tuple(sorted([product.getResonanceHash() for product in products])), [])
             
-            # Remove duplicates from the reaction list
-            index = index0 + 1
-            while index < len(rxnList):
-                reaction = rxnList[index]
-            
-                products = reaction.products if forward else reaction.reactants
-                
-                # We know the reactants are the same, so we only need to compare the products
-                match = False
-                if len(products) == len(products0) == 1:
-                    for product in products0[0]:
-                        if products[0].isIsomorphic(product):
-                            match = True
-                            break
-                elif len(products) == len(products0) == 2:
-                    for productA in products0[0]:
-                        for productB in products0[1]:
-                            if products[0].isIsomorphic(productA) and products[1].isIsomorphic(productB):
-                                match = True
-                                break
-                            elif products[0].isIsomorphic(productB) and products[1].isIsomorphic(productA):
-                                match = True
-                                break
-                    
-                # If we found a match, remove it from the list
-                # Also increment the reaction path degeneracy of the remaining reaction
-                if match:
-                    rxnList.remove(reaction)
+            for reaction0, products0 in bucket:
+                # If we found a match, drop this reaction and increment the
+                # reaction path degeneracy of the remaining one
+                if self.__matchProducts(products, products0):
                     reaction0.degeneracy += 1
-                else:
-                    index += 1
-            
-            index0 += 1
+                    break
+            else:
+                products0 = [product.generateResonanceIsomers() for product in products]
+                bucket.append((reaction, products0))
+                rxnList.append(reaction)
         
         # For R_Recombination reactions, the degeneracy is twice what it should
         # be, so divide those by two
@@ -1,10 +1,98 @@
 import os
+import cPickle
+import shutil
+import tempfile
 import unittest 
 from external.wip import work_in_progress
 
 from rmgpy import settings
 from rmgpy.data.kinetics.database import KineticsDatabase
-from rmgpy.data.base import DatabaseError
+from rmgpy.data.kinetics.library import KineticsLibrary
+from rmgpy.data.kinetics.rules import KineticsRules
+from rmgpy.data.base import Database, DatabaseError, Entry
+from rmgpy.kinetics import Arrhenius, ArrheniusEP
+from rmgpy.molecule import Molecule
+from rmgpy.reaction import Reaction
+from rmgpy.species import Species
+from rmgpy.data.base import ForbiddenStructures
+from rmgpy.data.kinetics.family import KineticsFamily
+import rmgpy.data.rmg
+
+###################################################
+
+# The groups of small reaction families used as test fixtures
+familyGroups = {
+    'H_Abstraction': """
+template(reactants=["X_H", "Y_rad"], products=["X_H", "Y_rad"], ownReverse=True)
+reverse = "H_Abstraction"
+recipe(actions=[
+    ['BREAK_BOND', '*1', 'S', '*2'],
+    ['FORM_BOND', '*2', 'S', '*3'],
+    ['GAIN_RADICAL', '*1', '1'],
+    ['LOSE_RADICAL', '*3', '1'],
+])
+entry(index=1, label="X_H", group=\"\"\"
+1 *1 R u0 {2,S}
+2 *2 H u0 {1,S}
+\"\"\", kinetics=None)
+entry(index=2, label="Y_rad", group=\"\"\"
+1 *3 R u1
+\"\"\", kinetics=None)
+tree(\"\"\"
+L1: X_H
+L1: Y_rad
+\"\"\")
+""",
+    'intra_H_migration': """
+template(reactants=["RnH"], products=["RnH"], ownReverse=True)
+reverse = "intra_H_migration"
+recipe(actions=[
+    ['BREAK_BOND', '*2', 'S', '*3'],
+    ['FORM_BOND', '*1', 'S', '*3'],
+    ['GAIN_RADICAL', '*2', '1'],
+    ['LOSE_RADICAL', '*1', '1'],
+])
+entry(index=1, label="RnH", group=\"\"\"
+1 *1 R!H u1 {4,S}
+2 *2 R!H u0 {3,S} {5,S}
+3 *3 H u0 {2,S}
+4 *4 R!H u0 {1,S} {5,S}
+5 *5 R!H u0 {2,S} {4,S}
+\"\"\", kinetics=None)
+tree(\"\"\"
+L1: RnH
+\"\"\")
+""",
+    'R_Recombination': """
+template(reactants=["Y_rad", "Y_rad"], products=["RR"], ownReverse=False)
+reverse = "Bond_Dissociation"
+recipe(actions=[
+    ['FORM_BOND', '*1', 'S', '*2'],
+    ['LOSE_RADICAL', '*1', '1'],
+    ['LOSE_RADICAL', '*2', '1'],
+])
+entry(index=1, label="Y_rad", group=\"\"\"
+1 * R u1
+\"\"\", kinetics=None)
+tree(\"\"\"
+L1: Y_rad
+\"\"\")
+""",
+}
+
+def makeFamilies(path, labels):
+    """
+    Write the fixture families with the given `labels` to the directory at
+    `path` in the layout of the kinetics families database.
+    """
+    for label in labels:
+        os.makedirs(os.path.join(path, label))
+        with open(os.path.join(path, label, 'groups.py'), 'w') as f:
+            f.write('name = "{0}/groups"\nshortDesc = u""\nlongDesc = u""\n'.format(label))
+            f.write(familyGroups[label])
+        with open(os.path.join(path, label, 'rules.py'), 'w') as f:
+            f.write('name = "{0}/rules"\nshortDesc = u""\nlongDesc = u""\n'.format(label))
+
 ###################################################
 
 class TestKineticsDatabase(unittest.TestCase):
@@ -23,4 +111,431 @@ class TestKineticsDatabase(unittest.TestCase):
         with self.assertRaises(DatabaseError):
             database.loadFamilies(path, families=['fake_family'])
         with self.assertRaises(DatabaseError):
-            database.loadFamilies(path, families=[])
\ No newline at end of file
+            database.loadFamilies(path, families=[])
+
+    def testGetCompatibleFamilies(self):
+        """
+        Test that only the families in which two reactants fill complementary
+        template reactants are returned
+        """
+        database = KineticsDatabase()
+        database.families = {'Family_A': None, 'Family_B': None, 'Family_C': None}
+        # Reactant 1 fills the first forward slot of Family_A, the second
+        # reverse slot of Family_B and both forward slots of Family_C
+        mask1 = 0b0001 | (0b1000 << 4) | (0b0011 << 8)
+        # Reactant 2 fills the second forward slot of Family_A, the second
+        # reverse slot of Family_B and the first forward slot of Family_C
+        mask2 = 0b0010 | (0b1000 << 4) | (0b0001 << 8)
+        self.assertEqual(database.getCompatibleFamilies(mask1, mask2), ['Family_A', 'Family_C'])
+        self.assertEqual(database.getCompatibleFamilies(mask2, mask1), ['Family_A', 'Family_C'])
+        self.assertEqual(database.getCompatibleFamilies(mask2, mask2), [])
+        self.assertEqual(database.getCompatibleFamilies(mask1, mask1), ['Family_C'])
+
+    def testGenerateReactionsFromLibrary(self):
+        """
+        Test that library reactions are found in either direction from the
+        reactants or products
+        """
+        H = Molecule().fromAdjacencyList("""
+        multiplicity 2
+        1 H u1 p0 c0
+        """)
+        H2 = Molecule().fromAdjacencyList("""
+        1 H u0 p0 c0 {2,S}
+        2 H u0 p0 c0 {1,S}
+        """)
+        CH3 = Molecule().fromAdjacencyList("""
+        multiplicity 2
+        1 C u1 p0 c0 {2,S} {3,S} {4,S}
+        2 H u0 p0 c0 {1,S}
+        3 H u0 p0 c0 {1,S}
+        4 H u0 p0 c0 {1,S}
+        """)
+        CH4 = Molecule().fromAdjacencyList("""
+        1 C u0 p0 c0 {2,S} {3,S} {4,S} {5,S}
+        2 H u0 p0 c0 {1,S}
+        3 H u0 p0 c0 {1,S}
+        4 H u0 p0 c0 {1,S}
+        5 H u0 p0 c0 {1,S}
+        """)
+        library = KineticsLibrary(label='test')
+        for index, (reactants, products) in enumerate([([CH3, H], [CH4]), ([CH4, H], [CH3, H2])]):
+            reaction = Reaction(
+                reactants=[Species(molecule=[molecule.copy(deep=True)]) for molecule in reactants],
+                products=[Species(molecule=[molecule.copy(deep=True)]) for molecule in products],
+            )
+            library.entries[index + 1] = Entry(index=index + 1, item=reaction, data=Arrhenius(A=(1e13, 'cm^3/(mol*s)'), n=0, Ea=(0, 'kJ/mol'), T0=(1, 'K')))
+        database = KineticsDatabase()
+        for reactants, indices in [([H, CH3], [1]), ([CH4], [1]), ([CH4, H], [2]), ([H2, CH3], [2]), ([CH3], []), ([CH4, CH3], [])]:
+            reactions = database.generateReactionsFromLibrary(reactants, None, library)
+            self.assertEqual([reaction.entry.index for reaction in reactions], indices)
+
+###################################################
+
+class TestKineticsDatabasePool(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Load a kinetics database of the fixture families with an empty set of
+        global forbidden structures
+        """
+        self.directory = tempfile.mkdtemp()
+        self.database = rmgpy.data.rmg.database
+        rmgpy.data.rmg.database = Database()
+        rmgpy.data.rmg.database.forbiddenStructures = ForbiddenStructures()
+        makeFamilies(self.directory, familyGroups.keys())
+        self.kineticsDatabase = KineticsDatabase()
+        self.kineticsDatabase.loadFamilies(self.directory, families=sorted(familyGroups.keys()), depositories=[])
+
+    def tearDown(self):
+        self.kineticsDatabase.closePool()
+        rmgpy.data.rmg.database = self.database
+        shutil.rmtree(self.directory)
+
+    def generateReactions(self, adjlists):
+        """
+        Return the labels of the families of the reactions generated between
+        the reactants with the given heavy atom adjacency lists, and a sorted
+        description of each reaction and its reverse
+        """
+        def describe(reaction):
+            # The reverse reactions are made of molecules rather than species
+            molecules = [spec.molecule[0] if isinstance(spec, Species) else spec for spec in reaction.products]
+            return (reaction.family.label, reaction.degeneracy, [entry.label for entry in reaction.template],
+                sorted([(len(molecule.atoms), molecule.getNumberOfRadicalElectrons()) for molecule in molecules]))
+        reactions = self.kineticsDatabase.generateReactionsFromFamilies([Molecule().fromAdjacencyList(adjlist, saturateH=True) for adjlist in adjlists], None)
+        descriptions = []
+        for reaction in reactions:
+            self.assertTrue(all([isinstance(spec, Species) for spec in reaction.reactants + reaction.products]))
+            reverse = getattr(reaction, 'reverse', None)
+            if reverse is not None:
+                self.assertEqual(len(reverse.reactants), len(reaction.products))
+                for molecule in reverse.reactants:
+                    self.assertTrue(any([spec.isIsomorphic(molecule) for spec in reaction.products]))
+                for molecule in reverse.products:
+                    self.assertTrue(any([spec.isIsomorphic(molecule) for spec in reaction.reactants]))
+                reverse = describe(reverse)
+            descriptions.append((describe(reaction), reverse))
+        return [reaction.family.label for reaction in reactions], sorted(descriptions)
+
+    def testGenerateReactionsFromFamiliesInPool(self):
+        """
+        Test that the reaction families applied by a pool of worker processes
+        give the same reactions, with the same reverse reactions, degeneracies
+        and templates and in the same order of families, as when they are
+        applied in this process. The workers rebuild the reactants from their
+        adjacency lists, so the reactions of each family are compared sorted.
+        """
+        C3H8 = "1 C u0 {2,S}\n2 C u0 {1,S} {3,S}\n3 C u0 {2,S}"
+        C2H5 = "multiplicity 2\n1 C u1 {2,S}\n2 C u0 {1,S}"
+        nC5H11 = "multiplicity 2\n1 C u1 {2,S}\n2 C u0 {1,S} {3,S}\n3 C u0 {2,S} {4,S}\n4 C u0 {3,S} {5,S}\n5 C u0 {4,S}"
+        reactants = [[C3H8], [nC5H11], [C2H5, C2H5], [C3H8, C2H5], [C3H8, nC5H11]]
+        serial = [self.generateReactions(adjlists) for adjlists in reactants]
+        self.kineticsDatabase.startPool(2)
+        parallel = [self.generateReactions(adjlists) for adjlists in reactants]
+        self.kineticsDatabase.closePool()
+        self.assertEqual(set([label for families, descriptions in serial for label in families]), set(['H_Abstraction', 'intra_H_migration', 'R_Recombination']))
+        self.assertTrue(any([reverse is not None for families, descriptions in serial for forward, reverse in descriptions]))
+        self.assertEqual(parallel, serial)
+
+###################################################
+
+class TestKineticsLibrary(unittest.TestCase):
+
+    def testGetEntriesMatching(self):
+        """
+        Test that the entries whose reactants or products might match are
+        returned once each, in the order they are stored in the library
+        """
+        H = Molecule().fromAdjacencyList("multiplicity 2\n1 H u1")
+        CH3 = Molecule().fromAdjacencyList("multiplicity 2\n1 C u1", saturateH=True)
+        CH4 = Molecule().fromAdjacencyList("1 C u0", saturateH=True)
+        C2H6 = Molecule().fromAdjacencyList("1 C u0 {2,S}\n2 C u0 {1,S}", saturateH=True)
+        library = KineticsLibrary(label='Test')
+        for index, reactants, products in [
+            (3, [CH3, H], [CH4]),
+            (1, [CH3, CH3], [C2H6]),
+            (2, [CH4], [H, CH3]),
+            (4, [CH3, H], [CH3, H]),
+        ]:
+            library.entries[index] = Entry(index=index, label=str(index), item=Reaction(reactants=reactants, products=products))
+        self.assertEqual([entry.index for entry in library.getEntriesMatching([H, CH3])], [3, 2, 4])
+        self.assertEqual([entry.index for entry in library.getEntriesMatching([CH3, CH3])], [1])
+        self.assertEqual(library.getEntriesMatching([CH4, H]), [])
+        # The index is rebuilt when the library is modified
+        library.entries[0] = Entry(index=0, label='0', item=Reaction(reactants=[C2H6], products=[CH3, CH3]))
+        self.assertEqual([entry.index for entry in library.getEntriesMatching([CH3, CH3])], [1, 0])
+
+###################################################
+
+class TestKineticsFamily(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Load the fixture families with an empty set of global forbidden
+        structures
+        """
+        self.directory = tempfile.mkdtemp()
+        self.database = rmgpy.data.rmg.database
+        rmgpy.data.rmg.database = Database()
+        rmgpy.data.rmg.database.forbiddenStructures = ForbiddenStructures()
+        makeFamilies(self.directory, familyGroups.keys())
+        self.families = {}
+        for label in familyGroups:
+            self.families[label] = KineticsFamily(label=label)
+            self.families[label].load(os.path.join(self.directory, label), {}, {}, depositoryLabels=[])
+
+    def tearDown(self):
+        rmgpy.data.rmg.database = self.database
+        shutil.rmtree(self.directory)
+
+    def getReactions(self, label, adjlists):
+        """
+        Return the reactions of the family with the given `label` between the
+        reactants with the given heavy atom adjacency lists, with the
+        degeneracies and templates of each reaction and of its reverse
+        """
+        family = self.families[label]
+        reactions = family.generateReactions([Molecule().fromAdjacencyList(adjlist, saturateH=True) for adjlist in adjlists])
+        results = []
+        for reaction in reactions:
+            reverse = reaction.reverse
+            # The reverse found by matching the products against the template
+            matched = family._KineticsFamily__generateReactions([spec.molecule[0].copy(deep=True) for spec in reaction.products],
+                products=[spec.molecule[0] for spec in reaction.reactants], forward=True)
+            self.assertEqual(len(matched), 1)
+            self.assertEqual(reverse.degeneracy, matched[0].degeneracy)
+            self.assertEqual(reverse.template, matched[0].template)
+            self.assertEqual(len(reverse.reactants), len(matched[0].reactants))
+            for molecule in reverse.reactants:
+                self.assertTrue(any([molecule.isIsomorphic(other) for other in matched[0].reactants]))
+            for molecule in reverse.products:
+                self.assertTrue(any([molecule.isIsomorphic(other) for other in matched[0].products]))
+            self.assertEqual(family.calculateDegeneracy(Reaction(
+                reactants=[spec.molecule[0].copy(deep=True) for spec in reaction.reactants],
+                products=[spec.molecule[0].copy(deep=True) for spec in reaction.products],
+            )), reaction.degeneracy)
+            results.append((reaction.degeneracy, [entry.label for entry in reaction.template],
+                reverse.degeneracy, [entry.label for entry in reverse.template]))
+        return sorted(results)
+
+    def testEstimateCache(self):
+        """
+        Test that the rate rule estimates of a family are stored under a hash
+        of both its rate rules and its groups
+        """
+        path = os.path.join(self.directory, 'estimates.sqlite')
+        family = self.families['H_Abstraction']
+        family.setEstimateCache(path)
+        family.rules.loadEntry(index=1, label='X_H;Y_rad', rank=3, kinetics=ArrheniusEP(
+            A = (1e12, 'cm^3/(mol*s)'),
+            n = 0.5,
+            alpha = 0,
+            E0 = (10, 'kJ/mol'),
+        ))
+        family.getKineticsForTemplate(family.getRootTemplate())
+        contentHash = family.getAveragingHash()
+        self.assertNotEqual(contentHash, family.rules.getContentHash())
+        connection = family.rules._estimateCache
+        self.assertEqual([tuple(row) for row in connection.execute('SELECT rules, template FROM estimates')], [(contentHash, 'X_H;Y_rad')])
+        # Changing the group trees changes the hash
+        groupA = family.groups.entries['X_H']
+        groupA1 = Entry(index=3, label='C_H', parent=groupA)
+        groupA.children.append(groupA1)
+        family.groups.entries['C_H'] = groupA1
+        family.rules.resetEstimates()
+        self.assertNotEqual(family.getAveragingHash(), contentHash)
+        family.getKineticsForTemplate(family.getRootTemplate())
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM estimates').fetchone()[0], 2)
+
+    def testCountProducts(self):
+        """
+        Test that the number of products of a recipe is found from the
+        labeled reactants, and that a template is not applied where it would
+        give the wrong number of products
+        """
+        CH4 = Molecule().fromAdjacencyList("""
+        1 *1 C u0 p0 c0 {2,S} {3,S} {4,S} {5,S}
+        2 *2 H u0 p0 c0 {1,S}
+        3    H u0 p0 c0 {1,S}
+        4    H u0 p0 c0 {1,S}
+        5    H u0 p0 c0 {1,S}
+        """)
+        CH3 = Molecule().fromAdjacencyList("""
+        multiplicity 2
+        1 *3 C u1 p0 c0 {2,S} {3,S} {4,S}
+        2    H u0 p0 c0 {1,S}
+        3    H u0 p0 c0 {1,S}
+        4    H u0 p0 c0 {1,S}
+        """)
+        nC4H9 = Molecule().fromAdjacencyList("""
+        multiplicity 2
+        1 *1 C u1 p0 c0 {2,S}
+        2 *4 C u0 p0 c0 {1,S} {3,S}
+        3 *5 C u0 p0 c0 {2,S} {4,S}
+        4 *2 C u0 p0 c0 {3,S} {5,S}
+        5 *3 H u0 p0 c0 {4,S}
+        """, saturateH=True)
+        C2H6 = Molecule().fromAdjacencyList("""
+        1 *1 C u0 p0 c0 {2,S}
+        2 *2 C u0 p0 c0 {1,S}
+        """, saturateH=True)
+        cC3H6 = Molecule().fromAdjacencyList("""
+        1 *1 C u0 p0 c0 {2,S} {3,S}
+        2 *2 C u0 p0 c0 {1,S} {3,S}
+        3    C u0 p0 c0 {1,S} {2,S}
+        """, saturateH=True)
+        for label, forward, reactants, count in [
+            ('H_Abstraction', True, [CH4, CH3], 2),
+            ('intra_H_migration', True, [nC4H9], 1),
+            ('R_Recombination', False, [C2H6], 2),
+            ('R_Recombination', False, [cC3H6], 1),
+        ]:
+            family = self.families[label]
+            recipe = family.forwardRecipe if forward else family.reverseRecipe
+            atoms = [atom for molecule in reactants for atom in molecule.atoms]
+            adjlists = [molecule.toAdjacencyList() for molecule in reactants]
+            self.assertEqual(recipe.countProducts(atoms, True), count)
+            products = family.applyRecipe(reactants, forward=forward)
+            template = family.forwardTemplate if forward else family.reverseTemplate
+            if count == len(template.products):
+                self.assertEqual(len(products), count)
+            else:
+                # Breaking a ring bond gives one product, not two
+                self.assertTrue(products is None)
+            # The reactants are not modified
+            self.assertEqual([molecule.toAdjacencyList() for molecule in reactants], adjlists)
+        # The product count is not found if the labels are not unique
+        self.assertTrue(self.families['H_Abstraction'].forwardRecipe.countProducts(CH4.atoms + CH4.copy(deep=True).atoms, True) is None)
+
+    def testHydrogenAbstractionReverse(self):
+        """
+        Test that the reverse reactions and degeneracies of an own-reverse
+        family match those found by matching the template
+        """
+        CH4 = "1 C u0"
+        CH3 = "multiplicity 2\n1 C u1"
+        C2H5 = "multiplicity 2\n1 C u1 {2,S}\n2 C u0 {1,S}"
+        C3H8 = "1 C u0 {2,S}\n2 C u0 {1,S} {3,S}\n3 C u0 {2,S}"
+        template = ['X_H', 'Y_rad']
+        self.assertEqual(self.getReactions('H_Abstraction', [CH4, C2H5]), [(4, template, 6, template)])
+        self.assertEqual(self.getReactions('H_Abstraction', [C3H8, CH3]), [(2, template, 4, template), (6, template, 4, template)])
+        self.assertEqual(self.getReactions('H_Abstraction', [C3H8, C2H5]), [(2, template, 6, template), (6, template, 6, template)])
+
+    def testIntraHydrogenMigrationReverse(self):
+        """
+        Test that the reverse reactions and degeneracies of intra_H_migration
+        match those found by matching the template
+        """
+        nC5H11 = "multiplicity 2\n1 C u1 {2,S}\n2 C u0 {1,S} {3,S}\n3 C u0 {2,S} {4,S}\n4 C u0 {3,S} {5,S}\n5 C u0 {4,S}"
+        self.assertEqual(self.getReactions('intra_H_migration', [nC5H11]), [(2, ['RnH'], 3, ['RnH'])])
+
+###################################################
+
+class TestKineticsRules(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Make a set of rate rules with a single rule for the parent nodes
+        """
+        self.groupA = Entry(index=1, label='A')
+        self.groupA1 = Entry(index=2, label='A1', parent=self.groupA)
+        self.groupB = Entry(index=3, label='B')
+        self.groupA.children = [self.groupA1]
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def makeRules(self):
+        rules = KineticsRules(label='Test/rules')
+        rules.loadEntry(index=1, label='A;B', rank=3, kinetics=ArrheniusEP(
+            A = (1e12, 'cm^3/(mol*s)'),
+            n = 0.5,
+            alpha = 0,
+            E0 = (10, 'kJ/mol'),
+        ))
+        return rules
+
+    def testEstimateKinetics(self):
+        """
+        Test that rate rule estimates are memoized without the degeneracy
+        """
+        rules = self.makeRules()
+        kinetics1, entry1 = rules.estimateKinetics([self.groupA1, self.groupB], degeneracy=1)
+        kinetics2, entry2 = rules.estimateKinetics([self.groupA1, self.groupB], degeneracy=2)
+        self.assertIsNone(entry1)
+        self.assertIsNone(entry2)
+        self.assertAlmostEqual(kinetics2.A.value_si, 2 * kinetics1.A.value_si)
+        self.assertIn('Estimated using template (A;B)', kinetics1.comment)
+        self.assertNotIn('degeneracy', kinetics1.comment)
+        self.assertIn('Multiplied by reaction path degeneracy 2', kinetics2.comment)
+        kinetics3, entry3 = rules.estimateKinetics([self.groupA, self.groupB])
+        self.assertIs(entry3, rules.entries['A;B'][0])
+        self.assertIn('Exact match found', kinetics3.comment)
+        # Adding a rule for the child nodes must change the estimate
+        rules.loadEntry(index=2, label='A1;B', rank=3, kinetics=ArrheniusEP(
+            A = (1e11, 'cm^3/(mol*s)'),
+            n = 0.5,
+            alpha = 0,
+            E0 = (10, 'kJ/mol'),
+        ))
+        kinetics4, entry4 = rules.estimateKinetics([self.groupA1, self.groupB])
+        self.assertIs(entry4, rules.entries['A1;B'][0])
+        self.assertAlmostEqual(kinetics4.A.value_si, 0.1 * kinetics1.A.value_si)
+
+    def testEstimateCache(self):
+        """
+        Test that rate rule estimates are shared through the estimate cache
+        file by rate rules with the same content
+        """
+        path = os.path.join(self.directory, 'estimates.sqlite')
+        rules1 = self.makeRules()
+        rules1.setEstimateCache(path, rules1.getContentHash)
+        kinetics1, entry1 = rules1.estimateKinetics([self.groupA, self.groupB], degeneracy=2)
+        rules2 = self.makeRules()
+        rules2.setEstimateCache(path, rules2.getContentHash)
+        self.assertEqual(rules1.getContentHash(), rules2.getContentHash())
+        row = rules2._estimateCache.execute('SELECT entryLabel, entryIndex FROM estimates WHERE rules = ? AND template = ?',
+            (rules2.getContentHash(), 'A;B')).fetchone()
+        self.assertEqual(tuple(row), ('A;B', 1))
+        kinetics2, entry2 = rules2.estimateKinetics([self.groupA, self.groupB], degeneracy=2)
+        self.assertIs(entry2, rules2.entries['A;B'][0])
+        self.assertEqual(kinetics2.A.value_si, kinetics1.A.value_si)
+        self.assertEqual(kinetics2.comment, kinetics1.comment)
+        # The estimate cache file is not pickled
+        rules3 = cPickle.loads(cPickle.dumps(rules2, -1))
+        self.assertIsNone(rules3._estimateCache)
+        self.assertEqual(rules3.estimateKinetics([self.groupA, self.groupB], degeneracy=2)[0].A.value_si, kinetics1.A.value_si)
+
+    def testAveragedRules(self):
+        """
+        Test that averaged rate rules are saved and only reloaded for rules
+        and groups with the same content hash
+        """
+        groupA2 = Entry(index=4, label='A2', parent=self.groupA)
+        self.groupA.children.append(groupA2)
+        groups = Database()
+        groups.entries = {'A': self.groupA, 'A1': self.groupA1, 'A2': groupA2, 'B': self.groupB}
+        rules1 = KineticsRules(label='Test/rules')
+        for index, label, A in [(1, 'A1;B', 1e12), (2, 'A2;B', 1e10)]:
+            rules1.loadEntry(index=index, label=label, rank=3, kinetics=ArrheniusEP(
+                A = (A, 'cm^3/(mol*s)'),
+                n = 0.5,
+                alpha = 0,
+                E0 = (10, 'kJ/mol'),
+            ))
+        rules1.fillRulesByAveragingUp([self.groupA, self.groupB], {})
+        kinetics1 = rules1.entries['A;B'][0].data
+        self.assertAlmostEqual(kinetics1.A.value_si / 1e5, 1.0)
+        path = os.path.join(self.directory, 'averagedRules.pkl')
+        rules1.saveAveragedRules(path, 'hash', ['A;B'])
+        rules2 = KineticsRules(label='Test/rules')
+        self.assertFalse(rules2.loadAveragedRules(path, 'other hash', groups))
+        self.assertNotIn('A;B', rules2.entries)
+        self.assertTrue(rules2.loadAveragedRules(path, 'hash', groups))
+        entry = rules2.entries['A;B'][0]
+        self.assertEqual(entry.item, [self.groupA, self.groupB])
+        self.assertEqual(entry.rank, 10)
+        self.assertEqual(entry.data.A.value_si, kinetics1.A.value_si)
+        self.assertEqual(entry.data.comment, kinetics1.comment)
@@ -115,6 +115,7 @@ class KineticsLibrary(Database):
 
     def __init__(self, label='', name='', solvent=None, shortDesc='', longDesc=''):
         Database.__init__(self, label=label, name=name, shortDesc=shortDesc, longDesc=longDesc)
+        self._reactionIndex = None
         
     def __str__(self):
         return 'Kinetics Library {0}'.format(self.label)
@@ -213,9 +214,48 @@ class KineticsLibrary(Database):
         for entry in entries_to_remove:
             print "removing duplicate reaction with index {0}.".format(entry.index)
             del(self.entries[entry.index])
+        self._reactionIndex = None
         print "NB. the entries have not been renumbered, so these indices are missing."
         
         
+    def getReactionKeys(self, structures):
+        """
+        Return the set of keys that the reactants or products of a reaction,
+        given as a list of :class:`Species` or :class:`Molecule` objects
+        `structures`, can be indexed under. Each key is the sorted tuple of
+        the resonance hashes of one molecule of each species. Matching keys
+        are necessary (but not sufficient) for two sets of reactants to match.
+        """
+        keys = [()]
+        for structure in structures:
+            molecules = structure.molecule if isinstance(structure, Species) else [structure]
+            hashes = set([molecule.getResonanceHash() for molecule in molecules])
+            keys = [key + (h,) for key in keys for h in hashes]
+        return set([tuple(sorted(key)) for key in keys])
+
+    def getEntriesMatching(self, reactants):
+        """
+        Return the entries whose reactions might have the given list of
+        `reactants` as their reactants or products, in the order they are
+        stored in the library. The reactions are indexed by
+        :meth:`getReactionKeys` the first time this is called after the
+        library is loaded or modified, so each call only looks up the entries
+        with matching keys; use :meth:`Reaction.matchesMolecules` to check the
+        entries returned.
+        """
+        if self._reactionIndex is None or self._reactionIndex[0] != len(self.entries):
+            # Each entry is stored with its position in the library
+            index = {}
+            for position, entry in enumerate(self.entries.values()):
+                keys = self.getReactionKeys(entry.item.reactants) | self.getReactionKeys(entry.item.products)
+                for key in keys:
+                    index.setdefault(key, []).append((position, entry))
+            self._reactionIndex = (len(self.entries), index)
+        found = set()
+        for key in self.getReactionKeys(reactants):
+            found.update(self._reactionIndex[1].get(key, []))
+        return [entry for position, entry in sorted(found, key=lambda item: item[0])]
+
     def load(self, path, local_context=None, global_context=None):
         Database.load(self, path, local_context, global_context)
         
@@ -251,6 +291,7 @@ class KineticsLibrary(Database):
             if not rxn.isBalanced():
                 raise DatabaseError('Reaction {0} in kinetics library {1} was not balanced! Please reformulate.'.format(rxn, self.label))    
             
+        self._reactionIndex = None
         self.checkForDuplicates()
         
     def loadEntry(self,
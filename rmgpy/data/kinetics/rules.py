@@ -38,6 +38,11 @@ import os.path
 import re
 import codecs
 import math
+import hashlib
+import sqlite3
+import cPickle
+import logging
+import numpy
 from copy import  deepcopy
 
 from rmgpy.data.base import Database, Entry, DatabaseError, getAllCombinations
@@ -57,10 +62,82 @@ class KineticsRules(Database):
     
     def __init__(self, label='', name='', shortDesc='', longDesc=''):
         Database.__init__(self, label=label, name=name, shortDesc=shortDesc, longDesc=longDesc)
+        self._estimates = {}
+        self._estimateCache = None
+        self._estimateKey = None
+        self._getEstimateKey = None
+        self._contentHash = None
 
     def __repr__(self):
         return '<KineticsRules "{0}">'.format(self.label)
 
+    def __getstate__(self):
+        """
+        A helper function used when pickling a KineticsRules object. The
+        estimate cache file is not kept.
+        """
+        d = self.__dict__.copy()
+        d['_estimateCache'] = None
+        d['_estimateKey'] = None
+        d['_getEstimateKey'] = None
+        return d
+
+    def resetEstimates(self):
+        """
+        Discard the memoized kinetics estimates and content hashes, which
+        must be done whenever the rate rules are modified.
+        """
+        self._estimates = {}
+        self._estimateKey = None
+        self._contentHash = None
+
+    def getContentHash(self):
+        """
+        Return a hash of the label of the rate rules and the label, index,
+        rank and kinetics of each rule, identifying the estimates that these
+        rules give.
+        """
+        if self._contentHash is None:
+            contentHash = hashlib.sha1(self.label)
+            for label in sorted(self.entries):
+                for entry in self.entries[label]:
+                    contentHash.update(cPickle.dumps((label, entry.index, entry.rank, entry.data), 2))
+            self._contentHash = contentHash.hexdigest()
+        return self._contentHash
+
+    def setEstimateCache(self, path, getKey):
+        """
+        Also store the kinetics estimates in the SQLite database file at
+        `path`, creating it if necessary, so they can be reused by later jobs
+        that make the same estimates. Several sets of rate rules can share the
+        file, as the estimates are stored under the hash returned by the
+        function `getKey`. This hash must identify the group trees the
+        templates are taken from as well as the rate rules, as
+        :meth:`KineticsFamily.getAveragingHash` does. Pass ``None`` as the
+        `path` to stop using the file.
+        """
+        self._estimateKey = None
+        if path is None:
+            self._estimateCache = None
+            self._getEstimateKey = None
+            return
+        connection = sqlite3.connect(path, timeout=60)
+        # The file is only a cache, so don't wait for each write to reach the disk
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('CREATE TABLE IF NOT EXISTS estimates (rules TEXT, template TEXT, kinetics BLOB, entryLabel TEXT, entryIndex INTEGER, PRIMARY KEY (rules, template))')
+        connection.commit()
+        self._estimateCache = connection
+        self._getEstimateKey = getKey
+
+    def __getEstimateKey(self):
+        """
+        Return the hash under which the estimates are stored in the estimate
+        cache file.
+        """
+        if self._estimateKey is None:
+            self._estimateKey = self._getEstimateKey()
+        return self._estimateKey
+
     def loadEntry(self,
                   index,
                   kinetics=None,
@@ -90,6 +167,7 @@ class KineticsRules(Database):
             self.entries[label].append(entry)
         except KeyError:
             self.entries[label] = [entry]
+        self.resetEstimates()
         return entry
 
     def saveEntry(self, f, entry):
@@ -185,6 +263,7 @@ class KineticsRules(Database):
                 self.entries[label].append(entry)
             except KeyError:
                 self.entries[label] = [entry]
+        self.resetEstimates()
         self.__loadOldComments(path)
     
     def __loadOldComments(self, path):
@@ -452,12 +531,61 @@ class KineticsRules(Database):
                 rank = 10, # Indicates this is an averaged estimate
             )
             self.entries[entry.label] = [entry]
+            self.resetEstimates()
             alreadyDone[rootLabel] = entry.data
             return entry.data
             
         alreadyDone[rootLabel] = None
         return None
 
+    def saveAveragedRules(self, path, contentHash, labels):
+        """
+        Save the rate rules with the given `labels`, which were made by
+        averaging, to the file at `path`, along with the `contentHash` that
+        identifies the rules and groups they were averaged from.
+        """
+        averagedRules = [(label, self.entries[label][0].data) for label in labels]
+        try:
+            f = open(path, 'wb')
+            try:
+                cPickle.dump((contentHash, averagedRules), f, 2)
+            finally:
+                f.close()
+        except IOError:
+            logging.warning('Unable to save averaged rate rules for {0} to "{1}".'.format(self.label, path))
+
+    def loadAveragedRules(self, path, contentHash, groups):
+        """
+        Load the rate rules saved to the file at `path` by
+        :meth:`saveAveragedRules`, using the given kinetics `groups` for their
+        templates, if they were averaged from rules and groups with the same
+        `contentHash`. Returns ``True`` if the rules were loaded or ``False``
+        if they must be averaged again.
+        """
+        if not os.path.exists(path):
+            return False
+        try:
+            f = open(path, 'rb')
+            try:
+                savedHash, averagedRules = cPickle.load(f)
+            finally:
+                f.close()
+        except Exception:
+            logging.warning('Unable to load averaged rate rules for {0} from "{1}".'.format(self.label, path))
+            return False
+        if savedHash != contentHash:
+            return False
+        for label, kinetics in averagedRules:
+            self.entries[label] = [Entry(
+                index = 0,
+                label = label,
+                item = [groups.entries[node] for node in label.split(';')],
+                data = kinetics,
+                rank = 10, # Indicates this is an averaged estimate
+            )]
+        self.resetEstimates()
+        return True
+
     def __getAverageKinetics(self, kineticsList):
         """
         Based on averaging log k. For most complex case:
@@ -467,17 +595,9 @@ class KineticsRules(Database):
         Hence we average n, Ea, and alpha arithmetically, but we
         average log A (geometric average) 
         """
-        logA = 0.0; n = 0.0; E0 = 0.0; alpha = 0.0
-        count = len(kineticsList)
-        for kinetics in kineticsList:
-            logA += math.log10(kinetics.A.value_si)
-            n += kinetics.n.value_si
-            alpha += kinetics.alpha.value_si
-            E0 += kinetics.E0.value_si
-        logA /= count
-        n /= count
-        alpha /= count
-        E0 /= count
+        values = numpy.array([[kinetics.A.value_si, kinetics.n.value_si, kinetics.alpha.value_si, kinetics.E0.value_si] for kinetics in kineticsList])
+        values[:,0] = numpy.log10(values[:,0])
+        logA, n, alpha, E0 = [float(value) for value in values.mean(axis=0)]
         Aunits = kineticsList[0].A.units
         if Aunits == 'cm^3/(mol*s)' or Aunits == 'cm^3/(molecule*s)' or Aunits == 'm^3/(molecule*s)':
             Aunits = 'm^3/(mol*s)'
@@ -498,7 +618,78 @@ class KineticsRules(Database):
     def estimateKinetics(self, template, degeneracy=1):
         """
         Determine the appropriate kinetics for a reaction with the given
-        `template` using rate rules.
+        `template` using rate rules. The estimate for each template is
+        memoized before the reaction path `degeneracy` is applied, and is also
+        stored in the estimate cache file, if one was given to
+        :meth:`setEstimateCache`.
+        """
+        templateLabels = ';'.join([g.label for g in template])
+        try:
+            kinetics, entry = self._estimates[templateLabels]
+        except KeyError:
+            estimate = self.__loadEstimate(templateLabels)
+            if estimate is None:
+                estimate = self.__estimateKinetics(template)
+                self.__saveEstimate(templateLabels, estimate)
+            self._estimates[templateLabels] = estimate
+            kinetics, entry = estimate
+
+        if kinetics is None:
+            # We couldn't estimate any kinetics, which is an exception
+            raise KineticsError('Unable to determine kinetics for reaction with template {0}.'.format(template))
+
+        kinetics = deepcopy(kinetics)
+        kinetics.A.value_si *= degeneracy
+        if degeneracy > 1:
+            kinetics.comment += "\n"
+            kinetics.comment += "Multiplied by reaction path degeneracy {0}".format(degeneracy)
+
+        return kinetics, entry
+
+    def __loadEstimate(self, templateLabels):
+        """
+        Return the kinetics and entry estimated for the template with the
+        given `templateLabels` from the estimate cache file, or ``None`` if
+        the file has no estimate for it. The kinetics are ``None`` if no
+        estimate could be made.
+        """
+        if self._estimateCache is None:
+            return None
+        row = self._estimateCache.execute('SELECT kinetics, entryLabel, entryIndex FROM estimates WHERE rules = ? AND template = ?',
+            (self.__getEstimateKey(), templateLabels)).fetchone()
+        if row is None:
+            return None
+        kinetics, entryLabel, entryIndex = row
+        if kinetics is None:
+            return None, None
+        entry = None
+        if entryLabel is not None:
+            for entry0 in self.entries.get(entryLabel, []):
+                if entry0.index == entryIndex:
+                    entry = entry0
+        return cPickle.loads(str(kinetics)), entry
+
+    def __saveEstimate(self, templateLabels, estimate):
+        """
+        Store the kinetics and entry `estimate` for the template with the
+        given `templateLabels` in the estimate cache file, if any.
+        """
+        if self._estimateCache is None:
+            return
+        kinetics, entry = estimate
+        if kinetics is not None:
+            kinetics = sqlite3.Binary(cPickle.dumps(kinetics, 2))
+        self._estimateCache.execute('INSERT OR REPLACE INTO estimates VALUES (?, ?, ?, ?, ?)',
+            (self.__getEstimateKey(), templateLabels, kinetics,
+             entry.label if entry is not None else None, entry.index if entry is not None else None))
+        self._estimateCache.commit()
+
+    def __estimateKinetics(self, template):
+        """
+        Determine the kinetics for a reaction with the given `template` using
+        rate rules, without the reaction path degeneracy. Returns the kinetics
+        and the exactly matching rate rule entry (or ``None``), or ``None``
+        for both if no estimate could be made.
         """
         def getTemplateLabel(template):
             # Get string format of the template in the form "(leaf1,leaf2)"
@@ -542,10 +733,6 @@ class KineticsRules(Database):
                     )
                 
                 kinetics.comment +=  ' for rate rule ' + originalLeaves
-                kinetics.A.value_si *= degeneracy
-                if degeneracy > 1:
-                    kinetics.comment += "\n"
-                    kinetics.comment += "Multiplied by reaction path degeneracy {0}".format(degeneracy)
 
                 return kinetics, entry if 'Exact' in kinetics.comment else None
             
@@ -563,5 +750,5 @@ class KineticsRules(Database):
                         if t not in templateList:
                             templateList.append(t)
                 
-        # If we're here then we couldn't estimate any kinetics, which is an exception
-        raise KineticsError('Unable to determine kinetics for reaction with template {0}.'.format(template))
+        # If we're here then we couldn't estimate any kinetics
+        return None, None
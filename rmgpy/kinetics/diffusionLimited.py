@@ -10,6 +10,8 @@ class DiffusionLimited():
     def __init__(self):
     # default is false, enabled if there is a solvent
         self.enabled = False
+        # the radius and diffusivity of each species, keyed by (species, T)
+        self.soluteCache = {}
 
     def enable(self, solventData, solvationDatabase, comment=''):
     # diffusionLimiter is enabled if a solvent has been added to the RMG object.
@@ -17,6 +19,7 @@ class DiffusionLimited():
         diffusionLimiter.enabled = True
         diffusionLimiter.database = solvationDatabase
         diffusionLimiter.solventData = solventData
+        diffusionLimiter.soluteCache = {}
 
     def getSolventViscosity(self, T):
         return self.solventData.getSolventViscosity(T)
@@ -75,16 +78,29 @@ class DiffusionLimited():
         radii = 0.0
         diffusivities = 0.0
         for spec in reacting:
-            soluteData = self.database.getSoluteData(spec)
-            # calculate radius with the McGowan volume and assuming sphere
-            radius = ((75*soluteData.V/3.14159)**(1/3))/100
-            diff = soluteData.getStokesDiffusivity(T, self.getSolventViscosity(T))
+            radius, diff = self.getSoluteTransport(spec, T)
             radii += radius
             diffusivities += diff
         N_a = 6.022e23 # Avogadro's Number
         k_diff = 4*3.14159*radii*diffusivities*N_a
         return k_diff
 
+    def getSoluteTransport(self, species, T):
+        """
+        Return the radius and the Stokes diffusivity of `species` in the
+        solvent at temperature `T`. These are stored, so the solute data of
+        each species is only estimated once per solvent and temperature.
+        """
+        try:
+            return self.soluteCache[(species, T)]
+        except KeyError:
+            soluteData = self.database.getSoluteData(species)
+            # calculate radius with the McGowan volume and assuming sphere
+            radius = ((75*soluteData.V/3.14159)**(1/3))/100
+            diff = soluteData.getStokesDiffusivity(T, self.getSolventViscosity(T))
+            self.soluteCache[(species, T)] = (radius, diff)
+            return radius, diff
+
 
 # module level variable. There should only ever be one. It starts off disabled
 diffusionLimiter = DiffusionLimited()
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2002-2009 Prof. William H. Green (whgreen@mit.edu) and the
+#   RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the "Software"),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#   THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This script contains unit tests of the :mod:`rmgpy.kinetics.diffusionLimited`
+module.
+"""
+
+import unittest
+
+from rmgpy.reaction import Reaction
+from rmgpy.species import Species
+from rmgpy.data.solvation import SoluteData, SolventData
+from rmgpy.kinetics.diffusionLimited import diffusionLimiter
+
+################################################################################
+
+class CountingSolvationDatabase(object):
+    """
+    A stand-in for the solvation database that counts the solute data
+    estimates made through it.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def getSoluteData(self, species):
+        self.calls += 1
+        return SoluteData(S=0.5, B=0.1, E=0.2, L=1.5, A=0.0, V=0.5)
+
+class TestDiffusionLimited(unittest.TestCase):
+    """
+    Contains unit tests of the DiffusionLimited class.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.state = dict(diffusionLimiter.__dict__)
+        self.speciesA = Species(label='A')
+        self.speciesB = Species(label='B')
+        self.reaction = Reaction(reactants=[self.speciesA, self.speciesB], products=[Species(label='C')])
+        # The viscosity correlation of water
+        self.solventData = SolventData(A=-52.843, B=3703.6, C=5.866, D=-5.879e-29, E=10)
+        self.database = CountingSolvationDatabase()
+        diffusionLimiter.enable(self.solventData, self.database)
+
+    def tearDown(self):
+        """
+        A function run after each unit test in this class.
+        """
+        diffusionLimiter.__dict__.clear()
+        diffusionLimiter.__dict__.update(self.state)
+
+    def testGetSoluteTransport(self):
+        """
+        Test that the solute data of each species is only estimated once for
+        each temperature.
+        """
+        radius, diff = diffusionLimiter.getSoluteTransport(self.speciesA, 298.)
+        self.assertEqual(diffusionLimiter.getSoluteTransport(self.speciesA, 298.), (radius, diff))
+        self.assertEqual(self.database.calls, 1)
+        diffusionLimiter.getSoluteTransport(self.speciesA, 350.)
+        diffusionLimiter.getSoluteTransport(self.speciesB, 298.)
+        self.assertEqual(self.database.calls, 3)
+        self.assertTrue(diffusionLimiter.getSoluteTransport(self.speciesA, 350.)[1] > diff)
+        self.assertEqual(self.database.calls, 3)
+
+    def testGetDiffusionLimit(self):
+        """
+        Test that repeated diffusion limits reuse the stored solute data, and
+        that enabling the limiter again discards it.
+        """
+        k_diff = diffusionLimiter.getDiffusionLimit(298., self.reaction)
+        self.assertTrue(k_diff > 0)
+        self.assertEqual(diffusionLimiter.getDiffusionLimit(298., self.reaction), k_diff)
+        self.assertEqual(self.database.calls, 2)
+        diffusionLimiter.enable(self.solventData, self.database)
+        self.assertEqual(diffusionLimiter.getDiffusionLimit(298., self.reaction), k_diff)
+        self.assertEqual(self.database.calls, 4)
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
@@ -435,34 +435,57 @@ re_OldAdjList = re.compile('^\s*(\d*)\s+' +  # atom number digit
                           '(?P<bonds>(\s+\{\d+\,(?:[SDTB]|\{.+?\})\},?)*)' +  # bonds, eg {2,S} {4,{S,D}}
                           '\s*$')  # the end!
 
-def fromAdjacencyList(adjlist, group=False, saturateH=False):
+# should match "multiplicity [1]" or " multiplicity   [ 1, 2, 3 ]" or " multiplicity [1,2,3]"
+# and whatever's inside the [] (excluding leading and trailing spaces) should be captured as group 1.
+# If a wildcard is desired, this line can be omitted or replaced with 'multiplicity x'
+# Multiplicities must be only one digit (i.e. less than 10)
+# The (?:,\s*\d)* matches patters like ", 2" 0 or more times, but doesn't capture them (because of the leading ?:)
+re_GroupMultiplicity = re.compile('\s*multiplicity\s+\[\s*(\d(?:,\s*\d)*)\s*\]\s*$')
+re_GroupMultiplicityWildcard = re.compile('\s*multiplicity\s+x\s*$')
+re_Multiplicity = re.compile('\s*multiplicity\s+\d+\s*$')
+
+# Sometimes people put spaces after commas, which messes up the
+# parse-by-whitespace. Examples include '[Cd, Ct]'.
+re_SpaceInBraces = re.compile('\{[^}]*\s+[^}]*\}')
+
+# The recognized values of the unpaired electron and lone pair (u and p) and
+# the partial charge (c) fields
+_electronStates = {'0': 0, '1': 1, '2': 2, '3': 3, '4': 4}
+_chargeStates = {'0': 0, '+1': 1, '+2': 2, '+3': 3, '+4': 4, '-1': -1, '-2': -2, '-3': -3, '-4': -4}
+
+def _parseStates(state, table, group, adjlist, field):
     """
-    Convert a string adjacency list `adjlist` into a set of :class:`Atom` and
-    :class:`Bond` objects.
+    Convert the `state` string of a u, p or c field, either a single value or
+    a ``[...]`` list, into a list of integers using `table`. Wildcards are
+    only allowed in groups and contribute no values.
+    """
+    if state[0] == '[':
+        states = state[1:-1].split(',')
+    else:
+        states = [state]
+    values = []
+    for s in states:
+        try:
+            values.append(table[s])
+        except KeyError:
+            if s != 'x':
+                raise InvalidAdjacencyListError('Error in {0} adjacency list: {1} not recognized.'.format(adjlist.splitlines()[0], field))
+            elif not group:
+                raise InvalidAdjacencyListError('Error in {0} adjacency list: A molecule should not have a wildcard assigned to {1}.'.format(adjlist.splitlines()[0], field))
+    return values
+
+def _parseAdjacencyList(adjlist, lines, group):
+    """
+    Tokenize the new-style adjacency list `adjlist`, whose non-empty `lines`
+    have already been split out, and check it for consistency. Returns a tuple
+    ``(atoms, bonds, multiplicity)``, where each atom is a tuple of label,
+    atom types, unpaired electrons, lone pairs and charges, and each bond is
+    a tuple of the indices of the two atoms and the bond orders, in the order
+    in which the :class:`Bond` objects should be created.
     """
     atoms = []
-    atomdict = {}
     bonds = {}
     multiplicity = None
-    
-    adjlist = adjlist.strip()
-    lines = adjlist.splitlines()
-    if adjlist == '' or len(lines) == 0:
-        raise InvalidAdjacencyListError('Empty adjacency list.')
-
-    # Detect old-style adjacency lists by looking at the last line's syntax
-    lastLine = lines[-1].strip()
-    while not lastLine:  # Remove any empty lines from the end
-        lines.pop()
-        lastLine = lines[-1].strip()
-    if re_IntermediateAdjList.match(lastLine):
-        logging.debug("{1} adjacency list line '{0}' looks like an intermediate style adjacency list".format(lastLine, adjlist.splitlines()[0]))
-        return fromOldAdjacencyList(adjlist, group=group, saturateH=saturateH)
-    if re_OldAdjList.match(lastLine):
-        logging.debug("{1} adjacency list line '{0}' looks like an old style adjacency list".format(lastLine, adjlist.splitlines()[0]))
-        if not group:
-            logging.debug("Will assume implicit H atoms")
-        return fromOldAdjacencyList(adjlist, group=group, saturateH=(not group))
 
     # Interpret the first line if it contains a label
     if len(lines[0].split()) == 1:
@@ -474,41 +497,33 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
     if lines[0].split()[0] == 'multiplicity':
         line = lines.pop(0)
         if group:
-            match = re.match('\s*multiplicity\s+\[\s*(\d(?:,\s*\d)*)\s*\]\s*$', line)
+            match = re_GroupMultiplicity.match(line)
             if not match:
-                rematch = re.match('\s*multiplicity\s+x\s*$', line)
+                rematch = re_GroupMultiplicityWildcard.match(line)
                 assert rematch, "Invalid multiplicity line '{0}'. Should be a list like 'multiplicity [1,2,3]' or a wildcard 'multiplicity x'".format(line)
             else:
-            # should match "multiplicity [1]" or " multiplicity   [ 1, 2, 3 ]" or " multiplicity [1,2,3]"
-            # and whatever's inside the [] (excluding leading and trailing spaces) should be captured as group 1.
-            # If a wildcard is desired, this line can be omitted or replaced with 'multiplicity x'
-            # Multiplicities must be only one digit (i.e. less than 10)
-            # The (?:,\s*\d)* matches patters like ", 2" 0 or more times, but doesn't capture them (because of the leading ?:)            
                 multiplicities = match.group(1).split(',')
                 multiplicity = [int(i) for i in multiplicities]
         else:
-            match = re.match('\s*multiplicity\s+\d+\s*$', line)
+            match = re_Multiplicity.match(line)
             assert match, "Invalid multiplicity line '{0}'. Should be an integer like 'multiplicity 2'".format(line)
             multiplicity = int(line.split()[1])
         if len(lines) == 0:
             raise InvalidAdjacencyListError('No atoms specified in {0} adjacency list.'.format(adjlist.splitlines()[0]))
     
-    mistake1 = re.compile('\{[^}]*\s+[^}]*\}')
-    # Iterate over the remaining lines, generating Atom or GroupAtom objects
+    # Iterate over the remaining lines, generating the atom data
+    aids = {}
     for line in lines:
 
-        # Sometimes people put spaces after commas, which messes up the
-        # parse-by-whitespace. Examples include '[Cd, Ct]'.
-        if mistake1.search(line):
+        match = re_SpaceInBraces.search(line)
+        if match:
             raise InvalidAdjacencyListError(
-                "{1} Shouldn't have spaces inside braces: {0}".format(mistake1.search(line).group(), adjlist.splitlines()[0])
+                "{1} Shouldn't have spaces inside braces: {0}".format(match.group(), adjlist.splitlines()[0])
                 )
 
         # Sometimes commas are used to delimit bonds in the bond list,
         # so replace them just in case
-        line = line.replace('},{', '} {')
-        
-        data = line.split()
+        data = line.replace('},{', '} {').split()
 
         # Skip if blank line
         if len(data) == 0: continue
@@ -530,122 +545,37 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
         if atomType[0] == '[':
             if not group:
                 raise InvalidAdjacencyListError("Error on {0}: A molecule should not assign more than one atomtype per atom.".format(adjlist.splitlines()[0]))
-            atomType = atomType[1:-1].split(',')
+            atomType = tuple(atomType[1:-1].split(','))
         else:
-            atomType = [atomType]
+            atomType = (atomType,)
         index += 1
         
         # Next the number of unpaired electrons
-        unpairedElectrons = []
         uState = data[index]
-        if uState[0] == 'u':
-            if uState[1] == '[':
-                uState = uState[2:-1].split(',')
-            else:
-                uState = [uState[1]]
-            for u in uState:
-                if u == '0':
-                    unpairedElectrons.append(0)
-                elif u == '1':
-                    unpairedElectrons.append(1)
-                elif u == '2':
-                    unpairedElectrons.append(2)
-                elif u == '3':
-                    unpairedElectrons.append(3)
-                elif u == '4':
-                    unpairedElectrons.append(4)
-                elif u == 'x':
-                    if not group:
-                        raise InvalidAdjacencyListError("Error on {0}: A molecule should not assign a wildcard to number of unpaired electrons.".format(adjlist.splitlines()[0]))
-                else:
-                    raise InvalidAdjacencyListError('Number of unpaired electrons not recognized on {0}.'.format(*adjlist.splitlines()[0]))
-            index += 1
-        else:
+        if uState[0] != 'u':
             raise InvalidAdjacencyListError('Number of unpaired electrons not defined on {0}.'.format(adjlist.splitlines()[0]))
+        unpairedElectrons = _parseStates(uState[1:] if uState[1] == '[' else uState[1], _electronStates, group, adjlist, 'number of unpaired electrons')
+        index += 1
         
         # Next the number of lone electron pairs (if provided)
         lonePairs = []
-        if len(data) > index:
+        if len(data) > index and data[index][0] == 'p':
             lpState = data[index]
-            if lpState[0] == 'p':
-                if lpState[1] == '[':
-                    lpState = lpState[2:-1].split(',')
-                else:
-                    lpState = [lpState[1]]
-                for l in lpState:
-                    if l == '0':
-                        lonePairs.append(0)
-                    elif l == '1':
-                        lonePairs.append(1)
-                    elif l == '2':
-                        lonePairs.append(2)
-                    elif l == '3':
-                        lonePairs.append(3)
-                    elif l == '4':
-                        lonePairs.append(4)
-                    elif l == 'x':
-                        if not group:
-                            raise InvalidAdjacencyListError("Error in {0} adjacency list: A molecule should not have a wildcard assigned to number of lone pairs.".format(adjlist.splitlines()[0]))
-                    else:
-                        raise InvalidAdjacencyListError('Error in {0} adjacency list: Number of lone electron pairs not recognized.'.format(adjlist.splitlines()[0]))
-                index += 1
-            else:
-                if not group:
-                    lonePairs.append(0)
-        else:
-            if not group:
-                lonePairs.append(0)
+            lonePairs = _parseStates(lpState[1:] if lpState[1] == '[' else lpState[1], _electronStates, group, adjlist, 'number of lone pairs')
+            index += 1
+        elif not group:
+            lonePairs.append(0)
             
         # Next the number of partial charges (if provided)
         partialCharges = []
-        if len(data) > index:
-            eState = data[index]
-            if eState[0] == 'c':
-                if eState[1] == '[':
-                    eState = eState[2:-1].split(',')
-                else:
-                    eState = [eState[1:]]
-                for e in eState:
-                    if e == '0':
-                        partialCharges.append(0)
-                    elif e == '+1':
-                        partialCharges.append(1)
-                    elif e == '+2':
-                        partialCharges.append(2)
-                    elif e == '+3':
-                        partialCharges.append(3)
-                    elif e == '+4':
-                        partialCharges.append(4)
-                    elif e == '-1':
-                        partialCharges.append(-1)
-                    elif e == '-2':
-                        partialCharges.append(-2)
-                    elif e == '-3':
-                        partialCharges.append(-3)
-                    elif e == '-4':
-                        partialCharges.append(-4)
-                    elif e == 'x':
-                        if not group:
-                            raise InvalidAdjacencyListError("Error on {0} adjacency list: A molecule should not have a wildcard assigned to number of charges.".format(adjlist.splitlines()[0]))
-                    else:
-                        raise InvalidAdjacencyListError('Error on {0} adjacency list: Number of partial charges not recognized.'.format(adjlist.splitlines()[0]))
-                index += 1
-            else:
-                if not group:
-                    partialCharges.append(0)
-        else:
-            if not group:
-                partialCharges.append(0)
+        if len(data) > index and data[index][0] == 'c':
+            partialCharges = _parseStates(data[index][1:], _chargeStates, group, adjlist, 'number of partial charges')
+            index += 1
+        elif not group:
+            partialCharges.append(0)
         
-        # Create a new atom based on the above information
-        if group:
-            atom = GroupAtom(atomType, unpairedElectrons, partialCharges, label, lonePairs)
-        else:
-            atom = Atom(atomType[0], unpairedElectrons[0], partialCharges[0], label, lonePairs[0])
-
-        # Add the atom to the list
-        atoms.append(atom)
-        atomdict[aid] = atom
+        aids[aid] = len(atoms)
+        atoms.append((label, atomType, tuple(unpairedElectrons), tuple(lonePairs), tuple(partialCharges)))
         
         # Process list of bonds
         bonds[aid] = {}
@@ -661,9 +591,9 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
                 raise InvalidAdjacencyListError('Error in {1} adjacency list: Attempted to create a bond between atom {0:d} and itself.'.format(aid, adjlist.splitlines()[0]))
             
             if order[0] == '[':
-                order = order[1:-1].split(',')
+                order = tuple(order[1:-1].split(','))
             else:
-                order = [order]
+                order = (order,)
 
             bonds[aid][aid2] = order
 
@@ -675,27 +605,69 @@ def fromAdjacencyList(adjlist, group=False, saturateH=False):
             elif atom1 not in bonds[atom2]:
                 raise InvalidAdjacencyListError('Error in {2} adjacency list: Found bond between {0:d} and {1:d}, but not the reverse.'.format(atom1, atom2, adjlist.splitlines()[0]))
             elif bonds[atom1][atom2] != bonds[atom2][atom1]:
-                raise InvalidAdjacencyListError('Error in {4} adjacency list: Found bonds between {0:d} and {1:d}, but of different orders "{2}" and "{3}".'.format(atom1, atom2, bonds[atom1][atom2], bonds[atom2][atom1], adjlist.splitlines()[0]))
-
-    # Convert bonddict to use Atom[group] and Bond[group] objects
-    atomkeys = atomdict.keys()
-    atomkeys.sort()
-    for aid1 in atomkeys:
-        atomkeys2 = bonds[aid1].keys()
-        atomkeys2.sort()
-        for aid2 in atomkeys2:
+                raise InvalidAdjacencyListError('Error in {4} adjacency list: Found bonds between {0:d} and {1:d}, but of different orders "{2}" and "{3}".'.format(atom1, atom2, list(bonds[atom1][atom2]), list(bonds[atom2][atom1]), adjlist.splitlines()[0]))
+
+    # List the bonds between atom indices in the order they will be created
+    bondList = []
+    for aid1 in sorted(bonds):
+        for aid2 in sorted(bonds[aid1]):
             if aid1 < aid2:
-                atom1 = atomdict[aid1]
-                atom2 = atomdict[aid2]
                 order = bonds[aid1][aid2]
-                if group:
-                    bond = GroupBond(atom1, atom2, order)
-                elif len(order) == 1:
-                    bond = Bond(atom1, atom2, order[0])
-                else:
+                if not group and len(order) != 1:
                     raise InvalidAdjacencyListError('Error in {0} adjacency list: Multiple bond orders specified for an atom in a Molecule.'.format(adjlist.splitlines()[0]))
-                atom1.edges[atom2] = bond
-                atom2.edges[atom1] = bond
+                bondList.append((aids[aid1], aids[aid2], order))
+
+    return atoms, bondList, multiplicity
+
+def _createAdjacencyList(atomData, bondData, group):
+    """
+    Create new :class:`Atom` and :class:`Bond` (or :class:`GroupAtom` and
+    :class:`GroupBond`) objects from the tokenized adjacency list data
+    returned by :func:`_parseAdjacencyList`.
+    """
+    if group:
+        atoms = [GroupAtom(list(atomType), list(unpairedElectrons), list(partialCharges), label, list(lonePairs))
+                 for label, atomType, unpairedElectrons, lonePairs, partialCharges in atomData]
+    else:
+        atoms = [Atom(atomType[0], unpairedElectrons[0], partialCharges[0], label, lonePairs[0])
+                 for label, atomType, unpairedElectrons, lonePairs, partialCharges in atomData]
+    for index1, index2, order in bondData:
+        atom1 = atoms[index1]
+        atom2 = atoms[index2]
+        if group:
+            bond = GroupBond(atom1, atom2, list(order))
+        else:
+            bond = Bond(atom1, atom2, order[0])
+        atom1.edges[atom2] = bond
+        atom2.edges[atom1] = bond
+    return atoms
+
+def fromAdjacencyList(adjlist, group=False, saturateH=False):
+    """
+    Convert a string adjacency list `adjlist` into a set of :class:`Atom` and
+    :class:`Bond` objects.
+    """
+    adjlist = adjlist.strip()
+    lines = adjlist.splitlines()
+    if adjlist == '' or len(lines) == 0:
+        raise InvalidAdjacencyListError('Empty adjacency list.')
+
+    # Detect old-style adjacency lists by looking at the last line's syntax
+    lastLine = lines[-1].strip()
+    while not lastLine:  # Remove any empty lines from the end
+        lines.pop()
+        lastLine = lines[-1].strip()
+    if re_IntermediateAdjList.match(lastLine):
+        logging.debug("{1} adjacency list line '{0}' looks like an intermediate style adjacency list".format(lastLine, adjlist.splitlines()[0]))
+        return fromOldAdjacencyList(adjlist, group=group, saturateH=saturateH)
+    if re_OldAdjList.match(lastLine):
+        logging.debug("{1} adjacency list line '{0}' looks like an old style adjacency list".format(lastLine, adjlist.splitlines()[0]))
+        if not group:
+            logging.debug("Will assume implicit H atoms")
+        return fromOldAdjacencyList(adjlist, group=group, saturateH=(not group))
+
+    atomData, bondData, multiplicity = _parseAdjacencyList(adjlist, lines, group)
+    atoms = _createAdjacencyList(atomData, bondData, group)
     
     if saturateH:
         # Add explicit hydrogen atoms to complete structure if desired
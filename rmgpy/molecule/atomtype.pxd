@@ -39,6 +39,11 @@ cdef class AtomType:
     cdef public list incrementLonePair
     cdef public list decrementLonePair
 
+    cdef public int index
+    cdef public object bit
+    cdef public object specificMask
+    cdef public object equivalentMask
+
     cpdef bint isSpecificCaseOf(self, AtomType other)
 
     cpdef bint equivalent(self, AtomType other)
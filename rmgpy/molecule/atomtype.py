@@ -75,8 +75,14 @@ class AtomType:
     `decrementRadical`  ``list``            The atom type(s) that result when the number of radical electrons is decremented
     `incrementLonePair  ``list``            The atom type(s) that result when the number of lone electron pairs is incremented
     `decrementLonePair` ``list``            The atom type(s) that result when the number of lone electron pairs is decremented
+    `index`             ``int``             The position of the atom type in the compatibility bitsets
+    `bit`               ``int``             The bit representing this atom type in the compatibility bitsets
+    `specificMask`      ``int``             The bits of the atom types that are specific cases of this one
+    `equivalentMask`    ``int``             The bits of the atom types that are equivalent to this one
     =================== =================== ====================================
 
+    The compatibility bitsets are computed once for the atom types defined in
+    this module, so that comparing two atom types is a single bitwise AND.
     """
 
     def __init__(self, label='', generic=None, specific=None):
@@ -91,6 +97,10 @@ class AtomType:
         self.decrementRadical = []
         self.incrementLonePair = []
         self.decrementLonePair = []
+        self.index = -1
+        self.bit = 0
+        self.specificMask = 0
+        self.equivalentMask = 0
 
     def __repr__(self):
         return '<AtomType "%s">' % self.label
@@ -111,6 +121,10 @@ class AtomType:
             'decrementRadical': self.decrementRadical,
             'incrementLonePair': self.incrementLonePair,
             'decrementLonePair': self.decrementLonePair,
+            'index': self.index,
+            'bit': self.bit,
+            'specificMask': self.specificMask,
+            'equivalentMask': self.equivalentMask,
         }
         return (AtomType, (), d)
 
@@ -129,6 +143,10 @@ class AtomType:
         self.decrementRadical = d['decrementRadical']
         self.incrementLonePair = d['incrementLonePair']
         self.decrementLonePair = d['decrementLonePair']
+        self.index = d['index']
+        self.bit = d['bit']
+        self.specificMask = d['specificMask']
+        self.equivalentMask = d['equivalentMask']
 
     def setActions(self, incrementBond, decrementBond, formBond, breakBond, incrementRadical, decrementRadical, incrementLonePair, decrementLonePair):
         self.incrementBond = incrementBond
@@ -146,14 +164,14 @@ class AtomType:
         equivalent or ``False``  otherwise. This function respects wildcards,
         e.g. ``R!H`` is equivalent to ``C``.
         """
-        return self is other or self in other.specific or other in self.specific
+        return self is other or (self.bit & other.equivalentMask) != 0
 
     def isSpecificCaseOf(self, other):
         """
         Returns ``True`` if atom type `atomType1` is a specific case of
         atom type `atomType2` or ``False``  otherwise.
         """
-        return self is other or self in other.specific
+        return self is other or (self.bit & other.specificMask) != 0
 
 ################################################################################
 
@@ -321,16 +339,87 @@ for atomType in atomTypes.values():
         for index in range(len(items)):
             items[index] = atomTypes[items[index]]
 
+# Precompute the compatibility bitsets from the atom type hierarchy
+for index, atomType in enumerate(sorted(atomTypes.values(), key=lambda atomType: atomType.label)):
+    atomType.index = index
+    atomType.bit = 1 << index
+    atomType.specificMask = atomType.bit
+    atomType.equivalentMask = atomType.bit
+for atomType in atomTypes.values():
+    for other in atomType.specific:
+        atomType.specificMask |= other.bit
+        atomType.equivalentMask |= other.bit
+        other.equivalentMask |= atomType.bit
+
+# The rules for assigning atom types, in order of precedence for each element.
+# Each rule gives the number of single, double (to atoms other than O),
+# double (to O), triple and benzene bonds and the number of lone pairs that an
+# atom must have to get the atom type, with ``None`` matching any number
+atomTypeRules = {
+    'H':  [((None, None, None, None, None, None), 'H')],
+    'He': [((None, None, None, None, None, None), 'He')],
+    'C':  [((None, 0, 0, 0, 0, None), 'Cs'),
+           ((None, 1, 0, 0, 0, None), 'Cd'),
+           ((None, 2, 0, 0, 0, None), 'Cdd'),
+           ((None, 1, 1, 0, 0, None), 'Cdd'),
+           ((None, 0, 2, 0, 0, None), 'Cdd'),
+           ((None, 0, 0, 1, 0, None), 'Ct'),
+           ((None, 0, 1, 0, 0, None), 'CO'),
+           ((None, 0, 0, 0, 2, None), 'Cb'),
+           ((None, 0, 0, 0, 3, None), 'Cbf')],
+    'N':  [((0, 0, 0, 0, 0, None), 'N3s'),
+           ((0, 1, 0, 0, 0, 2),    'N1d'),
+           ((1, 0, 0, 0, 0, None), 'N3s'),
+           ((2, 0, 0, 0, 0, None), 'N3s'),
+           ((3, 0, 0, 0, 0, None), 'N3s'),
+           ((0, 1, 0, 0, 0, None), 'N3d'),
+           ((0, 0, 1, 0, 0, None), 'N3d'),
+           ((1, 1, 0, 0, 0, None), 'N3d'),
+           ((1, 0, 1, 0, 0, None), 'N3d'),
+           ((0, 0, 0, 1, 0, None), 'N3t'),
+           ((0, 0, 0, 0, 2, None), 'N3b'),
+           ((4, 0, 0, 0, 0, None), 'N5s'),
+           ((2, 1, 0, 0, 0, None), 'N5d'),
+           ((2, 0, 1, 0, 0, None), 'N5d'),
+           ((0, 2, 0, 0, 0, None), 'N5dd'),
+           ((0, 0, 2, 0, 0, None), 'N5dd'),
+           ((0, 1, 1, 0, 0, None), 'N5dd'),
+           ((1, 0, 0, 1, 0, None), 'N5t'),
+           ((1, 0, 0, 0, 2, None), 'N5b')],
+    'O':  [((None, 0, 0, 0, 0, None), 'Os'),
+           ((None, 1, 0, 0, 0, None), 'Od'),
+           ((None, 0, 1, 0, 0, None), 'Od'),
+           ((None, 0, 0, 1, 0, None), 'Ot')],
+    'Ne': [((None, None, None, None, None, None), 'Ne')],
+    'Si': [((None, 0, 0, 0, 0, None), 'Sis'),
+           ((None, 1, 0, 0, 0, None), 'Sid'),
+           ((None, 2, 0, 0, 0, None), 'Sidd'),
+           ((None, 1, 1, 0, 0, None), 'Sidd'),
+           ((None, 0, 2, 0, 0, None), 'Sidd'),
+           ((None, 0, 0, 1, 0, None), 'Sit'),
+           ((None, 0, 1, 0, 0, None), 'SiO'),
+           ((None, 0, 0, 0, 2, None), 'Sib'),
+           ((None, 0, 0, 0, 3, None), 'Sibf')],
+    'S':  [((None, 0, 0, 0, 0, None), 'Ss'),
+           ((None, 1, 0, 0, 0, None), 'Sd'),
+           ((None, 0, 1, 0, 0, None), 'Sd')],
+    'Cl': [((None, None, None, None, None, None), 'Cl')],
+    'Ar': [((None, None, None, None, None, None), 'Ar')],
+}
+
+# The atom types found so far by applying the rules, keyed by the element
+# symbol and the bond and lone pair counts
+_atomTypeTable = {}
+
 def getAtomType(atom, bonds):
     """
     Determine the appropriate atom type for an :class:`Atom` object `atom`
     with local bond structure `bonds`, a ``dict`` containing atom-bond pairs.
+    The atom type is looked up in :data:`atomTypeRules` the first time each
+    combination of element and bond and lone pair counts is seen.
     """
 
-    cython.declare(atomType=str)
-    cython.declare(double=cython.int, double0=cython.int, triple=cython.int, benzene=cython.int)
-    
-    atomType = ''
+    cython.declare(single=cython.int, double=cython.int, doubleO=cython.int, triple=cython.int, benzene=cython.int)
     
     # Count numbers of each higher-order bond type
     single = 0; double = 0; doubleO = 0; triple = 0; benzene = 0
@@ -343,65 +432,22 @@ def getAtomType(atom, bonds):
         elif bond12.isTriple(): triple += 1
         elif bond12.isBenzene(): benzene += 1
 
+    key = (atom.symbol, single, double, doubleO, triple, benzene, atom.lonePairs)
+    try:
+        return _atomTypeTable[key]
+    except KeyError:
+        pass
+
     # Use element and counts to determine proper atom type
-    if atom.symbol == 'H':
-        atomType = 'H'
-    elif atom.symbol == 'He':
-        atomType = 'He'
-    elif atom.symbol == 'C':
-        if   double == 0 and doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Cs'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Cd'
-        elif double + doubleO == 2        and triple == 0 and benzene == 0: atomType = 'Cdd'
-        elif double == 0 and doubleO == 0 and triple == 1 and benzene == 0: atomType = 'Ct'
-        elif double == 0 and doubleO == 1 and triple == 0 and benzene == 0: atomType = 'CO'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 2: atomType = 'Cb'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 3: atomType = 'Cbf'
-    elif atom.symbol == 'N':
-        if   double == 0 and doubleO == 0 and triple == 0 and benzene == 0 and single == 0: atomType = 'N3s'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0 and single == 0 and atom.lonePairs == 2: atomType = 'N1d'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 0 and single == 1: atomType = 'N3s'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 0 and single == 2: atomType = 'N3s'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 0 and single == 3: atomType = 'N3s'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0 and single == 0: atomType = 'N3d'
-        elif double == 0 and doubleO == 1 and triple == 0 and benzene == 0 and single == 0: atomType = 'N3d'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0 and single == 1: atomType = 'N3d'
-        elif double == 0 and doubleO == 1 and triple == 0 and benzene == 0 and single == 1: atomType = 'N3d'
-        elif double == 0 and doubleO == 0 and triple == 1 and benzene == 0 and single == 0: atomType = 'N3t'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 2 and single == 0: atomType = 'N3b'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 0 and single == 4: atomType = 'N5s'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0 and single == 2: atomType = 'N5d'
-        elif double == 0 and doubleO == 1 and triple == 0 and benzene == 0 and single == 2: atomType = 'N5d'
-        elif double == 2 and doubleO == 0 and triple == 0 and benzene == 0 and single == 0: atomType = 'N5dd'
-        elif double == 0 and doubleO == 2 and triple == 0 and benzene == 0 and single == 0: atomType = 'N5dd'
-        elif double == 1 and doubleO == 1 and triple == 0 and benzene == 0 and single == 0: atomType = 'N5dd'
-        elif double == 0 and doubleO == 0 and triple == 1 and benzene == 0 and single == 1: atomType = 'N5t'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 2 and single == 1: atomType = 'N5b'
-    elif atom.symbol == 'O':
-        if   double + doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Os'
-        elif double + doubleO == 1 and triple == 0 and benzene == 0: atomType = 'Od'
-        elif len(bonds) == 0:                                        atomType = 'Oa'
-        elif double + doubleO == 0 and triple == 1 and benzene == 0: atomType = 'Ot'
-    elif atom.symbol == 'Ne':
-        atomType = 'Ne'
-    elif atom.symbol == 'Si':
-        if   double == 0 and doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Sis'
-        elif double == 1 and doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Sid'
-        elif double + doubleO == 2        and triple == 0 and benzene == 0: atomType = 'Sidd'
-        elif double == 0 and doubleO == 0 and triple == 1 and benzene == 0: atomType = 'Sit'
-        elif double == 0 and doubleO == 1 and triple == 0 and benzene == 0: atomType = 'SiO'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 2: atomType = 'Sib'
-        elif double == 0 and doubleO == 0 and triple == 0 and benzene == 3: atomType = 'Sibf'
-    elif atom.symbol == 'S':
-        if   double + doubleO == 0 and triple == 0 and benzene == 0: atomType = 'Ss'
-        elif double + doubleO == 1 and triple == 0 and benzene == 0: atomType = 'Sd'
-        elif len(bonds) == 0:                                        atomType = 'Sa'
-    elif atom.symbol == 'Cl':
-        atomType = 'Cl'
-    elif atom.symbol == 'Ar':
-        atomType = 'Ar'
+    counts = key[1:]
+    for pattern, label in atomTypeRules.get(atom.symbol, []):
+        for required, count in zip(pattern, counts):
+            if required is not None and required != count:
+                break
+        else:
+            atomType = atomTypes[label]
+            _atomTypeTable[key] = atomType
+            return atomType
 
     # Raise exception if we could not identify the proper atom type
-    if atomType == '':
-        raise AtomTypeError('Unable to determine atom type for atom {0}, which has {1:d} double bonds to C, {2:d} double bonds to O, {3:d} triple bonds, and {4:d} benzene bonds.'.format(atom, double, doubleO, triple, benzene))
-
-    return atomTypes[atomType]
+    raise AtomTypeError('Unable to determine atom type for atom {0}, which has {1:d} double bonds to C, {2:d} double bonds to O, {3:d} triple bonds, and {4:d} benzene bonds.'.format(atom, double, doubleO, triple, benzene))
@@ -78,6 +78,18 @@ class TestAtomType(unittest.TestCase):
         """
         return self.atomType.isSpecificCaseOf(rmgpy.molecule.atomtype.atomTypes['C'])
     
+    def testCompatibilityBitsets(self):
+        """
+        Test that the precomputed compatibility bitsets agree with the atom
+        type hierarchy.
+        """
+        for atomType1 in rmgpy.molecule.atomtype.atomTypes.values():
+            for atomType2 in rmgpy.molecule.atomtype.atomTypes.values():
+                isSpecificCaseOf = atomType1 is atomType2 or atomType1 in atomType2.specific
+                equivalent = isSpecificCaseOf or atomType2 in atomType1.specific
+                self.assertEqual(atomType1.isSpecificCaseOf(atomType2), isSpecificCaseOf)
+                self.assertEqual(atomType1.equivalent(atomType2), equivalent)
+    
     def testSetActions(self):
         """
         Test the AtomType.setActions() method.
@@ -67,6 +67,11 @@ cdef class Edge(object):
 cdef class Graph:
 
     cdef public list vertices
+    cdef list _cycleVertices
+    cdef int _cycleEdgeCount
+    cdef set _cyclicVertices
+    cdef set _cyclicEdges
+    cdef list _smallestRings
 
     cpdef Vertex addVertex(self, Vertex vertex)
 
@@ -104,6 +109,10 @@ cdef class Graph:
 
     cpdef list findSubgraphIsomorphisms(self, Graph other, dict initialMap=?)
 
+    cpdef resetCycles(self)
+
+    cdef __updateCycles(self)
+
     cpdef bint isCyclic(self) except -2
 
     cpdef bint isVertexInCycle(self, Vertex vertex) except -2
@@ -222,6 +222,7 @@ cdef class Graph:
         """
         self.vertices.append(vertex)
         vertex.edges = dict()
+        self._cycleVertices = None
         return vertex
 
     cpdef Edge addEdge(self, Edge edge):
@@ -233,6 +234,7 @@ cdef class Graph:
             raise ValueError('Attempted to add edge between vertices not in the graph.')
         edge.vertex1.edges[edge.vertex2] = edge
         edge.vertex2.edges[edge.vertex1] = edge
+        self._cycleVertices = None
         return edge
 
     cpdef dict getEdges(self, Vertex vertex):
@@ -275,6 +277,7 @@ cdef class Graph:
             del vertex2.edges[vertex]
         vertex.edges = dict()
         self.vertices.remove(vertex)
+        self._cycleVertices = None
 
     cpdef removeEdge(self, Edge edge):
         """
@@ -284,6 +287,7 @@ cdef class Graph:
         """
         del edge.vertex1.edges[edge.vertex2]
         del edge.vertex2.edges[edge.vertex1]
+        self._cycleVertices = None
 
     cpdef Graph copy(self, bint deep=False):
         """
@@ -461,35 +465,96 @@ cdef class Graph:
         """
         return vf2.findSubgraphIsomorphisms(self, other, initialMap)
 
+    cpdef resetCycles(self):
+        """
+        Discard the stored information about the cycles in the graph. This is
+        done automatically by the methods that add or remove vertices and
+        edges, but must be done explicitly if the graph is modified otherwise.
+        """
+        self._cycleVertices = None
+
+    cdef __updateCycles(self):
+        """
+        Find the vertices and edges of the graph that are in one or more
+        cycles, unless they are already known for the current graph. An edge
+        is in a cycle if it is not a bridge, i.e. removing it does not split
+        its component of the graph; the bridges are found in linear time by
+        a depth-first search that tracks the earliest vertex reachable from
+        each subtree.
+        """
+        cdef Vertex vertex1, vertex2, root
+        cdef Edge edge, parentEdge
+        cdef dict order, low
+        cdef list stack
+        cdef set bridges
+        cdef int edgeCount
+
+        edgeCount = 0
+        for vertex1 in self.vertices:
+            edgeCount += len(vertex1.edges)
+        if self._cycleVertices is self.vertices and self._cycleEdgeCount == edgeCount:
+            return
+
+        order = {}; low = {}; bridges = set()
+        for root in self.vertices:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack = [(root, None, iter(root.edges.items()))]
+            while stack:
+                vertex1, parentEdge, neighbors = stack[-1]
+                for vertex2, edge in neighbors:
+                    if edge is parentEdge:
+                        continue
+                    if vertex2 in order:
+                        if order[vertex2] < low[vertex1]: low[vertex1] = order[vertex2]
+                    else:
+                        # Descend to the new vertex
+                        order[vertex2] = low[vertex2] = len(order)
+                        stack.append((vertex2, edge, iter(vertex2.edges.items())))
+                        break
+                else:
+                    # All neighbors have been explored, so return to the parent
+                    stack.pop()
+                    if parentEdge is not None:
+                        vertex2 = stack[-1][0]
+                        if low[vertex1] < low[vertex2]: low[vertex2] = low[vertex1]
+                        if low[vertex1] > order[vertex2]: bridges.add(parentEdge)
+
+        self._cyclicVertices = set()
+        self._cyclicEdges = set()
+        for vertex1 in self.vertices:
+            for edge in vertex1.edges.itervalues():
+                if edge not in bridges:
+                    self._cyclicVertices.add(vertex1)
+                    self._cyclicEdges.add(edge)
+        self._smallestRings = None
+        self._cycleVertices = self.vertices
+        self._cycleEdgeCount = edgeCount
+
     cpdef bint isCyclic(self) except -2:
         """
         Return ``True`` if one or more cycles are present in the graph or
         ``False`` otherwise.
         """
-        cdef Vertex vertex
-        for vertex in self.vertices:
-            if self.isVertexInCycle(vertex):
-                return True
-        return False
+        self.__updateCycles()
+        return len(self._cyclicVertices) > 0
 
     cpdef bint isVertexInCycle(self, Vertex vertex) except -2:
         """
         Return ``True`` if the given `vertex` is contained in one or more
         cycles in the graph, or ``False`` if not.
         """
-        return self.__isChainInCycle([vertex])
+        self.__updateCycles()
+        return vertex in self._cyclicVertices
 
     cpdef bint isEdgeInCycle(self, Edge edge) except -2:
         """
         Return :data:`True` if the edge between vertices `vertex1` and `vertex2`
         is in one or more cycles in the graph, or :data:`False` if not.
         """
-        cdef list cycles
-        cycles = self.getAllCycles(edge.vertex1)
-        for cycle in cycles:
-            if edge.vertex2 in cycle:
-                return True
-        return False
+        self.__updateCycles()
+        return edge in self._cyclicEdges
 
     cpdef bint __isChainInCycle(self, list chain) except -2:
         """
@@ -520,13 +585,9 @@ cdef class Graph:
         """ 
         Returns all vertices belonging to one or more cycles.        
         """
-        cdef list cyclicVertices
-        # Loop through all vertices and check whether they are cyclic
-        cyclicVertices = []
-        for vertex in self.vertices:
-            if self.isVertexInCycle(vertex):
-                cyclicVertices.append(vertex)                
-        return cyclicVertices
+        cdef Vertex vertex
+        self.__updateCycles()
+        return [vertex for vertex in self.vertices if vertex in self._cyclicVertices]
     
     cpdef list getAllPolycyclicVertices(self):
         """
@@ -579,99 +640,105 @@ cdef class Graph:
 
     cpdef list getSmallestSetOfSmallestRings(self):
         """
-        Return a list of the smallest set of smallest rings in the graph. The
-        algorithm implements was adapted from a description by Fan, Panaye,
-        Doucet, and Barbu (doi: 10.1021/ci00015a002)
+        Return a list of the smallest set of smallest rings in the graph, i.e.
+        a minimum cycle basis, with each ring given as the list of its vertices
+        in order around the ring. The algorithm is that of Horton: a candidate
+        ring is made for each vertex and edge from the shortest paths from the
+        vertex to the ends of the edge, and the shortest candidates that are
+        linearly independent (as sets of edges) are kept. The rings are stored
+        until the graph is modified.
 
-        B. T. Fan, A. Panaye, J. P. Doucet, and A. Barbu. "Ring Perception: A
-        New Algorithm for Directly Finding the Smallest Set of Smallest Rings
-        from a Connection Table." *J. Chem. Inf. Comput. Sci.* **33**,
-        p. 657-662 (1993).
+        J. D. Horton. "A Polynomial-Time Algorithm to Find the Shortest Cycle
+        Basis of a Graph." *SIAM J. Comput.* **16**, p. 358-366 (1987).
         """
-        cdef Graph graph
-        cdef bint done, found
-        cdef list cycleList, cycles, cycle, graphs, neighbors, verticesToRemove, vertices
-        cdef Vertex vertex, rootVertex
-
-        # Make a copy of the graph so we don't modify the original
-        graph = self.copy(deep=True)
-        vertices = graph.vertices[:]
-        
-        # Step 1: Remove all terminal vertices
-        done = False
-        while not done:
-            verticesToRemove = []
-            for vertex in graph.vertices:
-                if len(vertex.edges) == 1: verticesToRemove.append(vertex)
-            done = len(verticesToRemove) == 0
-            # Remove identified vertices from graph
-            for vertex in verticesToRemove:
-                graph.removeVertex(vertex)
-
-        # Step 2: Remove all other vertices that are not part of cycles
-        verticesToRemove = []
-        for vertex in graph.vertices:
-            found = graph.isVertexInCycle(vertex)
-            if not found:
-                verticesToRemove.append(vertex)
-        # Remove identified vertices from graph
-        for vertex in verticesToRemove:
-            graph.removeVertex(vertex)
-
-        # Step 3: Split graph into remaining subgraphs
-        graphs = graph.split()
-
-        # Step 4: Find ring sets in each subgraph
-        cycleList = []
-        for graph in graphs:
-
-            while len(graph.vertices) > 0:
-
-                # Choose root vertex as vertex with smallest number of edges
-                rootVertex = None
-                for vertex in graph.vertices:
-                    if rootVertex is None:
-                        rootVertex = vertex
-                    elif len(vertex.edges) < len(rootVertex.edges):
-                        rootVertex = vertex
-
-                # Get all cycles involving the root vertex
-                cycles = graph.getAllCycles(rootVertex)
-                if len(cycles) == 0:
-                    # This vertex is no longer in a ring, so remove it
-                    graph.removeVertex(rootVertex)
+        cdef Vertex vertex, vertex1, vertex2, root
+        cdef Edge edge
+        cdef dict index, edgeIndex, neighbors, parents, basis
+        cdef list vertices, queue, candidates, rings, ring, path1, path2
+        cdef set seen
+        cdef int ringCount, i, bit
+
+        self.__updateCycles()
+        if self._smallestRings is not None:
+            return [ring[:] for ring in self._smallestRings]
+
+        # Index the vertices and edges that are in cycles, and list the
+        # neighbors of each vertex in cycles in a consistent order
+        vertices = [vertex for vertex in self.vertices if vertex in self._cyclicVertices]
+        index = {}
+        for i, vertex in enumerate(vertices):
+            index[vertex] = i
+        edgeIndex = {}; neighbors = {}
+        for vertex1 in vertices:
+            neighbors[vertex1] = []
+            for vertex2, edge in vertex1.edges.iteritems():
+                if edge in self._cyclicEdges:
+                    neighbors[vertex1].append(vertex2)
+                    if edge not in edgeIndex: edgeIndex[edge] = len(edgeIndex)
+            neighbors[vertex1].sort(key=index.get)
+
+        # The number of rings is the number of edges, less the number of edges
+        # in a spanning forest of the cycles
+        ringCount = len(edgeIndex) - len(vertices)
+        parents = {}
+        for root in vertices:
+            if root in parents: continue
+            ringCount += 1
+            parents[root] = None
+            queue = [root]
+            for vertex1 in queue:
+                for vertex2 in neighbors[vertex1]:
+                    if vertex2 not in parents:
+                        parents[vertex2] = vertex1
+                        queue.append(vertex2)
+
+        # Make the candidate rings from the tree of shortest paths from each
+        # vertex
+        candidates = []; seen = set()
+        for root in vertices:
+            parents = {root: None}
+            queue = [root]
+            for vertex1 in queue:
+                for vertex2 in neighbors[vertex1]:
+                    if vertex2 not in parents:
+                        parents[vertex2] = vertex1
+                        queue.append(vertex2)
+            for edge in edgeIndex:
+                if edge.vertex1 not in parents or edge.vertex2 not in parents:
                     continue
-
-                # Keep the smallest of the cycles found above
-                cycle = cycles[0]
-                for c in cycles[1:]:
-                    if len(c) < len(cycle):
-                        cycle = c
-                cycleList.append(cycle)
-                
-                # Remove the root vertex to create single edges, note this will not
-                # function properly if there is no vertex with 2 edges (i.e. cubane)
-                graph.removeVertex(rootVertex)
-
-                # Remove from the graph all vertices in the cycle that have only one edge
-                loneCarbon = True
-                while loneCarbon:
-                    loneCarbon = False
-                    verticesToRemove = []
-                    
-                    for vertex in cycle:
-                        if len(vertex.edges) == 1:
-                            loneCarbon = True
-                            verticesToRemove.append(vertex)
-                    else:
-                        for vertex in verticesToRemove:
-                            graph.removeVertex(vertex)
-
-        # Map atoms in cycles back to atoms in original graph
-        for i in range(len(cycleList)):
-            cycleList[i] = [self.vertices[vertices.index(v)] for v in cycleList[i]]
-
-        return cycleList
+                path1 = [edge.vertex1]
+                while parents[path1[-1]] is not None: path1.append(parents[path1[-1]])
+                path2 = [edge.vertex2]
+                while parents[path2[-1]] is not None: path2.append(parents[path2[-1]])
+                # The two paths must only meet at the root
+                if len(set(path1) | set(path2)) != len(path1) + len(path2) - 1:
+                    continue
+                path1.reverse()
+                ring = path1 + path2[:-1]
+                mask = 0
+                for i in range(len(ring)):
+                    mask ^= 1 << edgeIndex[ring[i - 1].edges[ring[i]]]
+                if mask not in seen:
+                    seen.add(mask)
+                    candidates.append((len(ring), len(candidates), ring, mask))
+        candidates.sort()
+
+        # Keep the shortest candidates that are independent of those already
+        # kept, using Gaussian elimination over GF(2)
+        basis = {}; rings = []
+        for candidate in candidates:
+            if len(rings) == ringCount: break
+            mask = candidate[3]
+            while mask:
+                bit = mask.bit_length() - 1
+                if bit not in basis:
+                    basis[bit] = mask
+                    rings.append(candidate[2])
+                    break
+                mask ^= basis[bit]
+
+        self._smallestRings = rings
+        return [ring[:] for ring in rings]
 
     cpdef bint isMappingValid(self, Graph other, dict mapping) except -2:
         """
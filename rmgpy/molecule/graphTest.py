@@ -391,7 +391,60 @@ class TestGraph(unittest.TestCase):
         for mapping in mapList:
             self.assertTrue( graph1.isMappingValid(graph2,mapping) )
             self.assertTrue( graph1.isMappingValid(graph2,mapping) )
-    
+
+    def test_disconnectedIsomorphism(self):
+        """
+        Check the isomorphism functions for graphs with more than one
+        connected component.
+        """
+
+        vertices1 = [Vertex() for i in range(5)]
+        graph1 = Graph(vertices1)
+        graph1.addEdge(Edge(vertices1[0], vertices1[1]))
+        graph1.addEdge(Edge(vertices1[1], vertices1[2]))
+        graph1.addEdge(Edge(vertices1[3], vertices1[4]))
+
+        vertices2 = [Vertex() for i in range(5)]
+        graph2 = Graph(vertices2)
+        graph2.addEdge(Edge(vertices2[4], vertices2[2]))
+        graph2.addEdge(Edge(vertices2[2], vertices2[3]))
+        graph2.addEdge(Edge(vertices2[0], vertices2[1]))
+
+        self.assertTrue(graph1.isIsomorphic(graph2))
+        mapList = graph1.findIsomorphism(graph2)
+        self.assertEqual(len(mapList), 4)
+        for mapping in mapList:
+            self.assertTrue(graph1.isMappingValid(graph2, mapping))
+
+        # Two separate edges match either path edge together with the third
+        # edge, in either order and orientation
+        vertices3 = [Vertex() for i in range(4)]
+        graph3 = Graph(vertices3)
+        graph3.addEdge(Edge(vertices3[0], vertices3[1]))
+        graph3.addEdge(Edge(vertices3[2], vertices3[3]))
+        mapList = graph1.findSubgraphIsomorphisms(graph3)
+        self.assertEqual(len(mapList), 16)
+        for mapping in mapList:
+            self.assertTrue(graph1.isMappingValid(graph3, mapping))
+
+    def test_selfIsomorphism(self):
+        """
+        Check the isomorphism functions when a graph is matched against
+        itself.
+        """
+        vertices = self.graph.vertices[:]
+        mapList = self.graph.findIsomorphism(self.graph)
+        self.assertEqual(len(mapList), 2)
+        for mapping in mapList:
+            self.assertTrue(self.graph.isMappingValid(self.graph, mapping))
+            self.assertTrue(all([vertex in vertices for vertex in mapping.values()]))
+        # Pinning an end vertex to the other end leaves only the reversal
+        mapList = self.graph.findIsomorphism(self.graph, {vertices[0]: vertices[5]})
+        self.assertEqual(len(mapList), 1)
+        self.assertTrue(mapList[0][vertices[1]] is vertices[4])
+        self.assertTrue(self.graph.isIsomorphic(self.graph, {vertices[0]: vertices[0]}))
+        self.assertFalse(self.graph.isIsomorphic(self.graph, {vertices[0]: vertices[1]}))
+
     def test_pickle(self):
         """
         Test that a Graph object can be successfully pickled and unpickled
@@ -512,6 +565,29 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(len(cycleList), 1)
         self.assertEqual(len(cycleList[0]), 4)
 
+    def test_getSmallestSetOfSmallestRingsCubane(self):
+        """
+        Test the Graph.getSmallestSetOfSmallestRings() method with a cubane
+        graph, in which no vertex has only two edges, and check that the rings
+        are updated when the graph is modified.
+        """
+        vertices = [Vertex() for i in range(8)]
+        graph = Graph(vertices=vertices)
+        for index1, index2 in [(0,1),(1,2),(2,3),(3,0),(4,5),(5,6),(6,7),(7,4),(0,4),(1,5),(2,6),(3,7)]:
+            graph.addEdge(Edge(vertices[index1], vertices[index2]))
+        cycleList = graph.getSmallestSetOfSmallestRings()
+        self.assertEqual(len(cycleList), 5)
+        for cycle in cycleList:
+            self.assertEqual(len(cycle), 4)
+            for index in range(4):
+                self.assertTrue(graph.hasEdge(cycle[index-1], cycle[index]))
+        for index in range(4):
+            graph.removeEdge(graph.getEdge(vertices[index], vertices[index+4]))
+        self.assertEqual(len(graph.getSmallestSetOfSmallestRings()), 2)
+        self.assertTrue(graph.isVertexInCycle(vertices[0]))
+        graph.removeEdge(graph.getEdge(vertices[0], vertices[1]))
+        self.assertFalse(graph.isVertexInCycle(vertices[0]))
+
 ################################################################################
 
 if __name__ == '__main__':
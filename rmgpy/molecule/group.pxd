@@ -31,11 +31,18 @@ from .atomtype cimport AtomType
 
 cdef class GroupAtom(Vertex):
 
-    cdef public list atomType
-    cdef public list radicalElectrons
-    cdef public list charge
+    cdef list _atomType
+    cdef list _radicalElectrons
+    cdef list _charge
     cdef public str label
-    cdef public list lonePairs
+    cdef list _lonePairs
+
+    cdef readonly object atomTypeMask
+    cdef readonly object specificMask
+    cdef readonly object equivalentMask
+    cdef readonly object radicalMask
+    cdef readonly object chargeMask
+    cdef readonly object lonePairMask
 
     cpdef Vertex copy(self)
 
@@ -61,6 +68,12 @@ cdef class GroupAtom(Vertex):
 
 ################################################################################
 
+cpdef object getValueMask(list values)
+
+cpdef object getValueBit(int value)
+
+################################################################################
+
 cdef class GroupBond(Edge):
 
     cdef public list order
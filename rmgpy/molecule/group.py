@@ -36,7 +36,7 @@ reaction sites).
 import cython
 
 from .graph import Vertex, Edge, Graph
-from .atomtype import atomTypes
+from .atomtype import AtomType, atomTypes
 
 ################################################################################
 
@@ -71,14 +71,20 @@ class GroupAtom(Vertex):
     `radicalElectrons`, and `charge` attributes are linked
     such that an atom must match values from the same index in each of these in
     order to match.
+
+    Each constraint is also stored as a bitmask, so that matching an atom
+    against the group is a handful of bitwise ANDs. The bitmasks are updated
+    whenever one of the lists is assigned, so the lists should be replaced
+    rather than modified in place.
     """
 
     def __init__(self, atomType=None, radicalElectrons=None, charge=None, label='', lonePairs=None):
         Vertex.__init__(self)
-        self.atomType = atomType or []
-        for index in range(len(self.atomType)):
-            if isinstance(self.atomType[index], str):
-                self.atomType[index] = atomTypes[self.atomType[index]]
+        atomType = atomType or []
+        for index in range(len(atomType)):
+            if isinstance(atomType[index], str):
+                atomType[index] = atomTypes[atomType[index]]
+        self.atomType = atomType
         self.radicalElectrons = radicalElectrons or []
         self.charge = charge or []
         self.label = label
@@ -125,6 +131,37 @@ class GroupAtom(Vertex):
     @property
     def bonds(self): return self.edges
 
+    def __getAtomType(self): return self._atomType
+    def __setAtomType(self, atomType):
+        cython.declare(a=AtomType)
+        self._atomType = atomType
+        self.atomTypeMask = 0
+        self.specificMask = 0
+        self.equivalentMask = 0
+        for a in atomType:
+            self.atomTypeMask |= a.bit
+            self.specificMask |= a.specificMask
+            self.equivalentMask |= a.equivalentMask
+    atomType = property(__getAtomType, __setAtomType)
+
+    def __getRadicalElectrons(self): return self._radicalElectrons
+    def __setRadicalElectrons(self, radicalElectrons):
+        self._radicalElectrons = radicalElectrons
+        self.radicalMask = getValueMask(radicalElectrons)
+    radicalElectrons = property(__getRadicalElectrons, __setRadicalElectrons)
+
+    def __getCharge(self): return self._charge
+    def __setCharge(self, charge):
+        self._charge = charge
+        self.chargeMask = getValueMask(charge)
+    charge = property(__getCharge, __setCharge)
+
+    def __getLonePairs(self): return self._lonePairs
+    def __setLonePairs(self, lonePairs):
+        self._lonePairs = lonePairs
+        self.lonePairMask = getValueMask(lonePairs)
+    lonePairs = property(__getLonePairs, __setLonePairs)
+
     def copy(self):
         """
         Return a deep copy of the :class:`GroupAtom` object. Modifying the
@@ -283,52 +320,17 @@ class GroupAtom(Vertex):
             return other.equivalent(self)
         group=other
         
-        cython.declare(atomType1=AtomType, atomtype2=AtomType, radical1=cython.short, radical2=cython.short,
-                       lp1=cython.short, lp2=cython.short, charge1=cython.short, charge2=cython.short)
-        # Compare two atom groups for equivalence
         # Each atom type in self must have an equivalent in other (and vice versa)
-        for atomType1 in self.atomType:
-            for atomType2 in group.atomType:
-                if atomType1.equivalent(atomType2): break
-            else:
-                return False
-        for atomType1 in group.atomType:
-            for atomType2 in self.atomType:
-                if atomType1.equivalent(atomType2): break
-            else:
-                return False
-        # Each free radical electron state in self must have an equivalent in other (and vice versa)
-        for radical1 in self.radicalElectrons:
-            if group.radicalElectrons:  # Only check if the list is non-empty.  An empty list indicates a wildcard.
-                for radical2  in group.radicalElectrons:
-                    if radical1 == radical2: break
-                else:
-                    return False
-        for radical1 in group.radicalElectrons:
-            if self.radicalElectrons:
-                for radical2 in self.radicalElectrons:
-                    if radical1 == radical2: break
-                else:
-                    return False
-        for lp1 in self.lonePairs:
-            if group.lonePairs:
-                for lp2 in group.lonePairs:
-                    if lp1 == lp2: break
-                else:
-                    return False
-        #Each charge in self must have an equivalent in other (and vice versa)
-        for charge1 in self.charge:
-            if group.charge:
-                for charge2 in group.charge:
-                    if charge1 == charge2: break
-                else:
-                    return False
-        for charge1 in group.charge:
-            if self.charge:
-                for charge2 in self.charge:
-                    if charge1 == charge2: break
-                else:
-                    return False
+        if self.atomTypeMask & ~group.equivalentMask or group.atomTypeMask & ~self.equivalentMask:
+            return False
+        # An empty list indicates a wildcard; otherwise the free radical
+        # electron states and charges must be the same in self and other
+        if self.radicalMask != -1 and group.radicalMask != -1 and self.radicalMask != group.radicalMask:
+            return False
+        if self.lonePairMask != -1 and group.lonePairMask != -1 and self.lonePairMask & ~group.lonePairMask:
+            return False
+        if self.chargeMask != -1 and group.chargeMask != -1 and self.chargeMask != group.chargeMask:
+            return False
         # Otherwise the two atom groups are equivalent
         return True
 
@@ -346,48 +348,44 @@ class GroupAtom(Vertex):
             return other.isSpecificCaseOf(self)
         group=other
         
-        cython.declare(atomType1=AtomType, atomtype2=AtomType, radical1=cython.short, radical2=cython.short, 
-                       lp1=cython.short, lp2=cython.short, charge1=cython.short, charge2=cython.short)
-        # Compare two atom groups for equivalence
-        # Each atom type in self must have an equivalent in other (and vice versa)
-        for atomType1 in self.atomType: # all these must match
-            for atomType2 in group.atomType: # can match any of these
-                if atomType1.isSpecificCaseOf(atomType2): break
-            else:
-                return False
-        # Each free radical electron state in self must have an equivalent in other (and vice versa)
-        if self.radicalElectrons:
-            for radical1 in self.radicalElectrons:
-                if group.radicalElectrons:
-                    for radical2 in group.radicalElectrons:
-                        if radical1 == radical2: break
-                    else:
-                        return False
-        else:
-            if group.radicalElectrons: return False
-        if self.lonePairs:
-            for lp1 in self.lonePairs:
-                if group.lonePairs:
-                    for lp2 in group.lonePairs:
-                        if lp1 == lp2: break
-                    else:
-                        return False
-        else:
-            if group.lonePairs: return False
-        #Each charge in self must have an equivalent in other
-        if self.charge:
-            for charge1 in self.charge:
-                if group.charge:
-                    for charge2 in group.charge:
-                        if charge1 == charge2: break
-                    else:
-                        return False
-        else:
-            if group.charge: return False
+        # Each atom type in self must be a specific case of one in other
+        if self.atomTypeMask & ~group.specificMask:
+            return False
+        # Each free radical electron state, lone pair count and charge in self
+        # must be allowed by other; an empty list is a wildcard, which is
+        # only a specific case of another wildcard
+        if self.radicalMask & ~group.radicalMask:
+            return False
+        if self.lonePairMask & ~group.lonePairMask:
+            return False
+        if self.chargeMask & ~group.chargeMask:
+            return False
         # Otherwise self is in fact a specific case of other
         return True
 ################################################################################
 
+def getValueMask(values):
+    """
+    Return the bitmask of a :class:`GroupAtom` constraint allowing any of the
+    integer `values`. An empty list allows any value, so all bits are set.
+    """
+    cython.declare(mask=object, value=cython.int)
+    if not values:
+        return -1
+    mask = 0
+    for value in values:
+        mask |= getValueBit(value)
+    return mask
+
+def getValueBit(value):
+    """
+    Return the bit representing the integer `value` in the bitmask of a
+    :class:`GroupAtom` constraint. Values less than -8 share the lowest bit.
+    """
+    return 1 << (value + 9) if value >= -8 else 1
+
+################################################################################
+
 class GroupBond(Edge):
     """
     A bond group. This class is based on the :class:`Bond` class, except that
@@ -179,6 +179,25 @@ class TestGroupAtom(unittest.TestCase):
                     self.assertFalse(atom1.isSpecificCaseOf(atom2gen), '{0!s} is a specific case of {1!s}'.format(atom1, atom2gen))
                     self.assertFalse(atom1gen.isSpecificCaseOf(atom2), '{0!s} is a specific case of {1!s}'.format(atom1gen, atom2))
     
+    def testConstraintMasks(self):
+        """
+        Test that the GroupAtom constraint bitmasks follow changes to the
+        attributes.
+        """
+        atom1 = GroupAtom(atomType=[atomTypes['Cd']], radicalElectrons=[1], charge=[0], label='*1')
+        atom2 = GroupAtom(atomType=[atomTypes['C']], radicalElectrons=[], charge=[0], label='*1')
+        self.assertTrue(atom1.isSpecificCaseOf(atom2))
+        atom2.radicalElectrons = [0, 2]
+        self.assertFalse(atom1.isSpecificCaseOf(atom2))
+        atom1.radicalElectrons = [2]
+        self.assertTrue(atom1.isSpecificCaseOf(atom2))
+        atom1.atomType = [atomTypes['Os']]
+        self.assertFalse(atom1.isSpecificCaseOf(atom2))
+        atom2.atomType = [atomTypes['C'], atomTypes['O']]
+        self.assertTrue(atom1.isSpecificCaseOf(atom2))
+        atom1.charge = [-1]
+        self.assertFalse(atom1.isSpecificCaseOf(atom2))
+    
     def testCopy(self):
         """
         Test the GroupAtom.copy() method.
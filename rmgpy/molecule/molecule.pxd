@@ -108,8 +108,14 @@ cdef class Molecule(Graph):
     cdef public int rdMolConfId
     cdef str _fingerprint
     cdef public dict props
+    cdef public dict templateMappings
+    cdef dict _identifiers
     
     cpdef str getFingerprint(self)
+
+    cpdef str getResonanceHash(self)
+
+    cpdef resetFingerprint(self)
     
     cpdef addAtom(self, Atom atom)
 
@@ -175,6 +181,8 @@ cdef class Molecule(Graph):
 
     cpdef fromXYZ(self, numpy.ndarray atomicNums, numpy.ndarray coordinates)
     
+    cpdef dict getIdentifiers(self)
+
     cpdef str toInChI(self)
 
     cpdef str toAugmentedInChI(self)
@@ -197,7 +205,7 @@ cdef class Molecule(Graph):
 
     cpdef double calculateCpInf(self) except -1
     
-    cpdef updateAtomTypes(self)
+    cpdef updateAtomTypes(self, list atoms=?)
     
     cpdef bint isRadical(self) except -2
     
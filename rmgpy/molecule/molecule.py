@@ -39,6 +39,7 @@ import cython
 import logging
 import os
 import re
+from collections import OrderedDict
 import element as elements
 try:
     import openbabel
@@ -46,7 +47,7 @@ except:
     pass
 from rdkit import Chem
 from .graph import Vertex, Edge, Graph
-from .group import GroupAtom, GroupBond, Group, ActionError
+from .group import GroupAtom, GroupBond, Group, ActionError, getValueBit
 from .atomtype import AtomType, atomTypes, getAtomType
 import rmgpy.constants as constants
 
@@ -85,6 +86,18 @@ _known_smiles_radicals = {
                  'O2': '[O][O]',
              }
 
+#: The resonance isomers generated most recently, as private copies, keyed by
+#: the resonance hash shared by each set of isomers
+_resonance_isomers = OrderedDict()
+#: The maximum number of resonance hashes kept in :data:`_resonance_isomers`
+_resonance_isomers_size = 1000
+
+#: The string identifiers (SMILES, InChI, etc.) of the molecules seen most
+#: recently, with private copies of the molecules, keyed by fingerprint
+_molecule_identifiers = OrderedDict()
+#: The maximum number of fingerprints kept in :data:`_molecule_identifiers`
+_molecule_identifiers_size = 1000
+
 ################################################################################
 
 class Atom(Vertex):
@@ -194,28 +207,15 @@ class Atom(Vertex):
                 self.charge                 == atom.charge
                 )
         elif isinstance(other, GroupAtom):
-            cython.declare(a=AtomType, radical=cython.short, lp=cython.short, charge=cython.short)
             ap = other
-            for a in ap.atomType:
-                if self.atomType.equivalent(a): break
-            else:
+            if self.atomType is None:
                 return False
-            if ap.radicalElectrons:
-                for radical in ap.radicalElectrons:
-                    if self.radicalElectrons == radical: break
-                else:
-                    return False
-            if ap.lonePairs:
-                for lp in ap.lonePairs:
-                    if self.lonePairs == lp: break
-                else:
-                    return False
-            if ap.charge:
-                for charge in ap.charge:
-                    if self.charge == charge: break
-                else:
-                    return False
-            return True
+            return (
+                (self.atomType.bit & ap.equivalentMask) != 0 and
+                (getValueBit(self.radicalElectrons) & ap.radicalMask) != 0 and
+                (getValueBit(self.lonePairs) & ap.lonePairMask) != 0 and
+                (getValueBit(self.charge) & ap.chargeMask) != 0
+            )
 
     def isSpecificCaseOf(self, other):
         """
@@ -228,30 +228,16 @@ class Atom(Vertex):
         if isinstance(other, Atom):
             return self.equivalent(other)
         elif isinstance(other, GroupAtom):
-            cython.declare(atom=GroupAtom, a=AtomType, radical=cython.short, lp = cython.short, charge=cython.short)
+            cython.declare(atom=GroupAtom)
             atom = other
             if self.atomType is None:
                 return False
-            for a in atom.atomType: 
-                if self.atomType.isSpecificCaseOf(a): break
-            else:
-                return False
-            if atom.radicalElectrons:
-                for radical in atom.radicalElectrons:
-                    if self.radicalElectrons == radical: break
-                else:
-                    return False
-            if atom.lonePairs:
-                for lp in atom.lonePairs:
-                    if self.lonePairs == lp: break
-                else:
-                    return False
-            if atom.charge:
-                for charge in atom.charge:
-                    if self.charge == charge: break
-                else:
-                    return False
-            return True
+            return (
+                (self.atomType.bit & atom.specificMask) != 0 and
+                (getValueBit(self.radicalElectrons) & atom.radicalMask) != 0 and
+                (getValueBit(self.lonePairs) & atom.lonePairMask) != 0 and
+                (getValueBit(self.charge) & atom.chargeMask) != 0
+            )
 
     def copy(self):
         """
@@ -596,6 +582,7 @@ class Molecule(Graph):
     ======================= =========== ========================================
     `symmetryNumber`        ``int``     The (estimated) external + internal symmetry number of the molecule
     `multiplicity`          ``int``     The multiplicity of this species, multiplicity = 2*total_spin+1
+    `templateMappings`      ``dict``    The cached subgraph mappings to reaction family templates, if any
     ======================= =========== ========================================
 
     A new molecule object can be easily instantiated by passing the `SMILES` or
@@ -607,6 +594,8 @@ class Molecule(Graph):
         self.symmetryNumber = symmetry
         self.multiplicity = multiplicity
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         if SMILES != '': self.fromSMILES(SMILES)
         elif InChI != '': self.fromInChI(InChI)
         elif SMARTS != '': self.fromSMARTS(SMARTS)
@@ -637,7 +626,11 @@ class Molecule(Graph):
         return (Molecule, (self.vertices, self.symmetryNumber, self.multiplicity, self.props))
 
     def __getAtoms(self): return self.vertices
-    def __setAtoms(self, atoms): self.vertices = atoms
+    def __setAtoms(self, atoms):
+        self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
+        self.vertices = atoms
     atoms = property(__getAtoms, __setAtoms)
 
     def addAtom(self, atom):
@@ -645,6 +638,8 @@ class Molecule(Graph):
         Add an `atom` to the graph. The atom is initialized with no bonds.
         """
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         return self.addVertex(atom)
     
     def addBond(self, bond):
@@ -653,6 +648,8 @@ class Molecule(Graph):
         and `atom2`.
         """
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         return self.addEdge(bond)
 
     def getBonds(self, atom):
@@ -688,6 +685,8 @@ class Molecule(Graph):
         removal.
         """
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         return self.removeVertex(atom)
 
     def removeBond(self, bond):
@@ -697,6 +696,8 @@ class Molecule(Graph):
         this removal.
         """
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         return self.removeEdge(bond)
 
     def sortAtoms(self):
@@ -855,6 +856,8 @@ class Molecule(Graph):
                        bond=Bond, atoms=list, zBoundary=float)
                        # groupBond=GroupBond, 
         self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         
         atoms = self.vertices
         
@@ -891,14 +894,31 @@ class Molecule(Graph):
                     self.addBond(bond)
         self.updateAtomTypes()
         
-    def updateAtomTypes(self):
+    def updateAtomTypes(self, atoms=None):
         """
         Iterate through the atoms in the structure, checking their atom types
         to ensure they are correct (i.e. accurately describe their local bond
-        environment) and complete (i.e. are as detailed as possible).
+        environment) and complete (i.e. are as detailed as possible). If a
+        list of the `atoms` whose bonds, radicals or lone pairs have changed
+        is given, only those atoms, their neighbors and any atoms without an
+        atom type are updated.
         """
-        for atom in self.vertices:
-            atom.atomType = getAtomType(atom, atom.edges)
+        cython.declare(atom=Atom, neighbor=Atom, changed=set)
+        self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
+        if atoms is None:
+            for atom in self.vertices:
+                atom.atomType = getAtomType(atom, atom.edges)
+        else:
+            changed = set()
+            for atom in atoms:
+                changed.add(atom)
+                for neighbor in atom.edges:
+                    changed.add(neighbor)
+            for atom in self.vertices:
+                if atom.atomType is None or atom in changed:
+                    atom.atomType = getAtomType(atom, atom.edges)
             
     def updateMultiplicity(self):
         """
@@ -956,10 +976,101 @@ class Molecule(Graph):
         short string containing a summary of selected information about the 
         molecule. Two fingerprint strings matching is a necessary (but not
         sufficient) condition for the associated molecules to be isomorphic.
+
+        The fingerprint contains the molecular formula, the number of rings,
+        and a hash of the atom invariants (element, radicals, lone pairs,
+        charge, and bond orders) refined iteratively over the neighbors of
+        each atom. It is stored until the molecule is modified.
         """
+        cython.declare(atom1=Atom, atom2=Atom, bond=Bond, labels=dict, newLabels=dict)
+        cython.declare(histogram=tuple, numLabels=cython.int, numEdges=cython.int, numComponents=cython.int, visited=set, stack=list)
         if self._fingerprint is None:
-            self._fingerprint = self.getFormula()
+            # The initial label of each atom summarizes its own attributes and
+            # the orders of its bonds
+            labels = {}
+            for atom1 in self.vertices:
+                labels[atom1] = hash((atom1.element.symbol, atom1.radicalElectrons, atom1.lonePairs, atom1.charge,
+                    tuple(sorted([bond.order for bond in atom1.edges.itervalues()]))))
+            histogram = tuple(sorted(labels.itervalues()))
+
+            # Refine the labels with those of the neighbors of each atom until
+            # the number of distinct labels stops increasing
+            numLabels = len(set(histogram))
+            while True:
+                newLabels = {}
+                for atom1 in self.vertices:
+                    newLabels[atom1] = hash((labels[atom1],
+                        tuple(sorted([(bond.order, labels[atom2]) for atom2, bond in atom1.edges.iteritems()]))))
+                if len(set(newLabels.itervalues())) <= numLabels:
+                    break
+                labels = newLabels
+                numLabels = len(set(labels.itervalues()))
+
+            # The number of rings is the number of bonds, less the number of
+            # bonds in a spanning forest of the graph
+            numEdges = 0; numComponents = 0
+            visited = set()
+            for atom1 in self.vertices:
+                numEdges += len(atom1.edges)
+                if atom1 in visited:
+                    continue
+                numComponents += 1
+                visited.add(atom1)
+                stack = [atom1]
+                while stack:
+                    for atom2 in stack.pop().edges:
+                        if atom2 not in visited:
+                            visited.add(atom2)
+                            stack.append(atom2)
+
+            self._fingerprint = '{0}|{1:d}|{2:d}'.format(
+                self.getFormula(),
+                numEdges / 2 - len(self.vertices) + numComponents,
+                hash((histogram, tuple(sorted(labels.itervalues())))),
+            )
         return self._fingerprint
+
+    def getResonanceHash(self):
+        """
+        Return a string summarizing the parts of the molecule that are shared
+        by all of its resonance isomers: the molecular formula, the net charge,
+        and a hash of the element and number of bonds of each atom refined
+        iteratively over its neighbors, ignoring bond orders.
+        Two resonance hashes matching is a necessary (but not sufficient)
+        condition for one molecule to be isomorphic to a resonance isomer of
+        the other.
+        """
+        cython.declare(atom1=Atom, atom2=Atom, labels=dict, newLabels=dict, numLabels=cython.int, charge=cython.int)
+        labels = {}
+        charge = 0
+        for atom1 in self.vertices:
+            labels[atom1] = hash((atom1.element.symbol, len(atom1.edges)))
+            charge += atom1.charge
+        numLabels = len(set(labels.itervalues()))
+        while True:
+            newLabels = {}
+            for atom1 in self.vertices:
+                newLabels[atom1] = hash((labels[atom1], tuple(sorted([labels[atom2] for atom2 in atom1.edges]))))
+            if len(set(newLabels.itervalues())) <= numLabels:
+                break
+            labels = newLabels
+            numLabels = len(set(labels.itervalues()))
+        return '{0}|{1:d}|{2:d}'.format(
+            self.getFormula(),
+            charge,
+            hash(tuple(sorted(labels.itervalues()))),
+        )
+
+    def resetFingerprint(self):
+        """
+        Discard the stored fingerprint, template mappings, identifiers, and
+        cycles, which must be done whenever the atoms or bonds of the molecule
+        are modified in place.
+        """
+        self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
+        self.resetCycles()
     
     def isIsomorphic(self, other, initialMap=None):
         """
@@ -1318,6 +1429,36 @@ class Molecule(Graph):
         newMol.updateAtomTypes()
         return newMol
 
+    def getIdentifiers(self):
+        """
+        Return the dictionary of the string identifiers (SMILES, InChI, etc.)
+        computed so far for this molecule, keyed by the name of the identifier
+        and the multiplicity. The dictionary is shared with the recently seen
+        molecules isomorphic to this one, so each identifier is only computed
+        once for each structure, and is discarded when the molecule is
+        modified.
+        """
+        cython.declare(fingerprint=str, entries=list, other=Molecule, identifiers=dict)
+        if self._identifiers is None:
+            fingerprint = self.getFingerprint()
+            entries = _molecule_identifiers.get(fingerprint)
+            if entries is not None:
+                for other, identifiers in entries:
+                    if self.isIsomorphic(other):
+                        _molecule_identifiers[fingerprint] = _molecule_identifiers.pop(fingerprint)
+                        self._identifiers = identifiers
+                        break
+            if self._identifiers is None:
+                # Store a private copy of the molecule in the cache, discarding
+                # the least recently used entry if it is full
+                self._identifiers = {}
+                entries = _molecule_identifiers.pop(fingerprint, [])
+                entries.append((self.copy(deep=True), self._identifiers))
+                _molecule_identifiers[fingerprint] = entries
+                if len(_molecule_identifiers) > _molecule_identifiers_size:
+                    _molecule_identifiers.popitem(last=False)
+        return self._identifiers
+
     def toInChI(self):
         """
         Convert a molecular structure to an InChI string. Uses
@@ -1329,19 +1470,25 @@ class Molecule(Graph):
         Convert a molecular structure to an InChI string. Uses
         `OpenBabel <http://openbabel.org/>`_ to perform the conversion.
         """
+        identifiers = self.getIdentifiers()
+        key = ('InChI', self.multiplicity)
+        if key in identifiers:
+            return identifiers[key]
+
         try:
             if not Chem.inchi.INCHI_AVAILABLE:
                 return "RDKitInstalledWithoutInChI"
             rdkitmol = self.toRDKitMol()
-            return Chem.inchi.MolToInchi(rdkitmol, options='-SNon')
+            inchi = Chem.inchi.MolToInchi(rdkitmol, options='-SNon')
         except:
-            pass
+            obmol = self.toOBMol()
+            obConversion = openbabel.OBConversion()
+            obConversion.SetOutFormat('inchi')
+            obConversion.SetOptions('w', openbabel.OBConversion.OUTOPTIONS)
+            inchi = obConversion.WriteString(obmol).strip()
 
-        obmol = self.toOBMol()
-        obConversion = openbabel.OBConversion()
-        obConversion.SetOutFormat('inchi')
-        obConversion.SetOptions('w', openbabel.OBConversion.OUTOPTIONS)
-        return obConversion.WriteString(obmol).strip()
+        identifiers[key] = inchi
+        return inchi
 
     def createMultiplicityLayer(self):
         """
@@ -1378,24 +1525,30 @@ class Molecule(Graph):
         Removes check-sum dash (-) and character so that only 
         the 14 + 9 characters remain.
         """
+        identifiers = self.getIdentifiers()
+        key = ('InChIKey', self.multiplicity)
+        if key in identifiers:
+            return identifiers[key]
+
         try:
             if not Chem.inchi.INCHI_AVAILABLE:
                 return "RDKitInstalledWithoutInChI"
             inchi = self.toInChI()
-            return Chem.inchi.InchiToInchiKey(inchi)[:-2]
+            inchiKey = Chem.inchi.InchiToInchiKey(inchi)[:-2]
         except:
-            pass
-        
-        import openbabel
-
-#        for atom in self.vertices:
- #           if atom.isNitrogen():
-        obmol = self.toOBMol()
-        obConversion = openbabel.OBConversion()
-        obConversion.SetOutFormat('inchi')
-        obConversion.SetOptions('w', openbabel.OBConversion.OUTOPTIONS)
-        obConversion.SetOptions('K', openbabel.OBConversion.OUTOPTIONS)
-        return obConversion.WriteString(obmol).strip()[:-2]
+            import openbabel
+
+#            for atom in self.vertices:
+ #               if atom.isNitrogen():
+            obmol = self.toOBMol()
+            obConversion = openbabel.OBConversion()
+            obConversion.SetOutFormat('inchi')
+            obConversion.SetOptions('w', openbabel.OBConversion.OUTOPTIONS)
+            obConversion.SetOptions('K', openbabel.OBConversion.OUTOPTIONS)
+            inchiKey = obConversion.WriteString(obmol).strip()[:-2]
+
+        identifiers[key] = inchiKey
+        return inchiKey
     
     def toAugmentedInChIKey(self):
         """
@@ -1447,13 +1600,23 @@ class Molecule(Graph):
         except KeyError:
             # It wasn't in the above list.
             pass
+
+        identifiers = self.getIdentifiers()
+        key = ('SMILES', self.multiplicity)
+        if key in identifiers:
+            return identifiers[key]
+
         for atom in self.vertices:
             if atom.isNitrogen():
                 mol = self.toOBMol()
-                return SMILEwriter.WriteString(mol).strip()
+                smiles = SMILEwriter.WriteString(mol).strip()
+                break
+        else:
+            rdkitmol = self.toRDKitMol()
+            smiles = Chem.MolToSmiles(rdkitmol)
 
-        rdkitmol = self.toRDKitMol()
-        return Chem.MolToSmiles(rdkitmol)
+        identifiers[key] = smiles
+        return smiles
 
     def toOBMol(self):
         """
@@ -1681,12 +1844,33 @@ class Molecule(Graph):
     
     def generateResonanceIsomers(self):
         """
-        Generate and return all of the resonance isomers of this molecule.
+        Generate and return all of the resonance isomers of this molecule. The
+        first isomer is the molecule itself and the others are new molecules.
+        The isomers of recently seen molecules are reused, by copying them,
+        from a cache keyed by their resonance hash. Since the isomers reached
+        from each isomer can differ, as for Kekule and aromatic benzene, a set
+        is only reused for molecules isomorphic to the one it was generated
+        from.
         """
         cython.declare(isomers=list, newIsomers=list, index=cython.int, atom=Atom)
         cython.declare(isomer=Molecule, newIsomer=Molecule, isom=Molecule)
+        cython.declare(key=str, cached=list, found=dict, fingerprint=str)
+        
+        # Check the cache for a set generated from an isomorphic molecule; the
+        # other isomers are returned as copies so that the cached isomers are
+        # never modified
+        key = self.getResonanceHash()
+        cached = _resonance_isomers.get(key)
+        if cached is not None:
+            for newIsomers in cached:
+                if self.isIsomorphic(newIsomers[0]):
+                    _resonance_isomers[key] = _resonance_isomers.pop(key)
+                    return [self] + [isomer.copy(deep=True) for isomer in newIsomers[1:]]
         
         isomers = [self]
+        # The isomers found so far, keyed by fingerprint, so that each new
+        # isomer need only be checked for isomorphism against those sharing it
+        found = {self.getFingerprint(): [self]}
 
         # Iterate over resonance isomers
         index = 0
@@ -1700,11 +1884,13 @@ class Molecule(Graph):
             for newIsomer in newIsomers:
                 newIsomer.updateAtomTypes()
                 # Append to isomer list if unique
-                for isom in isomers:
+                fingerprint = newIsomer.getFingerprint()
+                for isom in found.get(fingerprint, []):
                     if isom.isIsomorphic(newIsomer):
                         break
                 else:
                     isomers.append(newIsomer)
+                    found.setdefault(fingerprint, []).append(newIsomer)
             
             newIsomers = isomer.getAromaticResonanceIsomers()
             # Perform extra check for aromatic isomers when updating atomtypes
@@ -1716,16 +1902,30 @@ class Molecule(Graph):
                     # Do not add the new isomer since it is malformed
                     continue 
                 # Append to isomer list if unique
-                for isom in isomers:
+                fingerprint = newIsomer.getFingerprint()
+                for isom in found.get(fingerprint, []):
                     if isom.isIsomorphic(newIsomer):
                         break
                 else:
                     isomers.append(newIsomer)
+                    found.setdefault(fingerprint, []).append(newIsomer)
             
                         
             # Move to next resonance isomer
             index += 1
         
+        # Store private, unlabeled copies of the isomers in the cache, since
+        # those returned belong to the caller, discarding the least recently
+        # used entry if it is full
+        newIsomers = [isomer.copy(deep=True) for isomer in isomers]
+        for isomer in newIsomers:
+            isomer.clearLabeledAtoms()
+        cached = _resonance_isomers.pop(key, [])
+        cached.append(newIsomers)
+        _resonance_isomers[key] = cached
+        if len(_resonance_isomers) > _resonance_isomers_size:
+            _resonance_isomers.popitem(last=False)
+        
         return isomers
 
     def getAdjacentResonanceIsomers(self):
@@ -2053,6 +2253,9 @@ class Molecule(Graph):
         number of lone electron pairs, assuming a neutral molecule.
         """
         cython.declare(atom1=Atom, atom2=Atom, bond12=Bond, order=float)
+        self._fingerprint = None
+        self.templateMappings = None
+        self._identifiers = None
         for atom1 in self.vertices:
             order = 0
             if not atom1.isHydrogen():
@@ -3,6 +3,7 @@
 
 import unittest
 from external.wip import work_in_progress
+import rmgpy.molecule.molecule
 from rmgpy.molecule.molecule import Atom, Bond, Molecule, ActionError
 from rmgpy.molecule.group import Group
 from rmgpy.molecule.element import getElement, elementList
@@ -660,6 +661,126 @@ class TestMolecule(unittest.TestCase):
         self.assertTrue(molecule1.isIsomorphic(molecule2))
         self.assertTrue(molecule2.isIsomorphic(molecule1))
 
+    def testFingerprint(self):
+        """
+        Check that the fingerprint distinguishes isomers of the same formula
+        and is discarded when the molecule is modified.
+        """
+        molecule1 = Molecule().fromSMILES('CCCC')
+        molecule2 = Molecule().fromSMILES('CC(C)C')
+        molecule3 = Molecule().fromSMILES('C(C)CC')
+        self.assertEqual(molecule1.getFormula(), molecule2.getFormula())
+        self.assertNotEqual(molecule1.getFingerprint(), molecule2.getFingerprint())
+        self.assertEqual(molecule1.getFingerprint(), molecule3.getFingerprint())
+        self.assertNotEqual(Molecule().fromSMILES('C1CCC1').getFingerprint(), Molecule().fromSMILES('C=CCC').getFingerprint())
+
+        molecule4 = Molecule().fromSMILES('[CH2]CCC')
+        molecule5 = Molecule().fromSMILES('C[CH]CC')
+        self.assertNotEqual(molecule4.getFingerprint(), molecule5.getFingerprint())
+        fingerprint = molecule1.getFingerprint()
+        molecule1.removeAtom(molecule1.atoms[-1])
+        self.assertNotEqual(molecule1.getFingerprint(), fingerprint)
+
+    def testResonanceHash(self):
+        """
+        Check that the resonance hash is shared by resonance isomers but
+        distinguishes different skeletons of the same formula.
+        """
+        molecule = Molecule().fromSMILES('C=CC=C[CH2]')
+        isomers = molecule.generateResonanceIsomers()
+        self.assertTrue(len(isomers) > 1)
+        for isomer in isomers:
+            self.assertEqual(isomer.getResonanceHash(), molecule.getResonanceHash())
+        self.assertNotEqual(Molecule().fromSMILES('[CH2]CCC').getResonanceHash(), Molecule().fromSMILES('C[C](C)C').getResonanceHash())
+        self.assertEqual(Molecule().fromSMILES('[CH2]CCC').getResonanceHash(), Molecule().fromSMILES('C[CH]CC').getResonanceHash())
+
+    def testResonanceIsomersCache(self):
+        """
+        Check that resonance isomers reused from the cache are new copies that
+        follow the given molecule, and that they are only reused for molecules
+        isomorphic to the one they were generated from.
+        """
+        rmgpy.molecule.molecule._resonance_isomers.clear()
+        molecule1 = Molecule().fromSMILES('C=CC=C[CH2]')
+        isomers1 = molecule1.generateResonanceIsomers()
+        molecule2 = molecule1.copy(deep=True)
+        molecule1.atoms[0].radicalElectrons += 1
+        isomers2 = molecule2.generateResonanceIsomers()
+        self.assertEqual(len(isomers1), len(isomers2))
+        self.assertTrue(isomers2[0] is molecule2)
+        for isomer in isomers2[1:]:
+            self.assertFalse(any([isomer is other for other in isomers1]))
+            self.assertTrue(any([isomer.isIsomorphic(other) for other in isomers1[1:]]))
+        isomers2[1].atoms[0].radicalElectrons += 1
+        isomers3 = molecule2.copy(deep=True).generateResonanceIsomers()
+        self.assertTrue(all([isomer.isIsomorphic(other) for isomer, other in zip(isomers1[1:], isomers3[1:])]))
+        # Another isomer of the set is not the one it was generated from
+        molecule4 = isomers1[1].copy(deep=True)
+        isomers4 = molecule4.generateResonanceIsomers()
+        self.assertEqual(len(isomers1), len(isomers4))
+        cached = rmgpy.molecule.molecule._resonance_isomers[molecule4.getResonanceHash()]
+        self.assertEqual(len(cached), 2)
+        self.assertTrue(cached[0][0].isIsomorphic(molecule2))
+        self.assertTrue(cached[1][0].isIsomorphic(molecule4))
+
+    def testResonanceIsomersCacheAfterMiss(self):
+        """
+        Check that the resonance isomers returned when the cache is missed are
+        not the cached ones, so modifying them does not affect later hits.
+        """
+        rmgpy.molecule.molecule._resonance_isomers.clear()
+        adjlist = "multiplicity 2\n1 C u1 {2,S}\n2 C u0 {1,S} {3,D}\n3 C u0 {2,D} {4,S}\n4 C u0 {3,S}"
+        isomers1 = Molecule().fromAdjacencyList(adjlist, saturateH=True).generateResonanceIsomers()
+        self.assertEqual(len(isomers1), 2)
+        for atom in isomers1[1].atoms:
+            if atom.radicalElectrons > 0:
+                atom.decrementRadical()
+        isomers1[1].multiplicity = 1
+        isomers2 = Molecule().fromAdjacencyList(adjlist, saturateH=True).generateResonanceIsomers()
+        self.assertEqual(len(isomers2), 2)
+        self.assertEqual(isomers2[1].multiplicity, 2)
+        self.assertEqual(isomers2[1].getNumberOfRadicalElectrons(), 1)
+
+    def testIdentifierCache(self):
+        """
+        Check that the identifiers of a molecule are shared with isomorphic
+        molecules and are discarded when the molecule is modified.
+        """
+        molecule1 = Molecule().fromSMILES('CCO')
+        inchi = molecule1.toInChI()
+        molecule2 = Molecule().fromSMILES('OCC')
+        self.assertTrue(molecule2.getIdentifiers() is molecule1.getIdentifiers())
+        self.assertEqual(molecule2.toInChI(), inchi)
+        molecule1.removeAtom(molecule1.atoms[-1])
+        self.assertFalse(molecule2.getIdentifiers() is molecule1.getIdentifiers())
+        self.assertNotEqual(molecule1.toInChI(), inchi)
+
+    def testUpdateAtomTypesOfChangedAtoms(self):
+        """
+        Check that updating the atom types of the atoms changed by an action
+        also updates their neighbors and any atoms without an atom type.
+        """
+        molecule = Molecule().fromAdjacencyList("""
+        1 C u0 p0 c0 {2,S} {4,S} {5,S} {6,S}
+        2 C u0 p0 c0 {1,S} {3,D} {7,S}
+        3 C u0 p0 c0 {2,D} {8,S} {9,S}
+        4 O u0 p2 c0 {1,S} {10,S}
+        5 H u0 p0 c0 {1,S}
+        6 H u0 p0 c0 {1,S}
+        7 H u0 p0 c0 {2,S}
+        8 H u0 p0 c0 {3,S}
+        9 H u0 p0 c0 {3,S}
+        10 H u0 p0 c0 {4,S}
+        """)
+        atom1, atom2, atom3, atom4 = molecule.atoms[0:4]
+        self.assertEqual([atom.atomType.label for atom in (atom1, atom2, atom3, atom4)], ['Cs', 'Cd', 'Cd', 'Os'])
+        atom2.edges[atom3].decrementOrder()
+        atom2.incrementRadical()
+        atom3.incrementRadical()
+        atom4.atomType = None
+        molecule.updateAtomTypes([atom2])
+        self.assertEqual([atom.atomType.label for atom in (atom1, atom2, atom3, atom4)], ['Cs', 'Cs', 'Cs', 'Os'])
+
     def testSubgraphIsomorphism(self):
         """
         Check the graph isomorphism functions.
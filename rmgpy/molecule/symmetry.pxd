@@ -37,3 +37,5 @@ cpdef int calculateAxisSymmetryNumber(Molecule molecule) except -1
 cpdef int calculateCyclicSymmetryNumber(Molecule molecule) except -1
 
 cpdef int calculateSymmetryNumber(Molecule molecule) except -1
+
+cpdef int estimateSymmetryNumber(Molecule molecule) except -1
@@ -32,6 +32,14 @@ This module provides functionality for estimating the symmetry number of a
 molecule from its chemical graph representation.
 """
 
+from collections import OrderedDict
+
+#: The symmetry numbers of the molecules seen most recently, with private
+#: copies of the molecules, keyed by fingerprint
+_symmetry_numbers = OrderedDict()
+#: The maximum number of fingerprints kept in :data:`_symmetry_numbers`
+_symmetry_numbers_size = 1000
+
 def calculateAtomSymmetryNumber(molecule, atom):
     """
     Return the symmetry number centered at `atom` in the structure. The
@@ -51,6 +59,18 @@ def calculateAtomSymmetryNumber(molecule, atom):
     # If atom has zero or one neighbors, the symmetry number is 1
     if numNeighbors < 2: return symmetryNumber
 
+    # Only the bonding patterns checked below can give a symmetry number
+    # greater than 1, so don't copy the molecule for any other atom
+    if not atom.isNitrogen():
+        if atom.radicalElectrons == 0:
+            if single not in [2, 3, 4] and double != 2: return symmetryNumber
+        elif atom.radicalElectrons == 1:
+            if single != 3: return symmetryNumber
+        elif atom.radicalElectrons == 2:
+            if single != 2: return symmetryNumber
+        else:
+            return symmetryNumber
+
     # Create temporary structures for each functional group attached to atom
     molecule0 = molecule
     molecule = molecule0.copy(True)
@@ -430,7 +450,34 @@ def calculateCyclicSymmetryNumber(molecule):
 def calculateSymmetryNumber(molecule):
     """
     Return the symmetry number for the structure. The symmetry number
-    includes both external and internal modes.
+    includes both external and internal modes. The symmetry numbers of
+    recently seen structures are reused from a cache.
+    """
+    fingerprint = molecule.getFingerprint()
+    cached = _symmetry_numbers.get(fingerprint)
+    if cached is not None:
+        for other, symmetryNumber in cached:
+            if molecule.isIsomorphic(other):
+                _symmetry_numbers[fingerprint] = _symmetry_numbers.pop(fingerprint)
+                return symmetryNumber
+
+    symmetryNumber = estimateSymmetryNumber(molecule)
+
+    # Store a private copy of the molecule in the cache, discarding the least
+    # recently used entry if it is full
+    cached = _symmetry_numbers.pop(fingerprint, [])
+    cached.append((molecule.copy(deep=True), symmetryNumber))
+    _symmetry_numbers[fingerprint] = cached
+    if len(_symmetry_numbers) > _symmetry_numbers_size:
+        _symmetry_numbers.popitem(last=False)
+
+    return symmetryNumber
+
+def estimateSymmetryNumber(molecule):
+    """
+    Return the symmetry number for the structure, estimated from the
+    symmetry about each atom, bond, cumulated double bond axis, and ring.
+    The symmetry number includes both external and internal modes.
     """
     symmetryNumber = 1
 
@@ -5,7 +5,7 @@ import unittest
 from external.wip import work_in_progress
 
 from rmgpy.molecule.molecule import Molecule
-from rmgpy.molecule.symmetry import calculateAtomSymmetryNumber, calculateAxisSymmetryNumber, calculateBondSymmetryNumber, calculateCyclicSymmetryNumber
+from rmgpy.molecule.symmetry import calculateAtomSymmetryNumber, calculateAxisSymmetryNumber, calculateBondSymmetryNumber, calculateCyclicSymmetryNumber, calculateSymmetryNumber, estimateSymmetryNumber
 from rmgpy.species import Species
 
 ################################################################################
@@ -383,6 +383,17 @@ class TestMoleculeSymmetry(unittest.TestCase):
         """
         self.assertEqual(Molecule().fromSMILES('C1=C=C=1').calculateSymmetryNumber(), 6)
     
+    def testSymmetryNumberCache(self):
+        """
+        Test that calculateSymmetryNumber() gives the estimated symmetry
+        number of each molecule when it is reused from the cache.
+        """
+        smiles = ['CCCC', 'CC(C)C', 'C[CH]C', '[CH2]C(C)C', 'C=C=C', 'C1CCCCC1', 'CC1CCCCC1']
+        for i in range(2):
+            for smi in smiles:
+                molecule = Molecule().fromSMILES(smi)
+                self.assertEqual(calculateSymmetryNumber(molecule), estimateSymmetryNumber(molecule))
+    
 ################################################################################
 
 if __name__ == '__main__':
@@ -27,6 +27,14 @@
 """
 This module contains graph ismorphism functions that implement the VF2
 algorithm of Vento and Foggia.
+
+The search state is kept on the vertices themselves. Each vertex of the second
+graph to be matched is chosen among those adjacent to the current mapping, so
+its candidates in the first graph are limited to the neighbors of the vertex
+its mapped neighbor is matched to. The semantic checks are only made for the
+pairs that pass the cheaper structural checks; for atoms these compare element,
+electron and charge values or the precomputed atom type bitsets of
+:class:`GroupAtom`.
 """
 
 cimport cython
@@ -95,11 +103,23 @@ cdef class VF2:
         If `findAll` is ``True``, all isomorphisms are found; otherwise only
         the first is found.
         """
-        cdef int callDepth, index1, index2
+        cdef int callDepth
+        cdef Vertex vertex1, vertex2
+        cdef dict originals = None
+        cdef dict mapping
         
         if self.graph1 is not graph1:
             self.graph1 = graph1
             graph1.sortVertices()
+        
+        # The mapping state is stored on the vertices themselves, so a graph
+        # cannot be matched against itself directly; match it against a copy
+        # instead and translate the mappings back afterwards
+        if graph2 is graph1:
+            graph2 = graph1.copy(deep=True)
+            originals = dict(zip(graph2.vertices, graph1.vertices))
+            if initialMapping is not None:
+                initialMapping = dict([(vertex1, graph2.vertices[graph1.vertices.index(vertex2)]) for vertex1, vertex2 in initialMapping.iteritems()])
             
         if self.graph2 is not graph2:
             self.graph2 = graph2
@@ -148,6 +168,12 @@ cdef class VF2:
             callDepth -= len(self.initialMapping)
             
         self.match(callDepth)
+        
+        if originals is not None:
+            self.graph2 = None
+            for mapping in self.mappingList:
+                for vertex1, vertex2 in mapping.items():
+                    mapping[vertex1] = originals[vertex2]
 
     cdef bint match(self, int callDepth) except -2:
         """
@@ -155,9 +181,9 @@ cdef class VF2:
         are matched or the viable set of matches is exhausted. The `callDepth`
         parameter helps ensure we never enter an infinite loop.
         """
-        cdef Vertex vertex1, vertex2
+        cdef Vertex vertex1, vertex2, vertex, anchor
         cdef dict mapping
-        cdef bint hasTerminals
+        cdef bint isMatch
         
         # The call depth should never be negative!
         if callDepth < 0:
@@ -175,20 +201,30 @@ cdef class VF2:
             self.isMatch = True
             return True
 
-        # Create list of pairs of candidates for inclusion in mapping
-        hasTerminals = False
-        for vertex2 in self.graph2.vertices:
-            if vertex2.terminal:
-                # graph2 has terminals, so graph1 also must have terminals
-                hasTerminals = True
+        # Match the first terminal of graph2 next, or if there are none (at
+        # the start of each connected component) the first unmapped vertex
+        vertex2 = None
+        for vertex in self.graph2.vertices:
+            if vertex.terminal:
+                vertex2 = vertex
                 break
+            elif vertex2 is None and vertex.mapping is None:
+                vertex2 = vertex
+
+        if vertex2.terminal:
+            # The match must be a neighbor of the vertex that a mapped
+            # neighbor of vertex2 is matched to
+            anchor = None
+            for vertex in vertex2.edges:
+                if vertex.mapping is not None:
+                    anchor = vertex.mapping
+                    break
+            candidates = anchor.edges
         else:
-            vertex2 = self.graph2.vertices[0]
-            
-        for vertex1 in self.graph1.vertices:
-            # If terminals are available, then skip vertices in the first
-            # graph that are not terminals
-            if hasTerminals and not vertex1.terminal: continue
+            candidates = self.graph1.vertices
+
+        for vertex1 in candidates:
+            if vertex1.mapping is not None: continue
             # Propose a pairing
             if self.feasible(vertex1, vertex2):
                 # Add proposed match to mapping
@@ -213,6 +249,7 @@ cdef class VF2:
         """
         cdef Vertex vert1, vert2
         cdef Edge edge1, edge2
+        cdef dict edges1, edges2
         cdef int term1Count, term2Count, neither1Count, neither2Count
         
         if not self.subgraph:
@@ -229,36 +266,33 @@ cdef class VF2:
         
         # Semantic check #2: adjacent vertices to vertex1 and vertex2 that are
         # already mapped should be connected by equivalent edges
-        for vert2 in vertex2.edges:
-            if vert2.mapping is not None:
-                vert1 = vert2.mapping
-                if vert1 not in vertex1.edges:
+        # Also count the number of terminals adjacent to each vertex
+        edges1 = vertex1.edges; edges2 = vertex2.edges
+        term1Count = 0; term2Count = 0; neither1Count = 0; neither2Count = 0
+        for vert2, edge2 in edges2.iteritems():
+            vert1 = vert2.mapping
+            if vert1 is not None:
+                edge1 = edges1.get(vert1)
+                if edge1 is None:
                     # The vertices are joined in graph2, but not in graph1
                     return False
-                edge1 = vertex1.edges[vert1]
-                edge2 = vertex2.edges[vert2]
                 if self.subgraph:
                     if not edge1.isSpecificCaseOf(edge2): return False
                 else:
                     if not edge1.equivalent(edge2): return False
-
-        # There could still be edges in graph1 that aren't in graph2; this is okay
-        # for subgraph matching, but not for exact matching
-        if not self.subgraph:
-            for vert1 in vertex1.edges:
-                if vert1.mapping is not None:
-                    if vert1.mapping not in vertex2.edges: 
-                        # The vertices are joined in graph1, but not in graph2
-                        return False
-
-        # Count number of terminals adjacent to vertex1 and vertex2
-        term1Count = 0; term2Count = 0; neither1Count = 0; neither2Count = 0
-        for vert1 in vertex1.edges:
-            if vert1.terminal: term1Count += 1
-            elif vert1.mapping is not None: neither1Count += 1
-        for vert2 in vertex2.edges:
-            if vert2.terminal: term2Count += 1
-            elif vert2.mapping is not None: neither2Count += 1
+                neither2Count += 1
+            elif vert2.terminal:
+                term2Count += 1
+        for vert1 in edges1:
+            vert2 = vert1.mapping
+            if vert2 is not None:
+                # There could still be edges in graph1 that aren't in graph2;
+                # this is okay for subgraph matching, but not for exact matching
+                if not self.subgraph and vert2 not in edges2:
+                    return False
+                neither1Count += 1
+            elif vert1.terminal:
+                term1Count += 1
 
         # Level 2 look-ahead: the number of adjacent vertices of vertex1 and
         # vertex2 that are non-terminals must be equal
@@ -274,18 +308,6 @@ cdef class VF2:
         else:
             if term1Count != term2Count: return False
 
-        # Level 0 look-ahead: all adjacent vertices of vertex2 already in the
-        # mapping must map to adjacent vertices of vertex1
-        for vert2 in vertex2.edges:
-            if vert2.mapping is not None:
-                if vert2.mapping not in vertex1.edges: return False
-        # Also, all adjacent vertices of vertex1 already in the mapping must map to
-        # adjacent vertices of vertex2, unless we are subgraph matching
-        if not self.subgraph:
-            for vert1 in vertex1.edges:
-                if vert1.mapping is not None:
-                    if vert1.mapping not in vertex2.edges: return False
-
         # All of our tests have been passed, so the two vertices are a feasible pair
         return True
     
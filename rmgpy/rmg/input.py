@@ -116,7 +116,9 @@ def simpleReactor(temperature,
                   terminationConversion=None,
                   terminationTime=None,
                   sensitivity=None,
-                  sensitivityThreshold=1e-3
+                  sensitivityThreshold=1e-3,
+                  sensitivityReactions=None,
+                  sensitivityScreeningCount=0
                   ):
     logging.debug('Found SimpleReactor reaction system')
     
@@ -144,7 +146,7 @@ def simpleReactor(temperature,
     if sensitivity:
         for spec in sensitivity:
             sensitiveSpecies.append(speciesDict[spec])
-    system = SimpleReactor(T, P, initialMoleFractions, termination, sensitiveSpecies, sensitivityThreshold)
+    system = SimpleReactor(T, P, initialMoleFractions, termination, sensitiveSpecies, sensitivityThreshold, sensitivityReactions, sensitivityScreeningCount)
     rmg.reactionSystems.append(system)
 
 
@@ -154,7 +156,9 @@ def liquidReactor(temperature,
                   terminationConversion=None,
                   terminationTime=None,
                   sensitivity=None,
-                  sensitivityThreshold=1e-3):
+                  sensitivityThreshold=1e-3,
+                  sensitivityReactions=None,
+                  sensitivityScreeningCount=0):
     
     logging.debug('Found LiquidReactor reaction system')
     T = Quantity(temperature)
@@ -176,7 +180,7 @@ def liquidReactor(temperature,
     if sensitivity:
         for spec in sensitivity:
             sensitiveSpecies.append(speciesDict[spec])
-    system = LiquidReactor(T, initialConcentrations, termination, sensitiveSpecies, sensitivityThreshold)
+    system = LiquidReactor(T, initialConcentrations, termination, sensitiveSpecies, sensitivityThreshold, sensitivityReactions, sensitivityScreeningCount)
     rmg.reactionSystems.append(system)
     
 def simulator(atol, rtol, sens_atol=1e-6, sens_rtol=1e-4):
@@ -269,7 +273,9 @@ def pressureDependence(
     rmg.pressureDependence.activeKRotor = True
     rmg.pressureDependence.rmgmode = True
 
-def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlots=False, saveSimulationProfiles=False, verboseComments=False, saveEdgeSpecies=False):
+def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlots=False, saveSimulationProfiles=False, verboseComments=False, saveEdgeSpecies=False, simulationOutputFormat='csv', processes=1):
+    if simulationOutputFormat not in ['csv', 'npy']:
+        raise InputError('Invalid simulationOutputFormat "{0}"; valid formats are "csv" and "npy".'.format(simulationOutputFormat))
     rmg.units = units
     rmg.saveRestartPeriod = Quantity(saveRestartPeriod) if saveRestartPeriod else None
     rmg.drawMolecules = drawMolecules
@@ -277,6 +283,8 @@ def options(units='si', saveRestartPeriod=None, drawMolecules=False, generatePlo
     rmg.saveSimulationProfiles = saveSimulationProfiles
     rmg.verboseComments = verboseComments
     rmg.saveEdgeSpecies = saveEdgeSpecies
+    rmg.simulationOutputFormat = simulationOutputFormat
+    rmg.processes = processes
 
 def generatedSpeciesConstraints(**kwargs):
     validConstraints = [
@@ -477,6 +485,10 @@ def saveInputFile(path, rmg):
         if system.sensitivity:
             f.write('    sensitivity = {0},\n'.format(system.sensitivity))
             f.write('    sensitivityThreshold = {0},\n'.format(system.sensitivityThreshold))      
+            if system.sensitiveReactions:
+                f.write('    sensitivityReactions = {0!r},\n'.format(system.sensitiveReactions))
+            if system.sensitivityScreeningCount:
+                f.write('    sensitivityScreeningCount = {0:d},\n'.format(system.sensitivityScreeningCount))
         
         f.write(')\n\n')
     
@@ -536,7 +548,9 @@ def saveInputFile(path, rmg):
     f.write('    drawMolecules = {0},\n'.format(rmg.drawMolecules))
     f.write('    generatePlots = {0},\n'.format(rmg.generatePlots))
     f.write('    saveSimulationProfiles = {0},\n'.format(rmg.saveSimulationProfiles))
+    f.write('    simulationOutputFormat = "{0}",\n'.format(rmg.simulationOutputFormat))
     f.write('    verboseComments = {0},\n'.format(rmg.verboseComments))
+    f.write('    processes = {0},\n'.format(rmg.processes))
     f.write(')\n\n')
         
     f.close()
@@ -39,7 +39,6 @@ import logging
 import time
 import shutil
 import numpy
-import csv
 try:
     import xlwt
 except ImportError:
@@ -48,6 +47,7 @@ except ImportError:
 from rmgpy.molecule import Molecule
 from rmgpy.solver.base import TerminationTime, TerminationConversion
 from rmgpy.solver.simple import SimpleReactor
+from rmgpy.solver.worksheet import openWorksheet
 from rmgpy.data.rmg import RMGDatabase
 from rmgpy.data.base import ForbiddenStructureException, DatabaseError
 from rmgpy.data.kinetics.library import KineticsLibrary, LibraryReaction
@@ -108,6 +108,7 @@ class RMG:
     `generatePlots`                 ``True`` to generate plots of the job execution statistics after each iteration, ``False`` otherwise
     `verboseComments`               ``True`` to keep the verbose comments for database estimates, ``False`` otherwise
     `saveEdgeSpecies`               ``True`` to save chemkin and HTML files of the edge species, ``False`` otherwise
+    `processes`                     The number of worker processes used to apply the reaction families, or ``None`` for one per CPU
     `pressureDependence`            Whether to process unimolecular (pressure-dependent) reaction networks
     `quantumMechanics`              Whether to apply quantum mechanical calculations instead of group additivity to certain molecular types.
     `wallTime`                      The maximum amount of CPU time in seconds to expend on this job; used to stop gracefully so we can still get profiling information
@@ -163,8 +164,10 @@ class RMG:
         self.drawMolecules = None
         self.generatePlots = None
         self.saveSimulationProfiles = None
+        self.simulationOutputFormat = 'csv'
         self.verboseComments = None
         self.saveEdgeSpecies = None
+        self.processes = 1
         self.pressureDependence = None
         self.quantumMechanics = None
         self.speciesConstraints = {}
@@ -299,6 +302,9 @@ class RMG:
             logging.info('Filling in rate rules in kinetics families by averaging...')
             for family in self.database.kinetics.families.values():
                 family.fillKineticsRulesByAveragingUp()
+            if self.outputDirectory:
+                # Reuse the rate rule estimates of earlier runs in this directory
+                self.database.kinetics.setEstimateCache(os.path.join(self.outputDirectory, 'estimates.sqlite'))
     
     def initialize(self, args):
         """
@@ -378,11 +384,12 @@ class RMG:
     
         # Delete previous HTML file
         from rmgpy.rmg.output import saveOutputHTML
-        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core')
+        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core', self.processes)
         
         # Initialize reaction model
         if args.restart:
             self.loadRestartFile(os.path.join(self.outputDirectory,'restart.pkl'))
+            self.startReactionPool()
         else:
     
             # Seed mechanisms: add species and reactions from seed mechanism
@@ -416,6 +423,10 @@ class RMG:
                     else:
                         raise ForbiddenStructureException("Species constraints forbids input species {0}. Please reformulate constraints, remove the species, or explicitly allow it.".format(spec.label))
 
+            # Start the reaction generation workers now that the species
+            # constraints are complete
+            self.startReactionPool()
+
             for spec in self.initialSpecies:
                 spec.generateThermoData(self.database, quantumMechanics=self.quantumMechanics)
                 spec.generateTransportData(self.database)
@@ -433,6 +444,14 @@ class RMG:
             if self.saveRestartPeriod:
                 self.saveRestartFile(os.path.join(self.outputDirectory,'restart.pkl'), self.reactionModel)
     
+    def startReactionPool(self):
+        """
+        Start the pool of worker processes used to apply the reaction families
+        concurrently, unless only one process was requested.
+        """
+        if self.processes != 1:
+            self.database.kinetics.startPool(self.processes, self.reactionModel.failsSpeciesConstraints)
+
     def execute(self, args):
         """
         Execute an RMG job using the command-line arguments `args` as returned
@@ -461,8 +480,7 @@ class RMG:
             for index, reactionSystem in enumerate(self.reactionSystems):
     
                 if self.saveSimulationProfiles:
-                    csvfile = file(os.path.join(self.outputDirectory, 'solver', 'simulation_{0}_{1:d}.csv'.format(index+1, len(self.reactionModel.core.species))),'w')
-                    worksheet = csv.writer(csvfile)
+                    worksheet = openWorksheet(os.path.join(self.outputDirectory, 'solver', 'simulation_{0}_{1:d}'.format(index+1, len(self.reactionModel.core.species))), self.simulationOutputFormat)
                 else:
                     worksheet = None
                 
@@ -481,6 +499,8 @@ class RMG:
                     absoluteTolerance = self.absoluteTolerance,
                     relativeTolerance = self.relativeTolerance,
                 )
+                if worksheet:
+                    worksheet.close()
                 allTerminated = allTerminated and terminated
                 logging.info('')
                 
@@ -571,8 +591,7 @@ class RMG:
                     
                 sensWorksheet = []
                 for spec in reactionSystem.sensitiveSpecies:
-                    csvfile = file(os.path.join(self.outputDirectory, 'solver', 'sensitivity_{0}_SPC_{1}.csv'.format(index+1, spec.index)),'w')
-                    sensWorksheet.append(csv.writer(csvfile))
+                    sensWorksheet.append(openWorksheet(os.path.join(self.outputDirectory, 'solver', 'sensitivity_{0}_SPC_{1}'.format(index+1, spec.index)), self.simulationOutputFormat))
                     
                 terminated, obj = reactionSystem.simulate(
                     coreSpecies = self.reactionModel.core.species,
@@ -591,6 +610,8 @@ class RMG:
                     sensitivityRelativeTolerance = self.sensitivityRelativeTolerance,
                     sensWorksheet = sensWorksheet,
                 )        
+                for sheet in sensWorksheet:
+                    sheet.close()
             
             # Update RMG execution statistics for each time a reactionSystem has sensitivity analysis performed.  
             # But just provide time and memory used.
@@ -656,6 +677,8 @@ class RMG:
         """
         Complete the model generation.
         """
+        self.database.kinetics.closePool()
+
         # Log end timestamp
         logging.info('')
         logging.info('RMG execution terminated at ' + time.asctime())
@@ -782,12 +805,12 @@ class RMG:
         """
         logging.info('Saving current model core to HTML file...')
         from rmgpy.rmg.output import saveOutputHTML
-        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core')
+        saveOutputHTML(os.path.join(self.outputDirectory, 'output.html'), self.reactionModel, 'core', self.processes)
         
         if self.saveEdgeSpecies ==True:
             logging.info('Saving current model edge to HTML file...')
             from rmgpy.rmg.output import saveOutputHTML
-            saveOutputHTML(os.path.join(self.outputDirectory, 'output_edge.html'), self.reactionModel, 'edge')
+            saveOutputHTML(os.path.join(self.outputDirectory, 'output_edge.html'), self.reactionModel, 'edge', self.processes)
         
     def saveChemkinFiles(self):
         """
@@ -73,6 +73,7 @@ class Species(rmgpy.species.Species):
                  energyTransferModel=None, reactive=True, props=None, coreSizeAtCreation=0):
         rmgpy.species.Species.__init__(self, index, label, thermo, conformer, molecule, transportData, molecularWeight, dipoleMoment, polarizability, Zrot, energyTransferModel, reactive, props)
         self.coreSizeAtCreation = coreSizeAtCreation
+        self.templateMask = None
 
     def __reduce__(self):
         """
@@ -80,6 +81,17 @@ class Species(rmgpy.species.Species):
         """
         return (Species, (self.index, self.label, self.thermo, self.conformer, self.molecule, self.transportData, self.molecularWeight, self.dipoleMoment, self.polarizability, self.Zrot, self.energyTransferModel, self.reactive, self.props, self.coreSizeAtCreation),)
 
+    def getTemplateMask(self, database):
+        """
+        Return the bitmask of the bimolecular reaction family template
+        reactants matched by any resonance isomer of the species, as given by
+        :meth:`KineticsDatabase.getTemplateMask` for the kinetics `database`.
+        The mask is computed on the first call and stored.
+        """
+        if self.templateMask is None:
+            self.templateMask = database.getTemplateMask(self.molecule)
+        return self.templateMask
+
     def generateThermoData(self, database, thermoClass=NASA, quantumMechanics=None):
         """
         Generates thermo data, first checking Libraries, then using either QM or Database.
@@ -568,9 +580,14 @@ class CoreEdgeReactionModel:
                 reactionList.extend(database.kinetics.generateReactionsFromFamilies([moleculeA], products=None, failsSpeciesConstraints=self.failsSpeciesConstraints))
                 moleculeA.clearLabeledAtoms()
         else:
+            # Only try the families in which the two species can fill
+            # complementary template reactants
+            families = database.kinetics.getCompatibleFamilies(speciesA.getTemplateMask(database.kinetics), speciesB.getTemplateMask(database.kinetics))
+            if not families:
+                return reactionList
             for moleculeA in speciesA.molecule:
                 for moleculeB in speciesB.molecule:
-                    reactionList.extend(database.kinetics.generateReactionsFromFamilies([moleculeA, moleculeB], products=None, failsSpeciesConstraints=self.failsSpeciesConstraints))
+                    reactionList.extend(database.kinetics.generateReactionsFromFamilies([moleculeA, moleculeB], products=None, only_families=families, failsSpeciesConstraints=self.failsSpeciesConstraints))
                     moleculeA.clearLabeledAtoms()
                     moleculeB.clearLabeledAtoms()
         return reactionList
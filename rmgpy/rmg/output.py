@@ -35,7 +35,10 @@ files.
 
 import os.path
 import logging
+import hashlib
 import re
+import shutil
+import multiprocessing
 
 ################################################################################
 
@@ -49,20 +52,84 @@ class OutputError(Exception):
 
 ################################################################################
 
-def saveOutputHTML(path, reactionModel, partCoreEdge='core'):
+def _drawMolecule(args):
+    """
+    Draw a PNG image of a molecule, given as a tuple of the molecule and the
+    path of the image. This is used by the worker processes of
+    :func:`drawSpecies`.
+    """
+    from rmgpy.molecule.draw import MoleculeDrawer
+    molecule, path = args
+    MoleculeDrawer().draw(molecule, 'png', path)
+
+def drawSpecies(species, path, processes=1):
+    """
+    Make sure that the directory `path` contains a drawing ``<species>.png``
+    of each of the given `species`. The drawings are kept in a ``cache``
+    subdirectory under the SHA-1 hash of the adjacency list of each structure,
+    so each structure is only drawn once, even if its species is relabeled or
+    the directory is shared by several outputs. The new structures are drawn in
+    this process by default, or by a pool of `processes` worker processes;
+    pass ``None`` to use one per CPU.
+    """
+    from rmgpy.chemkin import getSpeciesIdentifier
+
+    cacheDirectory = os.path.join(path, 'cache')
+    if not os.path.isdir(cacheDirectory):
+        os.makedirs(cacheDirectory)
+
+    # Find the cached drawing for each species that does not have one yet,
+    # and the structures that have not been drawn at all
+    copies = []
+    molecules = {}
+    for spec in species:
+        fstr = os.path.join(path, '{0}.png'.format(spec))
+        if os.path.exists(fstr):
+            continue
+        try:
+            molecule = spec.molecule[0]
+        except IndexError:
+            raise OutputError("{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.".format(getSpeciesIdentifier(spec)))
+        # Unlike an InChIKey, the adjacency list is available without InChI
+        # support and does not merge tautomers or other distinct structures
+        key = hashlib.sha1(molecule.toAdjacencyList()).hexdigest()
+        cached = os.path.join(cacheDirectory, '{0}.png'.format(key))
+        if cached not in molecules and not os.path.exists(cached):
+            molecules[cached] = molecule
+        copies.append((cached, fstr))
+
+    # Draw to temporary files so that only complete drawings enter the cache
+    arguments = [(molecule, cached + '.tmp') for cached, molecule in molecules.iteritems()]
+    if processes == 1 or len(arguments) < 2:
+        for args in arguments:
+            _drawMolecule(args)
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            pool.map(_drawMolecule, arguments)
+        finally:
+            pool.close()
+            pool.join()
+    for cached in molecules:
+        if os.path.exists(cached + '.tmp'):
+            os.rename(cached + '.tmp', cached)
+
+    for cached, fstr in copies:
+        if os.path.exists(cached):
+            shutil.copyfile(cached, fstr)
+
+def saveOutputHTML(path, reactionModel, partCoreEdge='core', processes=1):
     """
     Save the current set of  species and reactions of `reactionModel` to
     an HTML file `path` on disk. As part of this process, drawings of all 
     species are created in the species folder (if they don't already exist)
-    using the :mod:`rmgpy.molecule.draw` module. The :mod:`jinja`
+    using the :mod:`rmgpy.molecule.draw` module, with a pool of `processes`
+    worker processes (see :func:`drawSpecies`). The :mod:`jinja`
     package is used to generate the HTML; if this package is not found, no
     HTML will be generated (but the program will carry on).
     """
 
     from model import PDepReaction
-    
-    from rmgpy.molecule.draw import MoleculeDrawer
-    from rmgpy.chemkin import getSpeciesIdentifier
 
     try:
         import jinja2
@@ -94,13 +161,9 @@ def saveOutputHTML(path, reactionModel, partCoreEdge='core'):
         if match:
             spec.index = int(match.group(0)[1:-1])
             spec.label = spec.label[0:match.start()]
-        # Draw molecules if necessary
-        fstr = os.path.join(dirname, 'species', '{0}.png'.format(spec))
-        if not os.path.exists(fstr):
-            try:
-                MoleculeDrawer().draw(spec.molecule[0], 'png', fstr)
-            except IndexError:
-                raise OutputError("{0} species could not be drawn because it did not contain a molecular structure. Please recheck your files.".format(getSpeciesIdentifier(spec)))
+
+    # Draw molecules if necessary
+    drawSpecies(species, os.path.join(dirname, 'species'), processes)
                 
     # We want to keep species sorted in the original order in which they were added to the RMG core.
     # Rather than ordered by index
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+"""
+This module contains unit tests of the rmgpy.rmg.output module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from rmgpy.molecule import Molecule
+from rmgpy.species import Species
+from rmgpy.rmg.output import drawSpecies
+
+try:
+    import cairo
+    from rdkit.Chem import AllChem
+except ImportError:
+    canDraw = False
+else:
+    canDraw = True
+
+################################################################################
+
+@unittest.skipIf(not canDraw, "Drawing molecules requires Cairo and RDKit.")
+class TestDrawSpecies(unittest.TestCase):
+    """
+    Contains unit tests of the drawSpecies function.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        self.directory = tempfile.mkdtemp()
+        adjlists = [
+            ('CH4', '1 C u0'),
+            ('C2H6', '1 C u0 {2,S}\n2 C u0 {1,S}'),
+            ('C2H4', '1 C u0 {2,D}\n2 C u0 {1,D}'),
+            ('C2H5', '1 C u0 {2,S}\n2 C u1 {1,S}'),
+            ('C2H5OH', '1 C u0 {2,S}\n2 C u0 {1,S} {3,S}\n3 O u0 {2,S}'),
+            ('ethanol', '1 C u0 {2,S}\n2 C u0 {1,S} {3,S}\n3 O u0 {2,S}'),
+        ]
+        self.species = []
+        for index, (label, adjlist) in enumerate(adjlists):
+            molecule = Molecule().fromAdjacencyList(adjlist, saturateH=True)
+            self.species.append(Species(index=index + 1, label=label, molecule=[molecule]))
+
+    def tearDown(self):
+        """
+        A function run after each unit test in this class.
+        """
+        shutil.rmtree(self.directory)
+
+    def testDrawSpeciesInPool(self):
+        """
+        Test that drawing the species with a pool of worker processes makes
+        the same files as drawing them in this process.
+        """
+        serial = os.path.join(self.directory, 'serial')
+        pooled = os.path.join(self.directory, 'pooled')
+        drawSpecies(self.species, serial)
+        drawSpecies(self.species, pooled, processes=2)
+        for path in [serial, pooled]:
+            self.assertEqual(sorted(os.listdir(path)), sorted(['cache'] + ['{0}.png'.format(spec) for spec in self.species]))
+            # Ethanol is only drawn once
+            self.assertEqual(len(os.listdir(os.path.join(path, 'cache'))), len(self.species) - 1)
+        for subdirectory in ['', 'cache']:
+            for filename in os.listdir(os.path.join(serial, subdirectory)):
+                if filename == 'cache':
+                    continue
+                with open(os.path.join(serial, subdirectory, filename), 'rb') as f:
+                    data = f.read()
+                with open(os.path.join(pooled, subdirectory, filename), 'rb') as f:
+                    self.assertEqual(f.read(), data)
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
@@ -30,3 +30,4 @@
 
 from .base import ReactionSystem, TerminationTime, TerminationConversion
 from .simple import SimpleReactor
+from .ensemble import ReactorEnsemble
@@ -50,6 +50,9 @@ cdef class ReactionSystem(DASx):
     cdef public numpy.ndarray maxEdgeSpeciesRateRatios
     cdef public numpy.ndarray maxNetworkLeakRateRatios
     cdef public numpy.ndarray sensitivityCoefficients
+    cdef public numpy.ndarray sensitiveReactionIndices
+    cdef public numpy.ndarray sensitiveThermoIndices
+    cdef public numpy.ndarray integratedCoreReactionFluxes
     
     cdef public list termination
 
@@ -59,6 +62,8 @@ cdef class ReactionSystem(DASx):
         double toleranceKeepInEdge, double toleranceMoveToCore, double toleranceInterruptSimulation,
         list pdepNetworks=?, worksheet=?, absoluteTolerance=?, relativeTolerance=?, sensitivity=?, sensitivityAbsoluteTolerance=?, sensitivityRelativeTolerance=?, sensWorksheet=?)
 
+    cpdef selectSensitivityParameters(self, list coreSpecies, list coreReactions, list sensitiveReactions=?, int screeningCount=?)
+
     cpdef logRates(self, double charRate, object species, double speciesRate, object network, double networkRate)
 
     cpdef logConversions(self, speciesIndex, y0)
@@ -46,7 +46,7 @@ else:
     
 import cython
 import logging
-import csv
+import tempfile
 
 from rmgpy.quantity import Quantity
 from rmgpy.chemkin import getSpeciesIdentifier
@@ -74,6 +74,9 @@ cdef class ReactionSystem(DASx):
         self.maxEdgeSpeciesRateRatios = None
         self.maxNetworkLeakRateRatios = None
         self.sensitivityCoefficients = None
+        self.sensitiveReactionIndices = None
+        self.sensitiveThermoIndices = None
+        self.integratedCoreReactionFluxes = None
         self.termination = termination or []
     
     cpdef initializeModel(self, list coreSpecies, list coreReactions, list edgeSpecies, list edgeReactions, list pdepNetworks=None, atol=1e-16, rtol=1e-8, sensitivity=False, sens_atol=1e-6, sens_rtol=1e-4):
@@ -105,6 +108,14 @@ cdef class ReactionSystem(DASx):
         self.maxEdgeSpeciesRateRatios = numpy.zeros((numEdgeSpecies), numpy.float64)
         self.maxNetworkLeakRateRatios = numpy.zeros((numPdepNetworks), numpy.float64)
         self.sensitivityCoefficients = numpy.zeros((numCoreSpecies, numCoreReactions), numpy.float64)
+        self.integratedCoreReactionFluxes = numpy.zeros((numCoreReactions), numpy.float64)
+
+        # Unless a subset of sensitivity parameters has been selected, the
+        # sensitivities are taken with respect to every core reaction rate
+        # coefficient and every core species free energy
+        if not sensitivity or self.sensitiveReactionIndices is None:
+            self.sensitiveReactionIndices = numpy.arange(numCoreReactions, dtype=numpy.int)
+            self.sensitiveThermoIndices = numpy.arange(numCoreSpecies, dtype=numpy.int)
 
     @cython.boundscheck(False)
     cpdef simulate(self, list coreSpecies, list coreReactions, list edgeSpecies, list edgeReactions,
@@ -126,6 +137,7 @@ cdef class ReactionSystem(DASx):
         cdef list row
         cdef int index, maxSpeciesIndex, maxNetworkIndex
         cdef int numCoreSpecies, numEdgeSpecies, numPdepNetworks, numCoreReactions
+        cdef int numSensReactions, numSensThermo, numSensParams
         cdef double stepTime, charRate, maxSpeciesRate, maxNetworkRate
         cdef numpy.ndarray[numpy.float64_t, ndim=1] y0 #: Vector containing the number of moles of each species
         cdef numpy.ndarray[numpy.float64_t, ndim=1] coreSpeciesRates, edgeSpeciesRates, networkLeakRates
@@ -137,9 +149,11 @@ cdef class ReactionSystem(DASx):
         cdef double  prevTime, totalMoles, c, volume, RTP
         
         # cython declations for sensitivity analysis
-        cdef numpy.ndarray[numpy.int_t, ndim=1] sensSpeciesIndices
+        cdef numpy.ndarray[numpy.int_t, ndim=1] sensSpeciesIndices, sensReactionIndices, sensThermoIndices
         cdef numpy.ndarray[numpy.float64_t, ndim=1] moleSens, dVdk, normSens
-        cdef list time_array, normSens_array 
+        cdef int numTimeSteps, chunkSize
+        cdef list time_array, sensFiles
+        cdef numpy.ndarray times, aboveThreshold, rows
         
         pdepNetworks = pdepNetworks or []
 
@@ -152,6 +166,19 @@ cdef class ReactionSystem(DASx):
         for index, spec in enumerate(coreSpecies):
             speciesIndex[spec] = index
         
+        if sensitivity and (self.sensitiveReactions or self.sensitivityScreeningCount > 0):
+            if self.sensitivityScreeningCount > 0:
+                # Run a cheap first pass without sensitivities to rank the
+                # core reactions by their integrated flux
+                logging.info('Screening core reactions by integrated flux for sensitivity analysis...')
+                self.simulate(coreSpecies, coreReactions, edgeSpecies, edgeReactions,
+                    toleranceKeepInEdge, toleranceMoveToCore, toleranceInterruptSimulation,
+                    pdepNetworks, None, absoluteTolerance, relativeTolerance)
+            self.selectSensitivityParameters(coreSpecies, coreReactions, self.sensitiveReactions, self.sensitivityScreeningCount)
+        else:
+            self.sensitiveReactionIndices = None
+            self.sensitiveThermoIndices = None
+        
         self.initializeModel(coreSpecies, coreReactions, edgeSpecies, edgeReactions, pdepNetworks, absoluteTolerance, relativeTolerance, sensitivity, sensitivityAbsoluteTolerance, sensitivityRelativeTolerance)
 
         invalidObject = None
@@ -183,10 +210,19 @@ cdef class ReactionSystem(DASx):
         
         if sensitivity:
             time_array = []
-            normSens_array = [[] for spec in self.sensitiveSpecies]    
+            # The normalized sensitivities at each time step are streamed to
+            # a temporary binary file per sensitive species, and only filtered
+            # against the sensitivity threshold once the simulation is done
+            sensFiles = [tempfile.TemporaryFile() for spec in self.sensitiveSpecies]
             RTP = constants.R * self.T.value_si / self.P.value_si
             # identify sensitive species indices
             sensSpeciesIndices = numpy.array([speciesIndex[spec] for spec in self.sensitiveSpecies], numpy.int)  # index within coreSpecies list of the sensitive species
+            # identify the reactions and species free energies used as sensitivity parameters
+            sensReactionIndices = self.sensitiveReactionIndices
+            sensThermoIndices = self.sensitiveThermoIndices
+            numSensReactions = sensReactionIndices.shape[0]
+            numSensThermo = sensThermoIndices.shape[0]
+            numSensParams = numSensReactions + numSensThermo
                 
         
         stepTime = 1e-12
@@ -197,24 +233,29 @@ cdef class ReactionSystem(DASx):
             
             y_coreSpecies = self.y[:numCoreSpecies]
             totalMoles = numpy.sum(y_coreSpecies)
+            
+            # Accumulate the time-integrated flux through each core reaction
+            self.integratedCoreReactionFluxes += numpy.abs(self.coreReactionRates) * (self.t - prevTime)
+            prevTime = self.t
+            
             if sensitivity:
                 time_array.append(self.t)
                 moleSens = self.y[numCoreSpecies:]#   
                 volume = self.V
                 
-                dVdk = numpy.zeros(numCoreReactions + numCoreSpecies, numpy.float64)
+                dVdk = numpy.zeros(numSensParams, numpy.float64)
                 if not self.constantVolume:
-                    for j in range(numCoreReactions + numCoreSpecies):
+                    for j in range(numSensParams):
                         dVdk[j] = numpy.sum(moleSens[j*numCoreSpecies:(j+1)*numCoreSpecies])*RTP   # Contains [ dV_dk and dV_dG ]
                 for i in range(len(self.sensitiveSpecies)):
-                    normSens = numpy.zeros(numCoreReactions + numCoreSpecies, numpy.float64)
+                    normSens = numpy.zeros(numSensParams, numpy.float64)
                     c = self.coreSpeciesConcentrations[sensSpeciesIndices[i]]
                     if c != 0:                        
-                        for j in range(numCoreReactions):
-                            normSens[j] = 1/volume*(moleSens[j*numCoreSpecies+sensSpeciesIndices[i]]-c*dVdk[j])*forwardRateCoefficients[j]/c
-                        for j in range(numCoreReactions,numCoreReactions+numCoreSpecies):
+                        for j in range(numSensReactions):
+                            normSens[j] = 1/volume*(moleSens[j*numCoreSpecies+sensSpeciesIndices[i]]-c*dVdk[j])*forwardRateCoefficients[sensReactionIndices[j]]/c
+                        for j in range(numSensReactions,numSensParams):
                             normSens[j] = 1/volume*(moleSens[j*numCoreSpecies+sensSpeciesIndices[i]]-c*dVdk[j])/c*4184   # no normalization against dG, converstion to kcal/mol units
-                    normSens_array[i].append(normSens)
+                    normSens.tofile(sensFiles[i])
 
             # Save the species mole fractions to CSV file
             if worksheet:
@@ -309,23 +350,35 @@ cdef class ReactionSystem(DASx):
                 
             
         if sensitivity:   
+            times = numpy.array(time_array, numpy.float64)
+            numTimeSteps = times.shape[0]
+            # Number of time steps read back from the sensitivity files at once
+            chunkSize = 1000
             for i in range(len(self.sensitiveSpecies)):
-                reactionsAboveThreshold = []
-                for j in range(numCoreReactions + numCoreSpecies):
-                    for k in range(len(time_array)):
-                        if abs(normSens_array[i][k][j]) > self.sensitivityThreshold:
-                            reactionsAboveThreshold.append(j)
-                            break
+                sensFiles[i].flush()
+                if numSensParams > 0:
+                    normSens_array = numpy.memmap(sensFiles[i], dtype=numpy.float64, mode='r', shape=(numTimeSteps, numSensParams))
+                else:
+                    normSens_array = numpy.zeros((numTimeSteps, 0), numpy.float64)
+                aboveThreshold = numpy.zeros(numSensParams, numpy.bool)
+                for k in range(0, numTimeSteps, chunkSize):
+                    aboveThreshold |= numpy.any(numpy.abs(normSens_array[k:k+chunkSize]) > self.sensitivityThreshold, axis=0)
+                reactionsAboveThreshold = [int(j) for j in numpy.flatnonzero(aboveThreshold)]
+                
                 species_name = getSpeciesIdentifier(self.sensitiveSpecies[i])
                 headers = ['Time (s)']
-                headers.extend(['dln[{0}]/dln[k{1}]: {2}'.format(species_name, j+1, coreReactions[j].toChemkin(kinetics=False)) if j < numCoreReactions 
-                                else 'dln[{0}]/dG[{1}]'.format(species_name, getSpeciesIdentifier(coreSpecies[j-numCoreReactions])) for j in reactionsAboveThreshold])
+                headers.extend(['dln[{0}]/dln[k{1}]: {2}'.format(species_name, sensReactionIndices[j]+1, coreReactions[sensReactionIndices[j]].toChemkin(kinetics=False)) if j < numSensReactions 
+                                else 'dln[{0}]/dG[{1}]'.format(species_name, getSpeciesIdentifier(coreSpecies[sensThermoIndices[j-numSensReactions]])) for j in reactionsAboveThreshold])
                 sensWorksheet[i].writerow(headers)               
             
-                for k in range(len(time_array)):
-                    row = [time_array[k]]
-                    row.extend([normSens_array[i][k][j] for j in reactionsAboveThreshold])       
-                    sensWorksheet[i].writerow(row)  
+                for k in range(0, numTimeSteps, chunkSize):
+                    rows = numpy.empty((min(chunkSize, numTimeSteps-k), len(reactionsAboveThreshold)+1), numpy.float64)
+                    rows[:,0] = times[k:k+chunkSize]
+                    rows[:,1:] = normSens_array[k:k+chunkSize][:,reactionsAboveThreshold]
+                    sensWorksheet[i].writerows(rows)
+                
+                del normSens_array
+                sensFiles[i].close()
         
         self.maxCoreSpeciesRates = maxCoreSpeciesRates
         self.maxEdgeSpeciesRates = maxEdgeSpeciesRates
@@ -337,6 +390,49 @@ cdef class ReactionSystem(DASx):
         # (if the simulation was valid)
         return terminated, invalidObject
 
+    cpdef selectSensitivityParameters(self, list coreSpecies, list coreReactions, list sensitiveReactions=None, int screeningCount=0):
+        """
+        Restrict the forward sensitivity analysis to a subset of the core
+        reactions, so that the size of the sensitivity system scales with the
+        subset rather than with the whole mechanism. The subset consists of the
+        reactions in `sensitiveReactions`, given as 1-based indices into
+        `coreReactions` (the numbering used in the sensitivity output), plus
+        the `screeningCount` core reactions with the largest integrated flux
+        in the most recent simulation of the same model. The free energies of
+        the species participating in the selected reactions and of the
+        sensitive species are kept as thermodynamic sensitivity parameters.
+        """
+        cdef int numCoreReactions, index
+        cdef set reactionIndices, thermoIndices
+        cdef dict speciesIndex
+
+        numCoreReactions = len(coreReactions)
+
+        reactionIndices = set()
+        for index in sensitiveReactions or []:
+            if index < 1 or index > numCoreReactions:
+                raise ValueError('Invalid sensitive reaction index {0:d}; the model core contains {1:d} reactions.'.format(index, numCoreReactions))
+            reactionIndices.add(index - 1)
+        if screeningCount > 0:
+            if self.integratedCoreReactionFluxes is None or len(self.integratedCoreReactionFluxes) != numCoreReactions:
+                raise ValueError('Screening sensitivity parameters by flux requires a prior simulation of the same model core.')
+            reactionIndices.update([int(j) for j in numpy.argsort(-self.integratedCoreReactionFluxes)[:screeningCount]])
+
+        speciesIndex = {}
+        for index, spec in enumerate(coreSpecies):
+            speciesIndex[spec] = index
+        thermoIndices = set([speciesIndex[spec] for spec in self.sensitiveSpecies])
+        for index in reactionIndices:
+            for spec in coreReactions[index].reactants:
+                thermoIndices.add(speciesIndex[spec])
+            for spec in coreReactions[index].products:
+                thermoIndices.add(speciesIndex[spec])
+
+        self.sensitiveReactionIndices = numpy.array(sorted(reactionIndices), numpy.int)
+        self.sensitiveThermoIndices = numpy.array(sorted(thermoIndices), numpy.int)
+        logging.info('Sensitivity parameters restricted to {0:d} of {1:d} core reactions and {2:d} of {3:d} species free energies'.format(
+            len(reactionIndices), numCoreReactions, len(thermoIndices), len(coreSpecies)))
+
     cpdef logRates(self, double charRate, object species, double speciesRate, object network, double networkRate):
         """
         Log information about the current maximum species and network rates.
@@ -0,0 +1,366 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2002-2010 Prof. William H. Green (whgreen@mit.edu) and the
+#   RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Contains the :class:`ReactorEnsemble` class, for simulating a single kinetic
+model in a homogeneous, isothermal, isobaric batch reactor at many reaction
+conditions in parallel. Unlike :class:`SimpleReactor`, which sets up the model
+from the species and reaction objects every time it is simulated, the
+ensemble compiles the model into arrays once and reuses them for every
+condition.
+"""
+
+import logging
+import multiprocessing
+import numpy
+import scipy.integrate
+import scipy.sparse
+
+import rmgpy.constants as constants
+from rmgpy.quantity import Quantity
+from rmgpy.kinetics import Arrhenius
+from rmgpy.thermo import NASA
+from rmgpy.solver.reduction import analyzeStiffness
+
+################################################################################
+
+class CompiledModel(object):
+    """
+    A kinetic model compiled into arrays for fast repeated evaluation at
+    different temperatures and pressures. The attributes are:
+
+    =========================== ================================================
+    Attribute                   Description
+    =========================== ================================================
+    `numSpecies`                The number of species in the model
+    `numReactions`              The number of reactions in the model
+    `reactantIndices`           The species indices of the reactants of each reaction (-1 if unused)
+    `productIndices`            The species indices of the products of each reaction (-1 if unused)
+    `stoichiometry`             The sparse stoichiometric matrix (species x reactions)
+    `reversible`                ``True`` for each reversible reaction
+    `nasaCoefficients`          The NASA polynomial coefficients of each species, or zeros
+    `nasaTemperatures`          The temperature range of each NASA polynomial of each species
+    `thermo`                    The thermo model of each species without NASA polynomials, or ``None``
+    `arrheniusParameters`       The `A`, `n`, `Ea`, and `T0` of each reaction with Arrhenius kinetics
+    `kinetics`                  The kinetics model of each reaction without Arrhenius kinetics, or ``None``
+    =========================== ================================================
+
+    Species thermodynamics given as :class:`NASA` polynomials and reaction
+    kinetics given as :class:`Arrhenius` expressions are evaluated for all
+    species and reactions at once; any other models are evaluated one at a
+    time.
+    """
+
+    def __init__(self, coreSpecies, coreReactions):
+        speciesIndex = {}
+        for index, spec in enumerate(coreSpecies):
+            speciesIndex[spec] = index
+
+        self.numSpecies = len(coreSpecies)
+        self.numReactions = len(coreReactions)
+
+        # Reaction stoichiometry
+        self.reactantIndices = -numpy.ones((self.numReactions, 3), numpy.int)
+        self.productIndices = -numpy.ones((self.numReactions, 3), numpy.int)
+        self.reversible = numpy.zeros(self.numReactions, numpy.bool)
+        stoichiometry = scipy.sparse.dok_matrix((self.numSpecies, self.numReactions), numpy.float64)
+        for j, rxn in enumerate(coreReactions):
+            for l, spec in enumerate(rxn.reactants):
+                self.reactantIndices[j,l] = speciesIndex[spec]
+                stoichiometry[speciesIndex[spec], j] -= 1
+            for l, spec in enumerate(rxn.products):
+                self.productIndices[j,l] = speciesIndex[spec]
+                stoichiometry[speciesIndex[spec], j] += 1
+            self.reversible[j] = rxn.reversible
+        self.stoichiometry = stoichiometry.tocsr()
+        self.deltaMoles = numpy.asarray(self.stoichiometry.sum(axis=0)).flatten()
+
+        # Species thermodynamics
+        self.nasaCoefficients = numpy.zeros((self.numSpecies, 3, 9), numpy.float64)
+        self.nasaTemperatures = numpy.zeros((self.numSpecies, 3, 2), numpy.float64)
+        self.thermo = [None for spec in coreSpecies]
+        for i, spec in enumerate(coreSpecies):
+            if isinstance(spec.thermo, NASA):
+                for n, poly in enumerate([spec.thermo.poly1, spec.thermo.poly2, spec.thermo.poly3]):
+                    if poly is None:
+                        continue
+                    self.nasaCoefficients[i,n,:] = [poly.cm2, poly.cm1, poly.c0, poly.c1, poly.c2, poly.c3, poly.c4, poly.c5, poly.c6]
+                    self.nasaTemperatures[i,n,:] = [poly.Tmin.value_si, poly.Tmax.value_si]
+            else:
+                self.thermo[i] = spec.thermo
+
+        # Reaction kinetics
+        self.arrheniusParameters = numpy.zeros((self.numReactions, 4), numpy.float64)
+        self.arrheniusParameters[:,3] = 1.0
+        self.kinetics = [None for rxn in coreReactions]
+        for j, rxn in enumerate(coreReactions):
+            if isinstance(rxn.kinetics, Arrhenius):
+                self.arrheniusParameters[j,:] = [rxn.kinetics.A.value_si, rxn.kinetics.n.value_si, rxn.kinetics.Ea.value_si, rxn.kinetics.T0.value_si]
+            else:
+                self.kinetics[j] = rxn.kinetics
+
+    def getFreeEnergies(self, T):
+        """
+        Return the Gibbs free energies in J/mol of each species at the
+        specified temperature `T` in K.
+        """
+        G = numpy.zeros(self.numSpecies, numpy.float64)
+
+        # Select the valid NASA polynomial for each species, preferring the
+        # first one whose temperature range contains T
+        valid = (self.nasaTemperatures[:,:,0] <= T) & (T <= self.nasaTemperatures[:,:,1])
+        polynomial = numpy.argmax(valid, axis=1)
+        cm2, cm1, c0, c1, c2, c3, c4, c5, c6 = self.nasaCoefficients[numpy.arange(self.numSpecies), polynomial, :].T
+        lnT = numpy.log(T)
+        H = (-cm2 / T + cm1 * lnT) / T + c0 + c1 * T / 2. + c2 * T**2 / 3. + c3 * T**3 / 4. + c4 * T**4 / 5. + c5 / T
+        S = (-cm2 / T / 2. - cm1) / T + c0 * lnT + c1 * T + c2 * T**2 / 2. + c3 * T**3 / 3. + c4 * T**4 / 4. + c6
+        G = (H - S) * constants.R * T
+
+        for i, thermo in enumerate(self.thermo):
+            if thermo is not None:
+                G[i] = thermo.getFreeEnergy(T)
+            elif not numpy.any(valid[i,:]):
+                raise ValueError('No valid NASA polynomial at temperature {0:g} K for species {1:d}.'.format(T, i))
+        return G
+
+    def getRateCoefficients(self, T, P):
+        """
+        Return the forward and reverse rate coefficients of each reaction, in
+        the appropriate combination of m^3, mol, and s, at the specified
+        temperature `T` in K and pressure `P` in Pa.
+        """
+        A, n, Ea, T0 = self.arrheniusParameters.T
+        kf = A * (T / T0)**n * numpy.exp(-Ea / (constants.R * T))
+        for j, kinetics in enumerate(self.kinetics):
+            if kinetics is not None:
+                kf[j] = kinetics.getRateCoefficient(T, P)
+
+        # Equilibrium constants in concentration units from the free energies
+        # of reaction, assuming an ideal gas mixture
+        dGrxn = self.stoichiometry.T.dot(self.getFreeEnergies(T))
+        Keq = numpy.exp(-dGrxn / constants.R / T) * (1e5 / constants.R / T)**self.deltaMoles
+        kr = numpy.zeros_like(kf)
+        kr[self.reversible] = kf[self.reversible] / Keq[self.reversible]
+
+        return kf, kr
+
+    def getSpeciesRates(self, C, kf, kr):
+        """
+        Return the net rate of production of each species in mol/m^3*s and the
+        rate of each reaction in mol/m^3*s at the species concentrations `C`
+        in mol/m^3, given the forward and reverse rate coefficients `kf` and
+        `kr` of each reaction.
+        """
+        # The trailing one is selected by the unused (-1) reactant and product indices
+        Cext = numpy.append(C, 1.0)
+        reactionRates = kf * numpy.prod(Cext[self.reactantIndices], axis=1) - kr * numpy.prod(Cext[self.productIndices], axis=1)
+        return self.stoichiometry.dot(reactionRates), reactionRates
+
+    def getRateDerivatives(self, C, kf, kr):
+        """
+        Return the derivatives of the net rate of production of each species
+        with respect to the concentration of each species at the species
+        concentrations `C` in mol/m^3, given the forward and reverse rate
+        coefficients `kf` and `kr` of each reaction.
+        """
+        Cext = numpy.append(C, 1.0)
+        rows = numpy.arange(self.numReactions)
+        # Derivatives of each reaction rate with respect to each concentration;
+        # the last column collects the unused indices and is discarded
+        drdC = numpy.zeros((self.numReactions, self.numSpecies + 1), numpy.float64)
+        for m, others in [(0, [1,2]), (1, [0,2]), (2, [0,1])]:
+            numpy.add.at(drdC, (rows, self.reactantIndices[:,m]), kf * numpy.prod(Cext[self.reactantIndices[:,others]], axis=1))
+            numpy.add.at(drdC, (rows, self.productIndices[:,m]), -kr * numpy.prod(Cext[self.productIndices[:,others]], axis=1))
+        return numpy.asarray(self.stoichiometry.dot(drdC[:,:-1]))
+
+    def getTimeDerivatives(self, C, kf, kr, Ctot):
+        """
+        Return the time derivative of the concentration of each species in
+        mol/m^3*s in an isothermal, isobaric batch reactor with total
+        concentration `Ctot` in mol/m^3 at the species concentrations `C` in
+        mol/m^3, given the forward and reverse rate coefficients `kf` and `kr`
+        of each reaction.
+        """
+        speciesRates = self.getSpeciesRates(C, kf, kr)[0]
+        # The reactor volume changes to keep the total concentration fixed
+        return speciesRates - C * numpy.sum(speciesRates) / Ctot
+
+    def getJacobian(self, C, kf, kr, Ctot):
+        """
+        Return the Jacobian of :meth:`getTimeDerivatives` with respect to the
+        species concentrations `C` in mol/m^3.
+        """
+        speciesRates = self.getSpeciesRates(C, kf, kr)[0]
+        D = self.getRateDerivatives(C, kf, kr)
+        return D - numpy.outer(C, numpy.sum(D, axis=0)) / Ctot - numpy.identity(self.numSpecies) * numpy.sum(speciesRates) / Ctot
+
+    def solve(self, T, P, x0, times, atol=1e-16, rtol=1e-8):
+        """
+        Simulate the model in an isothermal, isobaric batch reactor at
+        temperature `T` in K and pressure `P` in Pa, starting from the initial
+        mole fractions `x0`. Returns the mole fractions of each species at the
+        given output `times` in s. If the integration fails, the mole
+        fractions from that point on are set to NaN.
+        """
+        kf, kr = self.getRateCoefficients(T, P)
+        # At constant T and P the total concentration is fixed by the ideal gas law
+        Ctot = P / (constants.R * T)
+
+        def residual(t, C):
+            return self.getTimeDerivatives(C, kf, kr, Ctot)
+
+        def jacobian(t, C):
+            return self.getJacobian(C, kf, kr, Ctot)
+
+        x = numpy.empty((len(times), self.numSpecies), numpy.float64)
+        x.fill(numpy.nan)
+
+        ode = scipy.integrate.ode(residual, jacobian)
+        ode.set_integrator('vode', method='bdf', with_jacobian=True, atol=atol, rtol=rtol, nsteps=100000)
+        ode.set_initial_value(numpy.asarray(x0, numpy.float64) / numpy.sum(x0) * Ctot, 0.0)
+        for n, t in enumerate(times):
+            if t > ode.t:
+                ode.integrate(t)
+            if not ode.successful():
+                logging.warning('Integration failed at time {0:g} s for T = {1:g} K and P = {2:g} Pa.'.format(ode.t, T, P))
+                break
+            x[n,:] = ode.y / numpy.sum(ode.y)
+        return x
+
+################################################################################
+
+# The compiled model used by each worker process of a reactor ensemble
+_compiledModel = None
+
+def _initializeWorker(model):
+    """
+    Store the compiled `model` for use by a worker process.
+    """
+    global _compiledModel
+    _compiledModel = model
+
+def _solveCondition(args):
+    """
+    Simulate the compiled model of a worker process for a single reaction
+    condition.
+    """
+    return _compiledModel.solve(*args)
+
+################################################################################
+
+class ReactorEnsemble(object):
+    """
+    A set of homogeneous, isothermal, isobaric batch reactors sharing a single
+    kinetic model, consisting of a list of core species and core reactions.
+    The model is compiled once when the ensemble is created. The attributes
+    are:
+
+    =========================== ================================================
+    Attribute                   Description
+    =========================== ================================================
+    `coreSpecies`               The species in the kinetic model
+    `coreReactions`             The reactions in the kinetic model
+    `model`                     The :class:`CompiledModel` of the kinetic model
+    `atol`                      The absolute tolerance of the ODE solver
+    `rtol`                      The relative tolerance of the ODE solver
+    =========================== ================================================
+
+    """
+
+    def __init__(self, coreSpecies, coreReactions, atol=1e-16, rtol=1e-8):
+        self.coreSpecies = coreSpecies
+        self.coreReactions = coreReactions
+        self.model = CompiledModel(coreSpecies, coreReactions)
+        self.atol = atol
+        self.rtol = rtol
+
+    def getInitialMoleFractions(self, initialMoleFractions):
+        """
+        Return an array of the initial mole fraction of each core species from
+        the dict `initialMoleFractions` mapping species to mole fractions.
+        """
+        x0 = numpy.zeros(len(self.coreSpecies), numpy.float64)
+        for spec, moleFrac in initialMoleFractions.iteritems():
+            x0[self.coreSpecies.index(spec)] = moleFrac
+        return x0
+
+    def reduce(self, T, P, initialMoleFractions, checkpoints, epsilon=1e-3):
+        """
+        Return a :class:`ReducedModel` of the kinetic model at temperature `T`
+        and pressure `P`, with the quasi-steady-state species and
+        partial-equilibrium lumps detected by time-scale analysis at each of
+        the `checkpoints` in s of a simulation starting from the
+        `initialMoleFractions`. The reduction applied and its error relative to
+        the full model are logged. As the full model is simulated to find the
+        reduction, this is meant for offline analysis (see
+        :func:`~rmgpy.solver.reduction.analyzeStiffness`).
+        """
+        T = Quantity(T).value_si; P = Quantity(P).value_si
+        x0 = self.getInitialMoleFractions(initialMoleFractions)
+        reduced = analyzeStiffness(self.model, T, P, x0, checkpoints, epsilon=epsilon, atol=self.atol, rtol=self.rtol)
+
+        logging.info('Reduced model at {0:g} K and {1:g} Pa:'.format(T, P))
+        logging.info('    {0:d} species in quasi-steady state: {1}'.format(len(reduced.qssSpecies), ', '.join([str(self.coreSpecies[i]) for i in reduced.qssSpecies])))
+        for lump in reduced.lumps:
+            if len(lump) > 1:
+                logging.info('    Species in partial equilibrium: {0}'.format(', '.join([str(self.coreSpecies[i]) for i in lump])))
+        logging.info('    {0:d} variables instead of {1:d}; largest mole fraction error {2:g}'.format(len(reduced.lumps), len(self.coreSpecies), reduced.error))
+
+        return reduced
+
+    def simulate(self, conditions, times, processes=None):
+        """
+        Simulate the kinetic model at each of the reaction `conditions`, given
+        as a list of ``(T, P, initialMoleFractions)`` tuples, where `T` and `P`
+        are the temperature and pressure (with units, or in SI) and
+        `initialMoleFractions` is a dict mapping species to their initial mole
+        fraction. The conditions are distributed over a pool of `processes`
+        worker processes, one per CPU by default; pass ``1`` to simulate them
+        in this process. Returns an array of the mole fractions of each
+        species at each of the output `times` in s for each condition, with
+        shape ``(len(conditions), len(times), len(coreSpecies))``.
+        """
+        times = numpy.asarray(times, numpy.float64)
+        arguments = []
+        for T, P, initialMoleFractions in conditions:
+            x0 = self.getInitialMoleFractions(initialMoleFractions)
+            arguments.append((Quantity(T).value_si, Quantity(P).value_si, x0, times, self.atol, self.rtol))
+
+        if processes == 1:
+            results = [self.model.solve(*args) for args in arguments]
+        else:
+            pool = multiprocessing.Pool(processes, _initializeWorker, (self.model,))
+            try:
+                results = pool.map(_solveCondition, arguments)
+            finally:
+                pool.close()
+                pool.join()
+
+        return numpy.array(results, numpy.float64).reshape((len(arguments), len(times), len(self.coreSpecies)))
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy
+
+from rmgpy.species import Species
+from rmgpy.reaction import Reaction
+from rmgpy.kinetics import Arrhenius
+from rmgpy.thermo import NASA, NASAPolynomial
+from rmgpy.solver.ensemble import CompiledModel, ReactorEnsemble
+import rmgpy.constants as constants
+
+################################################################################
+
+class TestReactorEnsemble(unittest.TestCase):
+    """
+    Contains unit tests of the ReactorEnsemble class.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class.
+        """
+        def nasa(c6):
+            return NASA(polynomials=[NASAPolynomial(coeffs=[3.5,0,0,0,0,-1000,c6], Tmin=(200,'K'), Tmax=(6000,'K'))], Tmin=(200,'K'), Tmax=(6000,'K'))
+        self.A = Species(label='A', thermo=nasa(3.0))
+        self.B = Species(label='B', thermo=nasa(5.0))
+        self.C = Species(label='C', thermo=nasa(4.0))
+        self.coreSpecies = [self.A, self.B, self.C]
+        self.coreReactions = [
+            Reaction(reactants=[self.A], products=[self.B], kinetics=Arrhenius(A=(1e3,'s^-1'), n=0, Ea=(0,'J/mol'), T0=(1,'K'))),
+            Reaction(reactants=[self.B, self.B], products=[self.C], kinetics=Arrhenius(A=(1e2,'m^3/(mol*s)'), n=0, Ea=(0,'J/mol'), T0=(1,'K'))),
+        ]
+
+    def testRateDerivatives(self):
+        """
+        Test that the analytic rate derivatives match finite differences.
+        """
+        model = CompiledModel(self.coreSpecies, self.coreReactions)
+        kf = numpy.array([1e3, 1e2]); kr = numpy.array([5.0, 7.0])
+        C = numpy.array([3.0, 4.0, 5.0])
+        D = model.getRateDerivatives(C, kf, kr)
+        for i in range(3):
+            dC = numpy.zeros(3); dC[i] = 1e-6
+            Dnum = (model.getSpeciesRates(C + dC, kf, kr)[0] - model.getSpeciesRates(C - dC, kf, kr)[0]) / 2e-6
+            for j in range(3):
+                self.assertAlmostEqual(D[j,i], Dnum[j], delta=1e-6*max(1.0, abs(Dnum[j])))
+
+    def testSimulate(self):
+        """
+        Test that the ensemble reaches equilibrium and gives the same results
+        in serial and in parallel.
+        """
+        ensemble = ReactorEnsemble(self.coreSpecies, self.coreReactions)
+        conditions = [((1000,'K'), (1,'bar'), {self.A: 1.0}), (800., 1e5, {self.A: 0.5, self.B: 0.5})]
+        times = [0.0, 1e-3, 1.0]
+        serial = ensemble.simulate(conditions, times, processes=1)
+        parallel = ensemble.simulate(conditions, times, processes=2)
+        self.assertEqual(serial.shape, (2, 3, 3))
+        self.assertTrue(numpy.allclose(serial, parallel))
+        self.assertAlmostEqual(serial[0,0,0], 1.0)
+        for n, T in enumerate([1000., 800.]):
+            dG = self.B.thermo.getFreeEnergy(T) - self.A.thermo.getFreeEnergy(T)
+            self.assertAlmostEqual(serial[n,-1,1] / serial[n,-1,0], numpy.exp(-dG / constants.R / T), 4)
@@ -46,6 +46,7 @@ import rmgpy.constants as constants
 cimport rmgpy.constants as constants
 from rmgpy.quantity import Quantity
 from rmgpy.quantity cimport ScalarQuantity, ArrayQuantity
+from rmgpy.kinetics.diffusionLimited import diffusionLimiter
 
 cdef class LiquidReactor(ReactionSystem):
     """
@@ -61,6 +62,8 @@ cdef class LiquidReactor(ReactionSystem):
     cdef public dict initialConcentrations
     cdef public list sensitiveSpecies
     cdef public double sensitivityThreshold
+    cdef public list sensitiveReactions
+    cdef public int sensitivityScreeningCount
 
     cdef public numpy.ndarray reactantIndices
     cdef public numpy.ndarray productIndices
@@ -71,7 +74,10 @@ cdef class LiquidReactor(ReactionSystem):
     cdef public numpy.ndarray networkLeakCoefficients
     cdef public numpy.ndarray jacobianMatrix
 
-    def __init__(self, T, initialConcentrations, termination, sensitiveSpecies=None, sensitivityThreshold=1e-3):
+    cdef public dict equilibriumConstantCache
+    cdef public tuple equilibriumConstantCacheConditions
+
+    def __init__(self, T, initialConcentrations, termination, sensitiveSpecies=None, sensitivityThreshold=1e-3, sensitiveReactions=None, sensitivityScreeningCount=0):
         ReactionSystem.__init__(self, termination)
         self.T = Quantity(T)
         self.P = Quantity(100000.,'kPa') # Arbitrary high pressure (1000 Bar) to get reactions in the high-pressure limit!
@@ -81,6 +87,8 @@ cdef class LiquidReactor(ReactionSystem):
       
         self.sensitiveSpecies = sensitiveSpecies
         self.sensitivityThreshold = sensitivityThreshold
+        self.sensitiveReactions = sensitiveReactions or []
+        self.sensitivityScreeningCount = sensitivityScreeningCount
         
         # These are helper variables used within the solver
         self.reactantIndices = None
@@ -91,6 +99,11 @@ cdef class LiquidReactor(ReactionSystem):
         self.equilibriumConstants = None
         self.networkLeakCoefficients = None
         self.jacobianMatrix = None
+
+        # The equilibrium constant of each reversible reaction, which is fixed
+        # for a given solvent and temperature
+        self.equilibriumConstantCache = {}
+        self.equilibriumConstantCacheConditions = None
         
     def convertInitialKeysToSpeciesObjects(self, speciesDict):
         """
@@ -113,7 +126,7 @@ cdef class LiquidReactor(ReactionSystem):
         ReactionSystem.initializeModel(self, coreSpecies, coreReactions, edgeSpecies, edgeReactions, pdepNetworks, atol, rtol, sensitivity, sens_atol, sens_rtol)
 
         cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks
-        cdef int i, j, l, index, neq
+        cdef int i, j, l, index, neq, numSensParams
         cdef double V
         cdef dict speciesIndex, reactionIndex
         cdef numpy.ndarray[numpy.int_t, ndim=2] reactantIndices, productIndices, networkIndices
@@ -147,12 +160,33 @@ cdef class LiquidReactor(ReactionSystem):
         forwardRateCoefficients = numpy.zeros((numCoreReactions + numEdgeReactions), numpy.float64)
         reverseRateCoefficients = numpy.zeros_like(forwardRateCoefficients)
         equilibriumConstants = numpy.zeros_like(forwardRateCoefficients)
+        # The equilibrium constants depend only on the solvent, temperature
+        # and species thermo, so those from the previous call are reused for
+        # reactions whose species have the same thermo objects. The forward
+        # rate coefficients are always evaluated, since kinetics are modified
+        # in place (e.g. by fixBarrierHeight); the solvent-dependent diffusion
+        # terms they use are cached by the diffusion limiter.
+        conditions = (diffusionLimiter.solventData if diffusionLimiter.enabled else None, self.T.value_si)
+        if conditions != self.equilibriumConstantCacheConditions:
+            self.equilibriumConstantCache = {}
+            self.equilibriumConstantCacheConditions = conditions
+        equilibriumConstantCache = {}
         for rxnList in [coreReactions, edgeReactions]:
             for rxn in rxnList:
                 j = reactionIndex[rxn]
                 forwardRateCoefficients[j] = rxn.getRateCoefficient(self.T.value_si, self.P.value_si)
                 if rxn.reversible:
-                    equilibriumConstants[j] = rxn.getEquilibriumConstant(self.T.value_si)
+                    thermo = [spec.thermo for spec in rxn.reactants] + [spec.thermo for spec in rxn.products]
+                    try:
+                        cachedThermo, Keq = self.equilibriumConstantCache[rxn]
+                        if len(cachedThermo) != len(thermo) or any([thermo0 is not thermo1 for thermo0, thermo1 in zip(cachedThermo, thermo)]):
+                            raise KeyError(rxn)
+                    except KeyError:
+                        Keq = rxn.getEquilibriumConstant(self.T.value_si)
+                    # Only keep the reactions in the current model, so the
+                    # cache does not grow with reactions that have been discarded
+                    equilibriumConstantCache[rxn] = (thermo, Keq)
+                    equilibriumConstants[j] = Keq
                     reverseRateCoefficients[j] = forwardRateCoefficients[j] / equilibriumConstants[j]
                 for l, spec in enumerate(rxn.reactants):
                     i = speciesIndex[spec]
@@ -169,6 +203,7 @@ cdef class LiquidReactor(ReactionSystem):
                 i = speciesIndex[spec]
                 networkIndices[j,l] = i
 
+        self.equilibriumConstantCache = equilibriumConstantCache
         self.reactantIndices = reactantIndices
         self.productIndices = productIndices
         self.forwardRateCoefficients = forwardRateCoefficients
@@ -184,7 +219,10 @@ cdef class LiquidReactor(ReactionSystem):
             # Set DASPK sensitivity analysis to ON
             self.sensitivity = True
             # Compute number of variables
-            neq = numCoreSpecies*(len(forwardRateCoefficients)+numCoreSpecies+1)
+            # Only the selected reaction rates and species free energies are
+            # used as sensitivity parameters
+            numSensParams = len(self.sensitiveReactionIndices) + len(self.sensitiveThermoIndices)
+            neq = numCoreSpecies*(numSensParams+1)
             
             atol_array = numpy.ones(neq, numpy.float64)*sens_atol
             atol_array[:numCoreSpecies] = atol
@@ -192,7 +230,7 @@ cdef class LiquidReactor(ReactionSystem):
             rtol_array = numpy.ones(neq, numpy.float64)*sens_rtol
             rtol_array[:numCoreSpecies] = rtol
             
-            senpar = numpy.zeros(len(forwardRateCoefficients)+numCoreSpecies, numpy.float64)
+            senpar = numpy.zeros(numSensParams, numpy.float64)
             
         else:
             neq = numCoreSpecies
@@ -223,7 +261,7 @@ cdef class LiquidReactor(ReactionSystem):
         """
         cdef numpy.ndarray[numpy.int_t, ndim=2] ir, ip, inet
         cdef numpy.ndarray[numpy.float64_t, ndim=1] res, kf, kr, knet, delta, equilibriumConstants
-        cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks
+        cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks, numSensParams
         cdef int i, j, z, first, second, third
         cdef double k, V, reactionRate
         cdef numpy.ndarray[numpy.float64_t, ndim=1] coreSpeciesConcentrations, coreSpeciesRates, coreReactionRates, edgeSpeciesRates, edgeReactionRates, networkLeakRates
@@ -361,7 +399,8 @@ cdef class LiquidReactor(ReactionSystem):
             else:
                 jacobian = self.jacobianMatrix
             dgdk = self.computeRateDerivative()
-            for j in range(numCoreReactions+numCoreSpecies):
+            numSensParams = dgdk.shape[1]
+            for j in range(numSensParams):
                 for i in range(numCoreSpecies):
                     for z in range(numCoreSpecies):
                         delta[(j+1)*numCoreSpecies + i] += jacobian[i,z]*y[(j+1)*numCoreSpecies + z] 
@@ -744,13 +783,17 @@ cdef class LiquidReactor(ReactionSystem):
     def computeRateDerivative(self):
         """
         Returns derivative vector df/dk_j where dy/dt = f(y, t, k) and
-        k_j is the rate parameter for the jth core reaction.
+        k_j is the jth sensitivity parameter. The columns correspond to the
+        rate coefficients of the reactions in `sensitiveReactionIndices`,
+        followed by the free energies of the species in
+        `sensitiveThermoIndices`.
         """
         cdef numpy.ndarray[numpy.int_t, ndim=2] ir, ip
+        cdef numpy.ndarray[numpy.int_t, ndim=1] reactionColumns
         cdef numpy.ndarray[numpy.float64_t, ndim=1] kf, kr, C, deriv
         cdef numpy.ndarray[numpy.float64_t, ndim=2] rateDeriv
         cdef double fderiv, rderiv, flux, V
-        cdef int j, numCoreReactions, numCoreSpecies
+        cdef int j, l, numCoreReactions, numCoreSpecies, numSensReactions, numSensThermo
         
         cdef double RT_inverse, gderiv
         
@@ -769,9 +812,19 @@ cdef class LiquidReactor(ReactionSystem):
 
         C = self.coreSpeciesConcentrations
         
-        rateDeriv = numpy.zeros((numCoreSpecies,numCoreReactions+numCoreSpecies), numpy.float64)
+        # Map each core reaction onto its column of the derivative matrix
+        # (-1 if its rate coefficient is not a sensitivity parameter)
+        numSensReactions = len(self.sensitiveReactionIndices)
+        numSensThermo = len(self.sensitiveThermoIndices)
+        reactionColumns = -numpy.ones(numCoreReactions, numpy.int)
+        for l, j in enumerate(self.sensitiveReactionIndices):
+            reactionColumns[j] = l
+
+        rateDeriv = numpy.zeros((numCoreSpecies,numSensReactions+numSensThermo), numpy.float64)
         
         for j in range(numCoreReactions):
+            if reactionColumns[j] == -1 and numSensThermo == 0:
+                continue
             if ir[j,1] == -1: # only one reactant
                 fderiv = C[ir[j,0]]
             elif ir[j,2] == -1: # only two reactants
@@ -802,24 +855,33 @@ cdef class LiquidReactor(ReactionSystem):
                 deriv[ip[j,1]] -= gderiv
                 if ip[j,2] != -1: # three reactants!! (really?)
                     deriv[ip[j,2]] -= gderiv
+            deriv = deriv[self.sensitiveThermoIndices]
             
-            rateDeriv[ir[j,0], j] -= flux
-            rateDeriv[ir[j,0], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+            rateDeriv[ir[j,0], numSensReactions:] -= deriv
             if ir[j,1] != -1:
-                rateDeriv[ir[j,1], j] -= flux
-                rateDeriv[ir[j,1], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+                rateDeriv[ir[j,1], numSensReactions:] -= deriv
                 if ir[j,2] != -1:
-                    rateDeriv[ir[j,2], j] -= flux
-                    rateDeriv[ir[j,2], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+                    rateDeriv[ir[j,2], numSensReactions:] -= deriv
                 
-            rateDeriv[ip[j,0], j] += flux
-            rateDeriv[ip[j,0], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+            rateDeriv[ip[j,0], numSensReactions:] += deriv
             if ip[j,1] != -1:
-                rateDeriv[ip[j,1], j] += flux
-                rateDeriv[ip[j,1], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+                rateDeriv[ip[j,1], numSensReactions:] += deriv
                 if ip[j,2] != -1:
-                    rateDeriv[ip[j,2], j] += flux          
-                    rateDeriv[ip[j,2], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+                    rateDeriv[ip[j,2], numSensReactions:] += deriv
+            
+            l = reactionColumns[j]
+            if l != -1:
+                rateDeriv[ir[j,0], l] -= flux
+                if ir[j,1] != -1:
+                    rateDeriv[ir[j,1], l] -= flux
+                    if ir[j,2] != -1:
+                        rateDeriv[ir[j,2], l] -= flux
+                    
+                rateDeriv[ip[j,0], l] += flux
+                if ip[j,1] != -1:
+                    rateDeriv[ip[j,1], l] += flux
+                    if ip[j,2] != -1:
+                        rateDeriv[ip[j,2], l] += flux
                         
         rateDeriv = V * rateDeriv
                 
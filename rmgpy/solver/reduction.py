@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2002-2010 Prof. William H. Green (whgreen@mit.edu) and the
+#   RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Contains functionality for reducing the stiffness of a compiled kinetic model
+by time-scale analysis. Species that are consumed much faster than the time
+scale of interest are placed in quasi-steady state (QSS), and species connected
+by fast reversible isomerizations are lumped together in partial equilibrium.
+The reduced model integrates only the slow variables; the QSS concentrations
+are found from the algebraic constraints at every step.
+
+The analysis is an offline utility rather than part of model generation: it
+simulates the full model to find the fast species and to measure the error of
+the reduction, so it pays off only when the reduced model is then simulated
+many times at the same conditions, as in sensitivity or parameter studies.
+"""
+
+import logging
+import numpy
+import scipy.integrate
+
+import rmgpy.constants as constants
+
+################################################################################
+
+class ReducedModel(object):
+    """
+    A :class:`CompiledModel` reduced by placing some species in quasi-steady
+    state and lumping others together in partial equilibrium, at a fixed
+    temperature and pressure. The attributes are:
+
+    =========================== ================================================
+    Attribute                   Description
+    =========================== ================================================
+    `model`                     The full :class:`CompiledModel`
+    `T`                         The temperature in K
+    `P`                         The pressure in Pa
+    `qssSpecies`                The indices of the species in quasi-steady state
+    `fastReactions`             The indices of the reactions in partial equilibrium
+    `lumps`                     A list of the species indices in each lump
+    `error`                     The largest mole fraction error relative to the full model, if known
+    =========================== ================================================
+
+    Each species not in quasi-steady state belongs to exactly one lump; most
+    lumps contain a single species.
+    """
+
+    def __init__(self, model, T, P, qssSpecies=None, fastReactions=None, atol=1e-16, rtol=1e-8):
+        self.model = model
+        self.T = T
+        self.P = P
+        self.qssSpecies = numpy.array(sorted(qssSpecies if qssSpecies is not None else []), numpy.int)
+        self.fastReactions = numpy.array(sorted(fastReactions if fastReactions is not None else []), numpy.int)
+        self.atol = atol
+        self.rtol = rtol
+        self.error = None
+
+        self.kf, self.kr = model.getRateCoefficients(T, P)
+        self.Ctot = P / (constants.R * T)
+
+        # Group the species connected by fast reactions, with each species
+        # weighted by its equilibrium share of the lump
+        weights = numpy.ones(model.numSpecies, numpy.float64)
+        lumpOf = range(model.numSpecies)
+        for j in self.fastReactions:
+            reactant = model.reactantIndices[j,0]; product = model.productIndices[j,0]
+            oldLump = lumpOf[product]; newLump = lumpOf[reactant]
+            if oldLump == newLump:
+                continue
+            scale = weights[reactant] * self.kf[j] / self.kr[j] / weights[product]
+            for i in range(model.numSpecies):
+                if lumpOf[i] == oldLump:
+                    lumpOf[i] = newLump
+                    weights[i] *= scale
+        qss = set(self.qssSpecies)
+        self.lumps = []
+        for index in sorted(set(lumpOf)):
+            lump = [i for i in range(model.numSpecies) if lumpOf[i] == index and i not in qss]
+            if lump:
+                self.lumps.append(lump)
+
+        # The lump matrix sums the members of each lump, and the partition
+        # matrix distributes each lump over its members
+        self.lumpMatrix = numpy.zeros((len(self.lumps), model.numSpecies), numpy.float64)
+        self.partitionMatrix = numpy.zeros((model.numSpecies, len(self.lumps)), numpy.float64)
+        for l, lump in enumerate(self.lumps):
+            self.lumpMatrix[l,lump] = 1.0
+            self.partitionMatrix[lump,l] = weights[lump] / numpy.sum(weights[lump])
+
+    def getConcentrations(self, z, Cqss=None):
+        """
+        Return the concentration of each species in mol/m^3 given the total
+        concentration `z` of each lump in mol/m^3. The QSS concentrations are
+        found by Newton iteration on their algebraic constraints, starting
+        from the guess `Cqss` if given.
+        """
+        C = self.partitionMatrix.dot(z)
+        q = self.qssSpecies
+        if q.size == 0:
+            return C
+        if Cqss is not None:
+            C[q] = Cqss
+        for iteration in range(50):
+            F = self.model.getTimeDerivatives(C, self.kf, self.kr, self.Ctot)[q]
+            J = self.model.getJacobian(C, self.kf, self.kr, self.Ctot)[numpy.ix_(q,q)]
+            dC = numpy.linalg.solve(J, -F)
+            C[q] = numpy.maximum(C[q] + dC, 0.0)
+            if numpy.all(numpy.abs(dC) <= self.rtol * numpy.abs(C[q]) + self.atol):
+                break
+        else:
+            logging.warning('QSS concentrations did not converge for T = {0:g} K and P = {1:g} Pa.'.format(self.T, self.P))
+        return C
+
+    def solve(self, x0, times):
+        """
+        Simulate the reduced model in an isothermal, isobaric batch reactor,
+        starting from the initial mole fractions `x0`. Returns the mole
+        fractions of each species at the given output `times` in s. If the
+        integration fails, the mole fractions from that point on are set to
+        NaN.
+        """
+        C0 = numpy.asarray(x0, numpy.float64) / numpy.sum(x0) * self.Ctot
+        # The most recent QSS concentrations, used to start the next iteration
+        Cqss = C0[self.qssSpecies].copy()
+
+        def residual(t, z):
+            C = self.getConcentrations(z, Cqss)
+            Cqss[:] = C[self.qssSpecies]
+            return self.lumpMatrix.dot(self.model.getTimeDerivatives(C, self.kf, self.kr, self.Ctot))
+
+        def jacobian(t, z):
+            C = self.getConcentrations(z, Cqss)
+            J = self.model.getJacobian(C, self.kf, self.kr, self.Ctot)
+            # The QSS concentrations follow the lumps through their constraints
+            dCdz = self.partitionMatrix.copy()
+            q = self.qssSpecies
+            if q.size > 0:
+                dCdz[q,:] = -numpy.linalg.solve(J[numpy.ix_(q,q)], J[q,:].dot(self.partitionMatrix))
+            return self.lumpMatrix.dot(J).dot(dCdz)
+
+        x = numpy.empty((len(times), self.model.numSpecies), numpy.float64)
+        x.fill(numpy.nan)
+
+        ode = scipy.integrate.ode(residual, jacobian)
+        ode.set_integrator('vode', method='bdf', with_jacobian=True, atol=self.atol, rtol=self.rtol, nsteps=100000)
+        ode.set_initial_value(self.lumpMatrix.dot(C0), 0.0)
+        for n, t in enumerate(times):
+            if t > ode.t:
+                ode.integrate(t)
+            if not ode.successful():
+                logging.warning('Integration of reduced model failed at time {0:g} s for T = {1:g} K and P = {2:g} Pa.'.format(ode.t, self.T, self.P))
+                break
+            C = self.getConcentrations(ode.y, Cqss)
+            x[n,:] = C / numpy.sum(C)
+        return x
+
+################################################################################
+
+def analyzeStiffness(model, T, P, x0, checkpoints, epsilon=1e-3, atol=1e-16, rtol=1e-8):
+    """
+    Return a :class:`ReducedModel` of the compiled `model` at temperature `T`
+    in K and pressure `P` in Pa, found from a simulation of the full model
+    starting from the initial mole fractions `x0`. At each of the
+    `checkpoints` in s, a species absent from the initial mixture is placed in
+    quasi-steady state if its consumption time scale from the Jacobian is less
+    than `epsilon` times the checkpoint time. A reversible isomerization
+    is placed in partial equilibrium if its relaxation time is less than
+    `epsilon` times the earliest checkpoint time. The largest mole fraction
+    error of the reduced model relative to the full model at the checkpoints
+    is stored as the `error` attribute of the result.
+
+    This is an offline analysis: the full model is always simulated first,
+    so finding the reduction costs more than the simulation it replaces.
+    """
+    x0 = numpy.asarray(x0, numpy.float64)
+    checkpoints = numpy.asarray(checkpoints, numpy.float64)
+    if not numpy.any(checkpoints > 0):
+        raise ValueError('At least one checkpoint time must be positive.')
+    tmin = numpy.min(checkpoints[checkpoints > 0])
+    kf, kr = model.getRateCoefficients(T, P)
+    Ctot = P / (constants.R * T)
+
+    fullMoleFractions = model.solve(T, P, x0, checkpoints, atol=atol, rtol=rtol)
+
+    # Fast reversible isomerizations are relaxed to equilibrium on a time scale
+    # of 1 / (kf + kr), independent of the concentrations
+    unimolecular = (model.reactantIndices[:,1] == -1) & (model.productIndices[:,1] == -1) & (model.reactantIndices[:,0] != model.productIndices[:,0])
+    fast = model.reversible & unimolecular & (kr > 0) & ((kf + kr) * tmin * epsilon > 1)
+    fastReactions = list(numpy.flatnonzero(fast))
+    lumped = set(model.reactantIndices[fast,0]) | set(model.productIndices[fast,0])
+
+    # QSS species are consumed quickly at every checkpoint
+    candidates = (x0 == 0)
+    for t, x in zip(checkpoints, fullMoleFractions):
+        if t <= 0:
+            continue
+        J = model.getJacobian(x * Ctot, kf, kr, Ctot)
+        candidates &= (-numpy.diag(J) * t * epsilon > 1)
+    qssSpecies = [i for i in numpy.flatnonzero(candidates) if i not in lumped]
+
+    reduced = ReducedModel(model, T, P, qssSpecies, fastReactions, atol=atol, rtol=rtol)
+    reduced.error = numpy.max(numpy.abs(reduced.solve(x0, checkpoints) - fullMoleFractions))
+    return reduced
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy
+
+from rmgpy.species import Species
+from rmgpy.reaction import Reaction
+from rmgpy.kinetics import Arrhenius
+from rmgpy.thermo import NASA, NASAPolynomial
+from rmgpy.solver.ensemble import CompiledModel
+from rmgpy.solver.reduction import ReducedModel, analyzeStiffness
+
+################################################################################
+
+class TestReduction(unittest.TestCase):
+    """
+    Contains unit tests of the stiffness reduction functionality.
+    """
+
+    def setUp(self):
+        """
+        A function run before each unit test in this class. The model contains
+        a short-lived intermediate I and a fast isomerization B <=> B2.
+        """
+        def nasa(c6):
+            return NASA(polynomials=[NASAPolynomial(coeffs=[3.5,0,0,0,0,-1000,c6], Tmin=(200,'K'), Tmax=(6000,'K'))], Tmin=(200,'K'), Tmax=(6000,'K'))
+        def arrhenius(A, units='s^-1'):
+            return Arrhenius(A=(A,units), n=0, Ea=(0,'J/mol'), T0=(1,'K'))
+        A = Species(label='A', thermo=nasa(3.0))
+        I = Species(label='I', thermo=nasa(3.0))
+        B = Species(label='B', thermo=nasa(4.0))
+        B2 = Species(label='B2', thermo=nasa(4.5))
+        C = Species(label='C', thermo=nasa(9.0))
+        coreReactions = [
+            Reaction(reactants=[A], products=[I], kinetics=arrhenius(1.0), reversible=False),
+            Reaction(reactants=[I], products=[B], kinetics=arrhenius(1e7), reversible=False),
+            Reaction(reactants=[B], products=[B2], kinetics=arrhenius(1e9)),
+            Reaction(reactants=[B2, B2], products=[C], kinetics=arrhenius(1e-3,'m^3/(mol*s)'), reversible=False),
+        ]
+        self.model = CompiledModel([A, I, B, B2, C], coreReactions)
+        self.x0 = [1.0, 0.0, 0.0, 0.0, 0.0]
+
+    def testAnalyzeStiffness(self):
+        """
+        Test that the intermediate is placed in quasi-steady state and the
+        isomers are lumped, with a small error relative to the full model.
+        """
+        reduced = analyzeStiffness(self.model, 1000., 1e5, self.x0, numpy.logspace(-2, 1, 7))
+        self.assertEqual(list(reduced.qssSpecies), [1])
+        self.assertEqual(list(reduced.fastReactions), [2])
+        self.assertEqual(reduced.lumps, [[0], [2, 3], [4]])
+        self.assertTrue(reduced.error < 1e-6)
+
+    def testUnreducedModel(self):
+        """
+        Test that a reduced model without QSS species or lumps matches the
+        full model.
+        """
+        times = [0.0, 0.1, 1.0]
+        reduced = ReducedModel(self.model, 1000., 1e5)
+        self.assertEqual(len(reduced.lumps), 5)
+        self.assertTrue(numpy.allclose(reduced.solve(self.x0, times), self.model.solve(1000., 1e5, self.x0, times), rtol=1e-5, atol=1e-10))
@@ -61,6 +61,8 @@ cdef class SimpleReactor(ReactionSystem):
     cdef public dict initialMoleFractions
     cdef public list sensitiveSpecies
     cdef public double sensitivityThreshold
+    cdef public list sensitiveReactions
+    cdef public int sensitivityScreeningCount
 
     cdef public numpy.ndarray reactantIndices
     cdef public numpy.ndarray productIndices
@@ -71,7 +73,7 @@ cdef class SimpleReactor(ReactionSystem):
     cdef public numpy.ndarray networkLeakCoefficients
     cdef public numpy.ndarray jacobianMatrix
 
-    def __init__(self, T, P, initialMoleFractions, termination, sensitiveSpecies=None, sensitivityThreshold=1e-3):
+    def __init__(self, T, P, initialMoleFractions, termination, sensitiveSpecies=None, sensitivityThreshold=1e-3, sensitiveReactions=None, sensitivityScreeningCount=0):
         ReactionSystem.__init__(self, termination)
         self.T = Quantity(T)
         self.P = Quantity(P)
@@ -81,6 +83,8 @@ cdef class SimpleReactor(ReactionSystem):
         self.constantVolume = False
         self.sensitiveSpecies = sensitiveSpecies
         self.sensitivityThreshold = sensitivityThreshold
+        self.sensitiveReactions = sensitiveReactions or []
+        self.sensitivityScreeningCount = sensitivityScreeningCount
         
         # These are helper variables used within the solver
         self.reactantIndices = None
@@ -113,7 +117,7 @@ cdef class SimpleReactor(ReactionSystem):
         ReactionSystem.initializeModel(self, coreSpecies, coreReactions, edgeSpecies, edgeReactions, pdepNetworks, atol, rtol, sensitivity, sens_atol, sens_rtol)
 
         cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks
-        cdef int i, j, l, index, neq
+        cdef int i, j, l, index, neq, numSensParams
         cdef double V
         cdef dict speciesIndex, reactionIndex
         cdef numpy.ndarray[numpy.int_t, ndim=2] reactantIndices, productIndices, networkIndices
@@ -184,7 +188,10 @@ cdef class SimpleReactor(ReactionSystem):
             # Set DASPK sensitivity analysis to ON
             self.sensitivity = True
             # Compute number of variables
-            neq = numCoreSpecies*(len(forwardRateCoefficients)+numCoreSpecies+1)
+            # Only the selected reaction rates and species free energies are
+            # used as sensitivity parameters
+            numSensParams = len(self.sensitiveReactionIndices) + len(self.sensitiveThermoIndices)
+            neq = numCoreSpecies*(numSensParams+1)
             
             atol_array = numpy.ones(neq, numpy.float64)*sens_atol
             atol_array[:numCoreSpecies] = atol
@@ -192,7 +199,7 @@ cdef class SimpleReactor(ReactionSystem):
             rtol_array = numpy.ones(neq, numpy.float64)*sens_rtol
             rtol_array[:numCoreSpecies] = rtol
             
-            senpar = numpy.zeros(len(forwardRateCoefficients)+numCoreSpecies, numpy.float64)
+            senpar = numpy.zeros(numSensParams, numpy.float64)
             
         else:
             neq = numCoreSpecies
@@ -225,7 +232,7 @@ cdef class SimpleReactor(ReactionSystem):
         """
         cdef numpy.ndarray[numpy.int_t, ndim=2] ir, ip, inet
         cdef numpy.ndarray[numpy.float64_t, ndim=1] res, kf, kr, knet, delta, equilibriumConstants
-        cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks
+        cdef int numCoreSpecies, numCoreReactions, numEdgeSpecies, numEdgeReactions, numPdepNetworks, numSensParams
         cdef int i, j, z, first, second, third
         cdef double k, V, reactionRate
         cdef numpy.ndarray[numpy.float64_t, ndim=1] coreSpeciesConcentrations, coreSpeciesRates, coreReactionRates, edgeSpeciesRates, edgeReactionRates, networkLeakRates
@@ -366,7 +373,8 @@ cdef class SimpleReactor(ReactionSystem):
             else:
                 jacobian = self.jacobianMatrix
             dgdk = self.computeRateDerivative()
-            for j in range(numCoreReactions+numCoreSpecies):
+            numSensParams = dgdk.shape[1]
+            for j in range(numSensParams):
                 for i in range(numCoreSpecies):
                     for z in range(numCoreSpecies):
                         delta[(j+1)*numCoreSpecies + i] += jacobian[i,z]*y[(j+1)*numCoreSpecies + z] 
@@ -874,13 +882,17 @@ cdef class SimpleReactor(ReactionSystem):
     def computeRateDerivative(self):
         """
         Returns derivative vector df/dk_j where dy/dt = f(y, t, k) and
-        k_j is the rate parameter for the jth core reaction.
+        k_j is the jth sensitivity parameter. The columns correspond to the
+        rate coefficients of the reactions in `sensitiveReactionIndices`,
+        followed by the free energies of the species in
+        `sensitiveThermoIndices`.
         """
         cdef numpy.ndarray[numpy.int_t, ndim=2] ir, ip
+        cdef numpy.ndarray[numpy.int_t, ndim=1] reactionColumns
         cdef numpy.ndarray[numpy.float64_t, ndim=1] kf, kr, C, deriv
         cdef numpy.ndarray[numpy.float64_t, ndim=2] rateDeriv
         cdef double fderiv, rderiv, flux, V
-        cdef int j, numCoreReactions, numCoreSpecies
+        cdef int j, l, numCoreReactions, numCoreSpecies, numSensReactions, numSensThermo
         
         cdef double RT_inverse, gderiv
         
@@ -899,9 +911,19 @@ cdef class SimpleReactor(ReactionSystem):
 
         C = self.coreSpeciesConcentrations
 
-        rateDeriv = numpy.zeros((numCoreSpecies,numCoreReactions+numCoreSpecies), numpy.float64)
+        # Map each core reaction onto its column of the derivative matrix
+        # (-1 if its rate coefficient is not a sensitivity parameter)
+        numSensReactions = len(self.sensitiveReactionIndices)
+        numSensThermo = len(self.sensitiveThermoIndices)
+        reactionColumns = -numpy.ones(numCoreReactions, numpy.int)
+        for l, j in enumerate(self.sensitiveReactionIndices):
+            reactionColumns[j] = l
+
+        rateDeriv = numpy.zeros((numCoreSpecies,numSensReactions+numSensThermo), numpy.float64)
         
         for j in range(numCoreReactions):
+            if reactionColumns[j] == -1 and numSensThermo == 0:
+                continue
             if ir[j,1] == -1: # only one reactant
                 fderiv = C[ir[j,0]]
             elif ir[j,2] == -1: # only two reactants
@@ -932,24 +954,33 @@ cdef class SimpleReactor(ReactionSystem):
                 deriv[ip[j,1]] -= gderiv
                 if ip[j,2] != -1: # three reactants!! (really?)
                     deriv[ip[j,2]] -= gderiv
+            deriv = deriv[self.sensitiveThermoIndices]
             
-            rateDeriv[ir[j,0], j] -= flux
-            rateDeriv[ir[j,0], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+            rateDeriv[ir[j,0], numSensReactions:] -= deriv
             if ir[j,1] != -1:
-                rateDeriv[ir[j,1], j] -= flux
-                rateDeriv[ir[j,1], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+                rateDeriv[ir[j,1], numSensReactions:] -= deriv
                 if ir[j,2] != -1:
-                    rateDeriv[ir[j,2], j] -= flux
-                    rateDeriv[ir[j,2], numCoreReactions:numCoreReactions+numCoreSpecies] -= deriv
+                    rateDeriv[ir[j,2], numSensReactions:] -= deriv
                 
-            rateDeriv[ip[j,0], j] += flux
-            rateDeriv[ip[j,0], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+            rateDeriv[ip[j,0], numSensReactions:] += deriv
             if ip[j,1] != -1:
-                rateDeriv[ip[j,1], j] += flux
-                rateDeriv[ip[j,1], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+                rateDeriv[ip[j,1], numSensReactions:] += deriv
                 if ip[j,2] != -1:
-                    rateDeriv[ip[j,2], j] += flux  
-                    rateDeriv[ip[j,2], numCoreReactions:numCoreReactions+numCoreSpecies] += deriv
+                    rateDeriv[ip[j,2], numSensReactions:] += deriv
+            
+            l = reactionColumns[j]
+            if l != -1:
+                rateDeriv[ir[j,0], l] -= flux
+                if ir[j,1] != -1:
+                    rateDeriv[ir[j,1], l] -= flux
+                    if ir[j,2] != -1:
+                        rateDeriv[ir[j,2], l] -= flux
+                    
+                rateDeriv[ip[j,0], l] += flux
+                if ip[j,1] != -1:
+                    rateDeriv[ip[j,1], l] += flux
+                    if ip[j,2] != -1:
+                        rateDeriv[ip[j,2], l] += flux
                         
         rateDeriv = V * rateDeriv
 
@@ -194,6 +194,26 @@ class SimpleReactorCheck(unittest.TestCase):
         #print 'Numerical d(dy/dt)/dk'    
         #print dfdk
         
+        ###
+        # Unit test for restricting the sensitivity parameters to a subset of the core reactions
+        rxnSystem0.sensitiveSpecies = [CH4]
+        rxnSystem0.initializeModel(coreSpecies, coreReactions, edgeSpecies, edgeReactions)
+        rxnSystem0.residual(0.0, rxnSystem0.y, numpy.zeros(rxnSystem0.y.shape))
+        fullRateDerivative = rxnSystem0.computeRateDerivative()
+        self.assertEqual(fullRateDerivative.shape, (numCoreSpecies, len(rxnList) + numCoreSpecies))
+        
+        rxnSystem0.selectSensitivityParameters(coreSpecies, coreReactions, sensitiveReactions=[2])
+        self.assertEqual(list(rxnSystem0.sensitiveReactionIndices), [1])
+        self.assertEqual(list(rxnSystem0.sensitiveThermoIndices), [0,1,2,3])
+        subsetRateDerivative = rxnSystem0.computeRateDerivative()
+        self.assertEqual(subsetRateDerivative.shape, (numCoreSpecies, 5))
+        for i in range(numCoreSpecies):
+            self.assertAlmostEqual(subsetRateDerivative[i,0], fullRateDerivative[i,1], delta=abs(1e-10*fullRateDerivative[i,1]))
+            for j in range(4):
+                self.assertAlmostEqual(subsetRateDerivative[i,j+1], fullRateDerivative[i,len(rxnList)+j], delta=abs(1e-10*fullRateDerivative[i,len(rxnList)+j]))
+        
+        self.assertRaises(ValueError, rxnSystem0.selectSensitivityParameters, coreSpecies, coreReactions, [len(rxnList)+1])
+        
         
         
 #        # Visualize the simulation results
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#   RMG - Reaction Mechanism Generator
+#
+#   Copyright (c) 2002-2010 Prof. William H. Green (whgreen@mit.edu) and the
+#   RMG Team (rmg_dev@mit.edu)
+#
+#   Permission is hereby granted, free of charge, to any person obtaining a
+#   copy of this software and associated documentation files (the 'Software'),
+#   to deal in the Software without restriction, including without limitation
+#   the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#   and/or sell copies of the Software, and to permit persons to whom the
+#   Software is furnished to do so, subject to the following conditions:
+#
+#   The above copyright notice and this permission notice shall be included in
+#   all copies or substantial portions of the Software.
+#
+#   THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#   IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#   FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#   AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#   LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#   FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#   DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Contains the worksheets used to save simulation profiles and sensitivities
+from a reaction system. A worksheet is written one row at a time, with the
+first row containing the column headers, in the same way as a
+:class:`csv.writer`.
+"""
+
+import os
+import csv
+import shutil
+import tempfile
+import numpy
+
+################################################################################
+
+class CSVWorksheet(object):
+    """
+    A worksheet that saves its rows to a comma-separated values file at
+    `path`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w')
+        self.writer = csv.writer(self.file)
+
+    def writerow(self, row):
+        """
+        Write a single `row` to the worksheet.
+        """
+        self.writer.writerow(row)
+
+    def writerows(self, rows):
+        """
+        Write each of the given `rows` to the worksheet.
+        """
+        self.writer.writerows(rows)
+
+    def close(self):
+        """
+        Close the file containing the worksheet.
+        """
+        self.file.close()
+
+################################################################################
+
+class NumpyWorksheet(object):
+    """
+    A worksheet that saves its rows to a binary NumPy ``.npy`` file at `path`.
+    The rows are streamed to a temporary file as they are written, so that the
+    memory use stays constant regardless of the number of rows. When the
+    worksheet is closed the ``.npy`` file is written as a one-dimensional
+    structured array with one ``float64`` field for each column header, so
+    that ``numpy.load(path)['Time (s)']`` returns the time column.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dtype = None
+        self.numRows = 0
+        self.tempFile = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(path)))
+
+    def writerow(self, row):
+        """
+        Write a single `row` to the worksheet. The first row written sets the
+        column headers; all subsequent rows must contain one number for each
+        column.
+        """
+        if self.dtype is None:
+            self.dtype = numpy.dtype([(str(label), numpy.float64) for label in row])
+            return
+        row = numpy.asarray(row, numpy.float64)
+        if row.shape != (len(self.dtype),):
+            raise ValueError('Expected a row with {0:d} values, got {1:d}.'.format(len(self.dtype), row.size))
+        row.tofile(self.tempFile)
+        self.numRows += 1
+
+    def writerows(self, rows):
+        """
+        Write each of the given `rows` to the worksheet. A two-dimensional
+        array of rows is written in a single block.
+        """
+        if self.dtype is not None and isinstance(rows, numpy.ndarray) and rows.ndim == 2:
+            if rows.shape[1] != len(self.dtype):
+                raise ValueError('Expected rows with {0:d} values, got {1:d}.'.format(len(self.dtype), rows.shape[1]))
+            numpy.ascontiguousarray(rows, numpy.float64).tofile(self.tempFile)
+            self.numRows += rows.shape[0]
+        else:
+            for row in rows:
+                self.writerow(row)
+
+    def close(self):
+        """
+        Write the ``.npy`` file from the rows streamed so far and discard the
+        temporary file. Nothing is written if no column headers were given.
+        """
+        if self.dtype is not None:
+            header = {
+                'descr': numpy.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (self.numRows,),
+            }
+            with open(self.path, 'wb') as f:
+                try:
+                    numpy.lib.format.write_array_header_1_0(f, header)
+                except ValueError:
+                    # Version 1.0 headers are limited to 64 KiB, which is
+                    # only enough for about a thousand columns
+                    numpy.lib.format.write_array_header_2_0(f, header)
+                self.tempFile.seek(0)
+                shutil.copyfileobj(self.tempFile, f)
+        self.tempFile.close()
+
+################################################################################
+
+def openWorksheet(path, fileFormat='csv'):
+    """
+    Return a new worksheet that saves its rows to `path`, given without a file
+    extension, in the requested `fileFormat`. Valid formats are ``'csv'`` for
+    comma-separated values and ``'npy'`` for a binary NumPy file.
+    """
+    if fileFormat == 'csv':
+        return CSVWorksheet(path + '.csv')
+    elif fileFormat == 'npy':
+        return NumpyWorksheet(path + '.npy')
+    else:
+        raise ValueError('Invalid worksheet format "{0}"; valid formats are "csv" and "npy".'.format(fileFormat))
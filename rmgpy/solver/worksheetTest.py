@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy
+
+from rmgpy.solver.worksheet import CSVWorksheet, NumpyWorksheet, openWorksheet
+
+################################################################################
+
+class TestWorksheet(unittest.TestCase):
+    """
+    Contains unit tests of the worksheets used to save simulation profiles.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testNumpyWorksheet(self):
+        """
+        Test that the rows written to a NumpyWorksheet are saved to a
+        structured .npy file.
+        """
+        worksheet = openWorksheet(os.path.join(self.directory, 'simulation_1'), 'npy')
+        self.assertTrue(isinstance(worksheet, NumpyWorksheet))
+        worksheet.writerow(['Time (s)', 'Volume (m^3)', 'CH4'])
+        worksheet.writerow([1e-12, 0.5, 0.25])
+        worksheet.writerows(numpy.array([[1e-11, 0.5, 0.125], [1e-10, 0.5, 0.0625]]))
+        self.assertRaises(ValueError, worksheet.writerow, [1e-9, 0.5])
+        worksheet.close()
+
+        data = numpy.load(os.path.join(self.directory, 'simulation_1.npy'))
+        self.assertEqual(data.shape, (3,))
+        self.assertEqual(data.dtype.names, ('Time (s)', 'Volume (m^3)', 'CH4'))
+        self.assertTrue(numpy.all(data['Time (s)'] == [1e-12, 1e-11, 1e-10]))
+        self.assertTrue(numpy.all(data['CH4'] == [0.25, 0.125, 0.0625]))
+
+    def testNumpyWorksheetWideHeader(self):
+        """
+        Test that a NumpyWorksheet with too many columns for a version 1.0
+        .npy header can still be saved and loaded.
+        """
+        labels = ['Time (s)'] + ['dln[C{0:d}H{1:d}]/dln[k{2:d}]'.format(i, 2*i+2, i) for i in range(1, 2001)]
+        worksheet = openWorksheet(os.path.join(self.directory, 'sensitivity_1_SPC_1'), 'npy')
+        worksheet.writerow(labels)
+        worksheet.writerows(numpy.arange(2.0 * len(labels)).reshape(2, len(labels)))
+        worksheet.close()
+
+        data = numpy.load(os.path.join(self.directory, 'sensitivity_1_SPC_1.npy'))
+        self.assertEqual(data.shape, (2,))
+        self.assertEqual(data.dtype.names, tuple(labels))
+        self.assertTrue(numpy.all(data[labels[-1]] == [len(labels) - 1, 2 * len(labels) - 1]))
+
+    def testCSVWorksheet(self):
+        """
+        Test that the rows written to a CSVWorksheet are saved to a .csv file.
+        """
+        worksheet = openWorksheet(os.path.join(self.directory, 'simulation_1'), 'csv')
+        self.assertTrue(isinstance(worksheet, CSVWorksheet))
+        worksheet.writerow(['Time (s)', 'CH4'])
+        worksheet.writerows(numpy.array([[1e-12, 0.25], [1e-11, 0.125]]))
+        worksheet.close()
+
+        with open(os.path.join(self.directory, 'simulation_1.csv')) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'Time (s),CH4')
+        self.assertEqual(len(lines), 3)
+        self.assertEqual([float(x) for x in lines[2].split(',')], [1e-11, 0.125])
+
+    def testInvalidFormat(self):
+        """
+        Test that an unknown worksheet format raises a ValueError.
+        """
+        self.assertRaises(ValueError, openWorksheet, os.path.join(self.directory, 'simulation_1'), 'xls')
+
+################################################################################
+
+if __name__ == '__main__':
+    unittest.main(testRunner=unittest.TextTestRunner(verbosity=2))
@@ -7,10 +7,10 @@ This script runs stand-alone sensitivity analysis on an RMG job.
 
 import os.path
 import logging
-import csv
 from time import time
 
 from rmgpy.rmg.main import RMG
+from rmgpy.solver.worksheet import openWorksheet
 from generateFluxDiagram import loadRMGPyJob
 
 ################################################################################
@@ -18,7 +18,7 @@ from generateFluxDiagram import loadRMGPyJob
 def simulate(rmg):
     """
     Simulate the RMG job and run the sensitivity analysis if it is on, generating
-    output csv files
+    output csv or npy files
     """
         
     for index, reactionSystem in enumerate(rmg.reactionSystems):
@@ -27,15 +27,13 @@ def simulate(rmg):
             logging.info('Conducting sensitivity analysis of reaction system %s...' % (index+1))
             
             if rmg.saveSimulationProfiles:
-                csvfile = file(os.path.join(rmg.outputDirectory, 'simulation_{0}.csv'.format(index+1)),'w')
-                worksheet = csv.writer(csvfile)
+                worksheet = openWorksheet(os.path.join(rmg.outputDirectory, 'simulation_{0}'.format(index+1)), rmg.simulationOutputFormat)
             else:
                 worksheet = None
                 
             sensWorksheet = []
             for spec in reactionSystem.sensitiveSpecies:
-                csvfile = file(os.path.join(rmg.outputDirectory, 'sensitivity_{0}_SPC_{1}.csv'.format(index+1, spec.index)),'w')
-                sensWorksheet.append(csv.writer(csvfile))
+                sensWorksheet.append(openWorksheet(os.path.join(rmg.outputDirectory, 'sensitivity_{0}_SPC_{1}'.format(index+1, spec.index)), rmg.simulationOutputFormat))
     
             pdepNetworks = []
             for source, networks in rmg.reactionModel.networkDict.items():
@@ -57,6 +55,10 @@ def simulate(rmg):
                 sensitivityRelativeTolerance = rmg.sensitivityRelativeTolerance,
                 sensWorksheet = sensWorksheet,
             )                      
+            if worksheet:
+                worksheet.close()
+            for sheet in sensWorksheet:
+                sheet.close()
 
 
 ################################################################################
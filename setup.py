@@ -66,6 +66,7 @@ def getMainExtensionModules():
         Extension('rmgpy.kinetics.model', ['rmgpy/kinetics/model.pyx']),
         Extension('rmgpy.kinetics.tunneling', ['rmgpy/kinetics/tunneling.pyx']),
         # Molecules and molecular representations
+        Extension('rmgpy.molecule.adjlist', ['rmgpy/molecule/adjlist.py'], include_dirs=['.']),
         Extension('rmgpy.molecule.atomtype', ['rmgpy/molecule/atomtype.py'], include_dirs=['.']),
         Extension('rmgpy.molecule.element', ['rmgpy/molecule/element.py'], include_dirs=['.']),
         Extension('rmgpy.molecule.graph', ['rmgpy/molecule/graph.pyx'], include_dirs=['.']),